@@ -0,0 +1,76 @@
+# Run time of membership tests in a generated script: grep over a newline separated string
+# (a fork and a scan of every value per lookup) against a Map Has Key test on a map.
+# Both scripts look the same numbers up, half of them present, and must count the same hits.
+# Usage: python benchmarks/bench_arrays.py [values] [lookups]
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.bash_emitter import BashEmitter
+from core.graph import Graph
+from nodes.command_nodes import EchoNode, RunCommandNode
+from nodes.flow_nodes import ForNode, IfNode, StartNode
+from nodes.variable_nodes import DeclareMapNode, MapHasNode, MapSetNode, SetVariableNode
+
+
+def add(graph, node, previous=None, output=0, **properties):
+    node.properties.update(properties)
+    graph.add_node(node)
+    if previous is not None:
+        graph.add_edge(previous.outputs[output], node.inputs[0])
+    return node
+
+
+def loop(graph, previous, output, items, variable):
+    return add(graph, ForNode(), previous, output, list=items, variable=variable)
+
+
+def with_grep(values, lookups):
+    graph = Graph()
+    start = add(graph, StartNode())
+    found = add(graph, SetVariableNode(), start, variable="found", value="0")
+    listed = add(graph, SetVariableNode(), found, variable="values", value="")
+    fill = loop(graph, listed, 0, f"{{1..{values}}}", "i")
+    add(graph, RunCommandNode(), fill, command='values+="$i"$\'\\n\'')
+    search = loop(graph, fill, 2, f"{{1..{lookups}}}", "n")
+    add(graph, RunCommandNode(), search, command=f'grep -qx "$(( n * {values * 2} / {lookups} ))" <<< "$values" && found=$((found + 1))')
+    add(graph, EchoNode(), search, 2, text="$found")
+    return graph
+
+
+def with_map(values, lookups):
+    graph = Graph()
+    start = add(graph, StartNode())
+    found = add(graph, SetVariableNode(), start, variable="found", value="0")
+    declared = add(graph, DeclareMapNode(), found, array="values")
+    fill = loop(graph, declared, 0, f"{{1..{values}}}", "i")
+    entry = add(graph, MapSetNode(), fill, key="$i", value="1")
+    graph.add_edge(declared.outputs[1], entry.inputs[1])
+    search = loop(graph, fill, 2, f"{{1..{lookups}}}", "n")
+    branch = add(graph, IfNode(), search)
+    has = add(graph, MapHasNode(), key=f"$(( n * {values * 2} / {lookups} ))")
+    graph.add_edge(declared.outputs[1], has.inputs[0])
+    graph.add_edge(has.outputs[0], branch.inputs[1])
+    add(graph, RunCommandNode(), branch, command="found=$((found + 1))")
+    add(graph, EchoNode(), search, 2, text="$found")
+    return graph
+
+
+def main(values, lookups):
+    outputs = set()
+    for name, build in (("grep", with_grep), ("map", with_map)):
+        script = BashEmitter(build(values, lookups)).emit()
+        began = time.perf_counter()
+        result = subprocess.run(["bash", "-c", script], capture_output=True, text=True, check=True)
+        elapsed = time.perf_counter() - began
+        outputs.add(result.stdout)
+        print(f"{name:5s} | {values} values, {lookups} lookups | {elapsed * 1000:9.1f}ms | {result.stdout.strip()} found")
+    assert len(outputs) == 1, "the scripts do not find the same values"
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 2000, args[1] if len(args) > 1 else 1000)
@@ -0,0 +1,99 @@
+# Wall time of downloading files from a local http.server, one Download File node per file
+# (a curl run each, one after the other) against a single node fetching them all.
+# The single node is run twice more: once with every file already there (skipped as unchanged)
+# and once after the files were removed with half of each left as a part (resumed, or fetched
+# again since http.server does not serve byte ranges). Every run must leave the same files.
+# Usage: python benchmarks/bench_downloads.py [files] [size_kb]
+import filecmp
+import functools
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.bash_emitter import BashEmitter
+from core.graph import Graph
+from nodes.flow_nodes import StartNode
+from nodes.utils_node import DownloadFileNode
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def chain(nodes):
+    graph = Graph()
+    previous = StartNode()
+    graph.add_node(previous)
+    for node in nodes:
+        graph.add_node(node)
+        graph.add_edge(previous.outputs[0], node.inputs[0])
+        previous = node
+    return graph
+
+
+def serial(pairs):
+    nodes = []
+    for url, path in pairs:
+        node = DownloadFileNode()
+        node.properties.update(url=url, output_path=path, resume="false", skip_unchanged="false")
+        nodes.append(node)
+    return chain(nodes)
+
+
+def single(pairs):
+    node = DownloadFileNode()
+    node.properties["downloads"] = "; ".join(f"{url} -> {path}" for url, path in pairs)
+    return chain([node])
+
+
+def run(script):
+    began = time.perf_counter()
+    subprocess.run(["bash", "-c", script], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - began
+
+
+def main(files, size_kb):
+    with tempfile.TemporaryDirectory() as root:
+        served = os.path.join(root, "served")
+        os.mkdir(served)
+        names = [f"file{index}.bin" for index in range(files)]
+        for name in names:
+            with open(os.path.join(served, name), "wb") as f:
+                f.write(os.urandom(size_kb * 1024))
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=served))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            for label, build in (("serial", serial), ("single", single)):
+                target = os.path.join(root, label)
+                pairs = [(f"{base}/{name}", os.path.join(target, name)) for name in names]
+                os.mkdir(target)
+                script = BashEmitter(build(pairs)).emit()
+                line = f"{label:8s} | first {run(script) * 1000:8.1f}ms"
+                if label == "single":
+                    line += f" | unchanged {run(script) * 1000:8.1f}ms"
+                    for _, path in pairs:
+                        with open(path, "rb") as f:
+                            half = f.read(size_kb * 512)
+                        os.remove(path)
+                        with open(path + ".part", "wb") as f:
+                            f.write(half)
+                    line += f" | parts left {run(script) * 1000:8.1f}ms"
+                print(line)
+                _, mismatch, errors = filecmp.cmpfiles(served, target, names, shallow=False)
+                assert not mismatch and not errors, f"{label}: {mismatch + errors} differ from the served files"
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 50, args[1] if len(args) > 1 else 64)
@@ -0,0 +1,84 @@
+# Wall time and disk use of the Git Clone modes against a local bare repository with some history.
+# Every mode clones over file:// (local paths would hardlink the objects instead of transferring
+# them), then runs again on the existing clone, which updates it in place.
+# Usage: python benchmarks/bench_git_clone.py [commits] [files]
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.bash_emitter import BashEmitter
+from core.graph import Graph
+from nodes.flow_nodes import StartNode
+from nodes.utils_node import GitCloneNode
+
+MODES = {
+    "full": {},
+    "shallow": {"depth": "1", "single_branch": "true"},
+    "partial": {"filter": "blob:none"},
+    "sparse": {"depth": "1", "filter": "blob:none", "sparse_paths": "dir0"},
+    "mirror": {"mirror_cache": "{root}/mirrors"},
+}
+
+GIT = ["git", "-c", "user.name=bench", "-c", "user.email=bench@localhost"]
+
+
+def make_repository(root, commits, files):
+    work = os.path.join(root, "work")
+    subprocess.run(GIT + ["init", "-q", work], check=True)
+    for commit in range(commits):
+        for index in range(files):
+            directory = os.path.join(work, f"dir{index % 4}")
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"file{index}.bin"), "wb") as f:
+                f.write(os.urandom(4096))
+        subprocess.run(GIT + ["-C", work, "add", "-A"], check=True)
+        subprocess.run(GIT + ["-C", work, "commit", "-qm", f"commit {commit}"], check=True)
+    bare = os.path.join(root, "origin.git")
+    subprocess.run(GIT + ["clone", "-q", "--bare", work, bare], check=True)
+    subprocess.run(GIT + ["-C", bare, "config", "uploadpack.allowFilter", "true"], check=True)
+    return "file://" + bare
+
+
+def script(url, destination, properties, root):
+    graph = Graph()
+    start = StartNode()
+    node = GitCloneNode()
+    node.properties.update(repo_url=url, destination_path=destination)
+    node.properties.update({key: value.format(root=root) for key, value in properties.items()})
+    graph.add_node(start)
+    graph.add_node(node)
+    graph.add_edge(start.outputs[0], node.inputs[0])
+    return BashEmitter(graph).emit()
+
+
+def run(text):
+    began = time.perf_counter()
+    subprocess.run(["bash", "-c", text], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - began
+
+
+def size_kb(path):
+    return int(subprocess.run(["du", "-sk", path], capture_output=True, text=True, check=True).stdout.split()[0])
+
+
+def main(commits, files):
+    with tempfile.TemporaryDirectory() as root:
+        url = make_repository(root, commits, files)
+        for name, properties in MODES.items():
+            destination = os.path.join(root, name)
+            text = script(url, destination, properties, root)
+            clone = run(text)
+            update = run(text)
+            print(
+                f"{name:8s} | clone {clone * 1000:8.1f}ms | update {update * 1000:8.1f}ms"
+                f" | .git {size_kb(os.path.join(destination, '.git')):8d}KB"
+            )
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 30, args[1] if len(args) > 1 else 40)
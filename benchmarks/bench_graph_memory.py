@@ -0,0 +1,94 @@
+# Memory footprint of large generated graphs: the total retained by tracemalloc, then its share per
+# kind of object (sys.getsizeof of each distinct object, shared empty tuples left out).
+# Usage: python benchmarks/bench_graph_memory.py [node_count]
+import os
+import sys
+from collections import Counter
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.graph import Graph
+from nodes.registry import create_node
+import nodes.command_nodes
+import nodes.flow_nodes
+import nodes.operation_nodes
+import nodes.variable_nodes
+
+# Mix of node shapes found in generated pipelines: exec chain nodes plus the data nodes feeding them
+PATTERN = ["set_variable", "get_variable", "echo", "number_constant", "addition", "run_command"]
+
+
+def build_graph(count):
+    graph = Graph()
+    start = create_node("start")
+    graph.add_node(start)
+    prev = start
+    last_data = None
+    for i in range(count):
+        node = create_node(PATTERN[i % len(PATTERN)])
+        graph.add_node(node)
+        exec_in = node.get_exec_input()
+        if exec_in is not None:
+            graph.add_edge(prev.get_exec_output(), exec_in)
+            prev = node
+        if last_data is not None:
+            for port in node.inputs:
+                if port.port_type == last_data.outputs[0].port_type and not port.connected_edges:
+                    graph.add_edge(last_data.outputs[0], port)
+                    break
+        if node.outputs and node.get_exec_input() is None:
+            last_data = node
+    return graph
+
+
+def breakdown(graph):
+    sizes = Counter()
+    counts = Counter()
+    seen = set()
+
+    def add(kind, obj):
+        if id(obj) in seen or obj == ():
+            return
+        seen.add(id(obj))
+        sizes[kind] += sys.getsizeof(obj)
+        counts[kind] += 1
+
+    add("graph dicts", graph.nodes)
+    add("graph dicts", graph.edges)
+    add("graph dicts", graph.order.rank)
+    for node in graph.nodes.values():
+        add("nodes", node)
+        add("handles", node.id)
+        add("properties", node.properties)
+        add("port tuples", node.inputs)
+        add("port tuples", node.outputs)
+        for port in node.inputs + node.outputs:
+            add("ports", port)
+            add("port edge tuples", port.connected_edges)
+    for edge in graph.edges.values():
+        add("edges", edge)
+        add("handles", edge.id)
+    return sizes, counts
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    graph = build_graph(count)
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    ports = sum(len(n.inputs) + len(n.outputs) for n in graph.nodes.values())
+    print(f"nodes={len(graph.nodes)} ports={ports} edges={len(graph.edges)}")
+    print(f"build time: {elapsed:.2f}s")
+    print(f"retained: {current / 2**20:.1f} MiB ({current / len(graph.nodes):.0f} B/node), peak: {peak / 2**20:.1f} MiB")
+    sizes, counts = breakdown(graph)
+    for kind, size in sizes.most_common():
+        print(f"  {kind:17s} {counts[kind]:9d} objects {size / counts[kind]:6.0f} B each {size / len(graph.nodes):6.0f} B/node")
+
+
+if __name__ == "__main__":
+    main()
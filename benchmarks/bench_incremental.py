@@ -0,0 +1,110 @@
+# Time to regenerate the script after a single edit on a large graph, full rebuild vs
+# IncrementalBashEmitter. The graph is a long exec chain of echo / set_variable / run_command
+# nodes fed by data nodes, with if blocks and functions along the way.
+# Usage: python benchmarks/bench_incremental.py [node_count ...]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nodes.flow_nodes, nodes.command_nodes, nodes.variable_nodes, nodes.operation_nodes, nodes.utils_node
+from nodes.registry import create_node
+from core.graph import Graph
+from core.bash_emitter import BashEmitter, IncrementalBashEmitter
+
+EDITS = 200
+
+
+def add(graph, node_type, **properties):
+    node = create_node(node_type)
+    node.properties.update(properties)
+    graph.add_node(node)
+    return node
+
+
+def build_graph(count, rng):
+    graph = Graph()
+    prev = add(graph, "start")
+    prev_out = 0
+    editable = []
+    while len(graph.nodes) < count:
+        kind = rng.random()
+        if kind < 0.05:
+            node = add(graph, "if")
+            a = add(graph, "number_constant", value=rng.randrange(10))
+            b = add(graph, "number_constant", value=rng.randrange(10))
+            cond = add(graph, "less_than")
+            graph.add_edge(a.outputs[0], cond.inputs[0])
+            graph.add_edge(b.outputs[0], cond.inputs[1])
+            graph.add_edge(cond.outputs[0], node.inputs[1])
+            body = add(graph, "echo", text="inside")
+            graph.add_edge(node.outputs[0], body.inputs[0])
+            editable += [a, body]
+            next_out = 2
+        elif kind < 0.06:
+            function = add(graph, "function", name=f"f{len(graph.nodes)}")
+            body = add(graph, "echo", text="in function")
+            graph.add_edge(function.outputs[0], body.inputs[0])
+            node = add(graph, "call", function=function.properties["name"])
+            editable.append(body)
+            next_out = 0
+        elif kind < 0.4:
+            node = add(graph, "echo", text=f"line {len(graph.nodes)}")
+            value = add(graph, "get_variable", variable="X")
+            graph.add_edge(value.outputs[0], node.inputs[1])
+            next_out = 0
+        elif kind < 0.7:
+            node = add(graph, "set_variable", variable="X", value=str(len(graph.nodes)))
+            next_out = 0
+        else:
+            node = add(graph, "run_command", command=f"cmd {len(graph.nodes)}")
+            next_out = 0
+        graph.add_edge(prev.outputs[prev_out], node.inputs[0])
+        editable.append(node)
+        prev, prev_out = node, next_out
+    return graph, editable
+
+
+def edit(graph, node, rng):
+    key = next(iter(node.properties), None)
+    if key is not None:
+        graph.set_property(node, key, f"{node.properties[key]}_{rng.randrange(1000)}")
+
+
+def run(count):
+    rng = random.Random(count)
+    graph, editable = build_graph(count, rng)
+    targets = [rng.choice(editable) for _ in range(EDITS)]
+
+    t0 = time.perf_counter()
+    script = BashEmitter(graph).emit()
+    full = time.perf_counter() - t0
+
+    incremental = IncrementalBashEmitter(graph)
+    t0 = time.perf_counter()
+    assert incremental.emit() == script
+    cold = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for node in targets:
+        edit(graph, node, rng)
+        incremental.emit()
+    warm = (time.perf_counter() - t0) / EDITS
+    assert incremental.emit() == BashEmitter(graph).emit()
+
+    print(
+        f"{len(graph.nodes):>7} nodes {len(script.splitlines()):>7} lines | full rebuild {full * 1e3:8.2f}ms"
+        f" | incremental cold {cold * 1e3:8.2f}ms | edit + regenerate {warm * 1e3:7.2f}ms"
+    )
+
+
+def main():
+    counts = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 50_000]
+    for count in counts:
+        run(count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# Evaluation of shared data nodes during one emission pass.
+# Builds diamond-shaped arithmetic DAGs (every layer reads both nodes of the layer below) and
+# compares how many times data nodes are evaluated with and without BashContext memoization.
+# Without it every node is evaluated once per path to it, 2^depth times for the top node.
+# The inline expression itself still doubles per layer, only the evaluations become linear.
+# Usage: python benchmarks/bench_memo.py [depth ...]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.bash_context import BashContext
+from core.bash_emitter import BashEmitter
+from core.graph import Graph
+from nodes.operation_nodes import Addition, LessThan, Multiplication, NumberConstant
+from nodes.flow_nodes import IfNode, StartNode
+
+# past this depth the unmemoized run takes minutes
+LEGACY_LIMIT = 22
+
+
+class CountingContext(BashContext):
+    def __init__(self):
+        super().__init__()
+        self.evaluations = 0
+
+    def value_of(self, node):
+        self.evaluations += 1
+        return super().value_of(node)
+
+    def condition_of(self, node):
+        self.evaluations += 1
+        return super().condition_of(node)
+
+
+class PerPathContext(CountingContext):
+    # the previous behaviour: every input is resolved again, no matter how often it was already
+    def value_of(self, node):
+        self.evaluations += 1
+        return node.emit_bash_value(self)
+
+    def condition_of(self, node):
+        self.evaluations += 1
+        return node.emit_condition(self)
+
+
+def build_diamond(depth):
+    graph = Graph()
+    start = StartNode()
+    graph.add_node(start)
+
+    left = NumberConstant()
+    left.properties["value"] = 1
+    right = NumberConstant()
+    right.properties["value"] = 2
+    graph.add_node(left)
+    graph.add_node(right)
+    for _ in range(depth):
+        add = Addition()
+        mul = Multiplication()
+        graph.add_node(add)
+        graph.add_node(mul)
+        for node in (add, mul):
+            graph.add_edge(left.outputs[0], node.inputs[0])
+            graph.add_edge(right.outputs[0], node.inputs[1])
+        left, right = add, mul
+
+    less = LessThan()
+    graph.add_node(less)
+    graph.add_edge(left.outputs[0], less.inputs[0])
+    graph.add_edge(right.outputs[0], less.inputs[1])
+
+    branch = IfNode()
+    graph.add_node(branch)
+    graph.add_edge(start.outputs[0], branch.inputs[0])
+    graph.add_edge(less.outputs[0], branch.inputs[1])
+    return graph, less
+
+
+def measure(context_class, graph, condition_node):
+    context = context_class()
+    began = time.perf_counter()
+    condition = context.condition_of(condition_node)
+    elapsed = time.perf_counter() - began
+    return context.evaluations, elapsed, condition
+
+
+def main(depths):
+    for depth in depths:
+        graph, condition_node = build_diamond(depth)
+        evaluations, elapsed, condition = measure(CountingContext, graph, condition_node)
+
+        began = time.perf_counter()
+        BashEmitter(graph).emit()
+        emit_time = time.perf_counter() - began
+
+        line = (
+            f"depth {depth:3d} | {len(condition):>10d} chars"
+            f" | memoized {evaluations:>8d} evaluations {elapsed * 1000:9.2f}ms"
+            f" (full emit {emit_time * 1000:9.2f}ms)"
+        )
+        if depth <= LEGACY_LIMIT:
+            legacy_evaluations, legacy_time, legacy_condition = measure(PerPathContext, graph, condition_node)
+            assert legacy_condition == condition
+            line += f" | per path {legacy_evaluations:>9d} evaluations {legacy_time * 1000:9.2f}ms"
+        else:
+            line += " | per path skipped"
+        print(line)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [4, 8, 12, 16, 20])
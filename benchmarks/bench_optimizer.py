@@ -0,0 +1,79 @@
+# Run time of the generated script at each optimization level.
+# The graph is a chain of If nodes whose conditions compare constant arithmetic trees, half of
+# them always false; every script is run by bash the given number of times.
+# Usage: python benchmarks/bench_optimizer.py [if_count] [runs]
+import os
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.bash_emitter import BashEmitter
+from core.graph import Graph
+from core.optimizer import LEVELS, optimize
+from nodes.command_nodes import EchoNode
+from nodes.flow_nodes import IfNode, StartNode
+from nodes.operation_nodes import Addition, Equals, LessThan, Multiplication, NumberConstant, Subtraction
+
+
+def arithmetic(graph, rng, depth):
+    if depth == 0:
+        node = NumberConstant()
+        node.properties["value"] = rng.randint(1, 100)
+        graph.add_node(node)
+        return node
+    node = rng.choice((Addition, Subtraction, Multiplication))()
+    graph.add_node(node)
+    for port in node.inputs:
+        graph.add_edge(arithmetic(graph, rng, depth - 1).outputs[0], port)
+    return node
+
+
+def build_graph(count, rng):
+    graph = Graph()
+    previous = StartNode()
+    graph.add_node(previous)
+    output = 0
+    for index in range(count):
+        comparison = rng.choice((LessThan, Equals))()
+        graph.add_node(comparison)
+        for port in comparison.inputs:
+            graph.add_edge(arithmetic(graph, rng, 3).outputs[0], port)
+        branch = IfNode()
+        graph.add_node(branch)
+        graph.add_edge(previous.outputs[output], branch.inputs[0])
+        graph.add_edge(comparison.outputs[0], branch.inputs[1])
+        for side in (0, 1):
+            echo = EchoNode()
+            echo.properties["text"] = f"{index} {side}"
+            graph.add_node(echo)
+            graph.add_edge(branch.outputs[side], echo.inputs[0])
+        previous, output = branch, 2
+    return graph
+
+
+def main(count, runs):
+    graph = build_graph(count, random.Random(count))
+    outputs = set()
+    for level in LEVELS:
+        began = time.perf_counter()
+        script = BashEmitter(optimize(graph, level)).emit()
+        build_time = time.perf_counter() - began
+
+        began = time.perf_counter()
+        for _ in range(runs):
+            result = subprocess.run(["bash", "-c", script], capture_output=True, text=True, check=True)
+        run_time = (time.perf_counter() - began) / runs
+        outputs.add(result.stdout)
+        print(
+            f"level {level} | {len(script):8d} chars, {script.count('$(('):6d} expansions"
+            f" | build {build_time * 1000:8.1f}ms | run {run_time * 1000:8.2f}ms"
+        )
+    assert len(outputs) == 1, "the levels do not print the same thing"
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 500, args[1] if len(args) > 1 else 20)
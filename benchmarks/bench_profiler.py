@@ -0,0 +1,85 @@
+# Cost of the profiling markers. The graph is a For loop over the given number of iterations
+# whose body is a chain of cheap Run Command nodes (":" and an arithmetic assignment), run by
+# bash as emitted by BashEmitter (what Run and Export write) and by ProfilingBashEmitter with
+# VISH_PROFILE set (what Profile Script runs). Both must print the same output; the last column is
+# the time each marker adds.
+# Usage: python benchmarks/bench_profiler.py [iterations ...]
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nodes.command_nodes
+import nodes.flow_nodes
+from nodes.registry import create_node
+from core.bash_emitter import BashEmitter
+from core.graph import Graph
+from core.profiler import ProfilingBashEmitter, read_profile_file
+
+BODY = 4
+
+
+def add(graph, node_type, **properties):
+    node = create_node(node_type)
+    node.properties.update(properties)
+    graph.add_node(node)
+    return node
+
+
+def build_graph(iterations):
+    graph = Graph()
+    start = add(graph, "start")
+    loop = add(graph, "for", variable="i", list=f"$(seq {iterations})")
+    graph.add_edge(start.outputs[0], loop.inputs[0])
+    previous = loop.outputs[0]
+    for index in range(BODY):
+        command = ":" if index % 2 else "total=$((total + i))"
+        node = add(graph, "run_command", command=command)
+        graph.add_edge(previous, node.inputs[0])
+        previous = node.outputs[0]
+    done = add(graph, "run_command", command='echo "total=$total"')
+    graph.add_edge(loop.outputs[2], done.inputs[0])
+    return graph
+
+
+def run(script, env=None):
+    began = time.perf_counter()
+    result = subprocess.run(
+        ["bash", "-c", script], capture_output=True, text=True,
+        env=dict(os.environ, **env) if env else None,
+    )
+    return time.perf_counter() - began, result.stdout, result.returncode
+
+
+def main(counts):
+    for iterations in counts:
+        graph = build_graph(iterations)
+        plain = BashEmitter(graph).emit()
+        profiled = ProfilingBashEmitter(graph).emit()
+        fd, path = tempfile.mkstemp(prefix="vish_profile_", suffix=".log")
+        os.close(fd)
+        try:
+            plain_time, plain_output, plain_code = run(plain)
+            marked_time, marked_output, marked_code = run(profiled, {"VISH_PROFILE": path})
+            with open(path) as f:
+                markers = sum(1 for _ in f)
+            profiles = read_profile_file(path)
+        finally:
+            os.remove(path)
+        assert plain_output == marked_output and plain_code == marked_code, (
+            f"{iterations} iterations: the profiled script does not behave as the plain one"
+        )
+        assert profiles and markers, f"{iterations} iterations: no profile written (bash 5 needed)"
+        marked_cost = (marked_time - plain_time) / markers * 1e6
+        print(
+            f"{iterations:7d} iterations | plain {plain_time * 1000:8.1f}ms"
+            f" | profiled {marked_time * 1000:8.1f}ms"
+            f" | {markers:8d} markers, {marked_cost:5.1f}us each"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000])
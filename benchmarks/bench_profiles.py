@@ -0,0 +1,140 @@
+# Processes started and wall time of the generated scripts, "compat" vs "fast" profile.
+# Every sample graph is emitted with both profiles and run by bash; both runs must print the same.
+# Forks are read from /proc/sys/kernel/ns_last_pid (Linux only): the best of the runs is kept,
+# anything else starting processes on the machine at the same time inflates the count.
+# Usage: python benchmarks/bench_profiles.py [iterations] [runs]
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.bash_context import PROFILES
+from core.bash_emitter import BashEmitter
+from core.graph import Graph
+from nodes.command_nodes import EchoNode
+from nodes.flow_nodes import ForNode, IfNode, StartNode
+from nodes.operation_nodes import Addition, LessThan, NumberConstant
+from nodes.utils_node import SleepNode, ToInt
+from nodes.variable_nodes import FileExistsNode, GetVariableNode
+
+LAST_PID = "/proc/sys/kernel/ns_last_pid"
+PID_MAX = "/proc/sys/kernel/pid_max"
+
+
+def loop(iterations):
+    graph = Graph()
+    start = StartNode()
+    loop = ForNode()
+    loop.properties["list"] = f"{{1..{iterations}}}"
+    loop.properties["variable"] = "i"
+    graph.add_node(start)
+    graph.add_node(loop)
+    graph.add_edge(start.outputs[0], loop.inputs[0])
+    return graph, loop
+
+
+def add_body(graph, loop, nodes):
+    previous, output = loop, 0
+    for node in nodes:
+        graph.add_node(node)
+        graph.add_edge(previous.outputs[output], node.inputs[0])
+        previous, output = node, 0
+
+
+def sleeps(iterations):
+    graph, body = loop(iterations)
+    sleep = SleepNode()
+    sleep.properties["duration"] = "0.001"
+    add_body(graph, body, [sleep])
+    return graph
+
+
+def file_checks(iterations):
+    graph, body = loop(iterations)
+    exists = FileExistsNode()
+    exists.properties["path"] = "/etc/hostname"
+    branch = IfNode()
+    echo = EchoNode()
+    echo.properties["text"] = "found $i"
+    add_body(graph, body, [branch])
+    graph.add_node(exists)
+    graph.add_edge(exists.outputs[0], branch.inputs[1])
+    graph.add_node(echo)
+    graph.add_edge(branch.outputs[0], echo.inputs[0])
+    return graph
+
+
+def conversions(iterations):
+    graph, body = loop(iterations)
+    variable = GetVariableNode()
+    variable.properties["variable"] = "i"
+    to_int = ToInt()
+    addition = Addition()
+    less = LessThan()
+    limit = NumberConstant()
+    limit.properties["value"] = iterations
+    branch = IfNode()
+    echo = EchoNode()
+    echo.properties["text"] = "small $i"
+    for node in (variable, to_int, addition, less, limit):
+        graph.add_node(node)
+    graph.add_edge(variable.outputs[0], to_int.inputs[0])
+    graph.add_edge(to_int.outputs[0], addition.inputs[0])
+    graph.add_edge(to_int.outputs[0], addition.inputs[1])
+    graph.add_edge(addition.outputs[0], less.inputs[0])
+    graph.add_edge(limit.outputs[0], less.inputs[1])
+    add_body(graph, body, [branch])
+    graph.add_edge(less.outputs[0], branch.inputs[1])
+    graph.add_node(echo)
+    graph.add_edge(branch.outputs[0], echo.inputs[0])
+    return graph
+
+
+SAMPLES = {"sleep": sleeps, "file exists": file_checks, "to int": conversions}
+
+
+def read_number(path):
+    try:
+        with open(path) as f:
+            return int(f.read())
+    except OSError:
+        return None
+
+
+def run(script, runs):
+    pid_max = read_number(PID_MAX)
+    forks = None
+    best = None
+    for _ in range(runs):
+        before = read_number(LAST_PID)
+        began = time.perf_counter()
+        result = subprocess.run(["bash", "-c", script], capture_output=True, text=True, check=True)
+        elapsed = time.perf_counter() - began
+        after = read_number(LAST_PID)
+        best = elapsed if best is None else min(best, elapsed)
+        if before is not None and after is not None and pid_max:
+            # pids wrap around at pid_max; the bash process itself is not the script's doing
+            started = (after - before) % pid_max - 1
+            forks = started if forks is None else min(forks, started)
+    return forks, best, result.stdout
+
+
+def main(iterations, runs):
+    for name, build in SAMPLES.items():
+        graph = build(iterations)
+        outputs = set()
+        line = f"{name:12s}"
+        for profile in PROFILES:
+            forks, elapsed, output = run(BashEmitter(graph, profile).emit(), runs)
+            outputs.add(output)
+            forks = "n/a" if forks is None else f"{forks:6d}"
+            line += f" | {profile} {forks} forks {elapsed * 1000:8.1f}ms"
+        print(line)
+        assert len(outputs) == 1, f"{name}: the profiles do not print the same thing"
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 200, args[1] if len(args) > 1 else 5)
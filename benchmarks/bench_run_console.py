@@ -0,0 +1,75 @@
+# Time to show coloured script output as it arrives, in 4 KB chunks: the whole output converted
+# again with ansi_to_html and set with setHtml on a QTextEdit after every chunk, as the run output
+# used to be shown, and the RunConsole keeping its last lines in a ring buffer. Both must show the
+# same text (the console keeping it all, its cap is raised here).
+# Usage: python benchmarks/bench_run_console.py [lines...]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication, QTextEdit
+from core.ansi_to_html import ansi_to_html
+from core.config import Config
+from ui.run_console import RunConsole
+
+CHUNK = 4096
+# the whole output converted again per chunk grows with the square of its size
+REPLACE_MAX_LINES = 10000
+
+
+def output(lines):
+    return "".join(
+        f"\x1b[1;32m[{index:6d}]\x1b[0m step \x1b[38;5;{index % 256}mdone\x1b[0m in {index % 97} ms\n"
+        for index in range(lines)
+    )
+
+
+def chunks(text):
+    return [text[start:start + CHUNK] for start in range(0, len(text), CHUNK)]
+
+
+def replace(view, text):
+    shown = ""
+    began = time.perf_counter()
+    for chunk in chunks(text):
+        shown += chunk
+        view.setHtml(ansi_to_html(shown))
+    return time.perf_counter() - began
+
+
+def console(view, text):
+    began = time.perf_counter()
+    for chunk in chunks(text):
+        view.write(chunk)
+    return time.perf_counter() - began
+
+
+def main(counts):
+    app = QApplication.instance() or QApplication(sys.argv)
+    for lines in counts:
+        text = output(lines)
+        line = f"{lines:7d} lines"
+        shown = set()
+        Config.RUN_CONSOLE_MAX_LINES = lines + 1
+        for name, run in (("replace", replace), ("console", console)):
+            if name == "replace" and lines > REPLACE_MAX_LINES:
+                line += f" | {name} {'skipped':>9s}"
+                continue
+            if name == "console":
+                view = RunConsole()
+                view.resize(800, 400)
+                view.show()
+            else:
+                view = QTextEdit()
+                view.setLineWrapMode(QTextEdit.NoWrap)
+            line += f" | {name} {run(view, text) * 1000:7.1f}ms"
+            shown.add((view.text() if name == "console" else view.toPlainText()).rstrip("\n"))
+        print(line)
+        assert len(shown) == 1, f"{lines} lines: the views do not show the same text"
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [2000, 10000, 50000, 100000])
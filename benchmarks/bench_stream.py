@@ -0,0 +1,55 @@
+# Peak memory of generating a script, BashEmitter.emit() vs BashEmitter.emit_to(file).
+# Uses the graphs of bench_incremental.py; only the memory allocated while emitting is counted.
+# Usage: python benchmarks/bench_stream.py [node_count ...]
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_incremental import build_graph
+from core.bash_emitter import BashEmitter
+
+
+def measure(generate):
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    began = time.perf_counter()
+    generate()
+    elapsed = time.perf_counter() - began
+    peak = tracemalloc.get_traced_memory()[1] - before
+    return peak, elapsed
+
+
+def run(count):
+    graph, _ = build_graph(count, random.Random(count))
+    emitter = BashEmitter(graph)
+
+    def to_string():
+        with open(os.devnull, "w") as sink:
+            sink.write(emitter.emit())
+
+    def to_file():
+        with open(os.devnull, "w") as sink:
+            emitter.emit_to(sink)
+
+    joined_peak, joined_time = measure(to_string)
+    streamed_peak, streamed_time = measure(to_file)
+    print(
+        f"{len(graph.nodes):7d} nodes | emit() peak {joined_peak / 1024 / 1024:8.2f}MB {joined_time * 1000:8.1f}ms"
+        f" | emit_to() peak {streamed_peak / 1024 / 1024:8.2f}MB {streamed_time * 1000:8.1f}ms"
+    )
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    tracemalloc.start()
+    for count in counts:
+        run(count)
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
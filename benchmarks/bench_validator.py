@@ -0,0 +1,116 @@
+# Cost of validating a connection attempt on large graphs.
+# Compares the previous approach (full reachability search + scan of every edge for port
+# occupancy) with GraphValidator backed by the incremental topological order.
+# Usage: python benchmarks/bench_validator.py [node_count ...]
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.graph import Graph, Node
+from core.port_types import PortType
+from core.validator import GraphValidator
+
+ATTEMPTS = 2000
+# the previous check is O(V * E) per attempt, past this size it takes hours
+LEGACY_LIMIT = 10_000
+
+
+def build_graph(count, rng):
+    graph = Graph()
+    nodes = []
+    for i in range(count):
+        node = Node("bench", f"n{i}")
+        node.add_output("Out", PortType.INT)
+        for _ in range(3):
+            node.add_input("In", PortType.INT)
+        graph.add_node(node)
+        nodes.append(node)
+    for j in range(1, count):
+        for port in nodes[j].inputs[:2]:
+            i = rng.randrange(max(0, j - 50), j)
+            graph.add_edge(nodes[i].outputs[0], port)
+    return graph, nodes
+
+
+def legacy_is_valid(graph, src, dst):
+    # reachability from dst to src over every edge, then a scan of all edges for occupancy
+    seen = {dst.node.id}
+    stack = [dst.node]
+    while stack:
+        node = stack.pop()
+        if node is src.node:
+            return False
+        for edge in graph.edges.values():
+            if edge.source.node is node and edge.target.node.id not in seen:
+                seen.add(edge.target.node.id)
+                stack.append(edge.target.node)
+    for edge in graph.edges.values():
+        if edge.target is dst:
+            return False
+    return True
+
+
+def attempts(nodes, rng):
+    pairs = []
+    for _ in range(ATTEMPTS):
+        a, b = rng.sample(nodes, 2)
+        pairs.append((a.outputs[0], b.inputs[2]))
+    return pairs
+
+
+def run(count):
+    rng = random.Random(count)
+    t0 = time.perf_counter()
+    graph, nodes = build_graph(count, rng)
+    build = time.perf_counter() - t0
+    pairs = attempts(nodes, rng)
+
+    t0 = time.perf_counter()
+    graph.order.would_create_cycle(nodes[0].id, nodes[1].id)
+    first = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for src, dst in pairs:
+        GraphValidator.is_valid_connection(
+            graph,
+            SimpleNamespace(port=src, is_input=False),
+            SimpleNamespace(port=dst, is_input=True),
+        )
+    new = (time.perf_counter() - t0) / len(pairs)
+
+    # accepted connections keep the order up to date as they are inserted
+    t0 = time.perf_counter()
+    inserted = 0
+    for src, dst in pairs[:200]:
+        if not dst.connected_edges and not graph.order.would_create_cycle(src.node.id, dst.node.id):
+            graph.add_edge(src, dst)
+            inserted += 1
+    insert = (time.perf_counter() - t0) / max(1, inserted)
+
+    if count <= LEGACY_LIMIT:
+        legacy_pairs = pairs[: max(5, 200_000 // count)]
+        t0 = time.perf_counter()
+        for src, dst in legacy_pairs:
+            legacy_is_valid(graph, src, dst)
+        legacy = f"{(time.perf_counter() - t0) / len(legacy_pairs) * 1e3:9.2f}ms"
+    else:
+        legacy = "  skipped"
+
+    print(
+        f"{count:>7} nodes {len(graph.edges):>7} edges | build {build:6.2f}s | first query (builds order) {first * 1e3:7.2f}ms"
+        f" | check {new * 1e6:8.1f}us | check+insert {insert * 1e6:8.1f}us | legacy check {legacy}"
+    )
+
+
+def main():
+    counts = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    for count in counts:
+        run(count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# Headless entry point: builds the scripts of Vish projects without loading Qt.
+#   vish build project/ [-o out.sh]
+#   vish build --all projects/ [-o out_dir/] [-j jobs]
+import time
+_STARTED = time.perf_counter()
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.bash_context import PROFILES
+from core.bash_emitter import BashEmitter
+from core.config import Config, ConfigManager
+from core.debug import Info
+from core.optimizer import LEVELS, optimize
+from core.serializer import Serializer
+from nodes.registry import NodeFactory, load_node_modules
+
+load_node_modules()
+COLD_START = time.perf_counter() - _STARTED
+
+
+def graph_path(project: Path) -> Path:
+    # a project directory (project.json names its graph file) or a graph file itself
+    if project.is_file():
+        return project
+    project_file = project / "project.json"
+    if project_file.exists():
+        return project / json.loads(project_file.read_text()).get("graph_file", "graph.json")
+    return project / "graph.json"
+
+
+def find_projects(directory: Path):
+    return sorted(path.parent for path in directory.rglob("project.json"))
+
+
+def output_path(directory: Path, project: Path, output_dir: Path) -> Path:
+    # the project's place under the scanned directory, so projects of the same name in different
+    # directories are not built to the same script
+    relative = project.relative_to(directory)
+    if relative == Path("."):
+        return output_dir / f"{directory.resolve().name}.sh"
+    return output_dir / relative.parent / f"{relative.name}.sh"
+
+
+def build(project: Path, output: str, level: int = 0, profile: str = None):
+    began = time.perf_counter()
+    graph, _ = Serializer.deserialize(graph_path(project).read_text(), NodeFactory)
+    emitter = BashEmitter(optimize(graph, level), profile)
+    if output == "-":
+        emitter.emit_to(sys.stdout)
+    else:
+        # written next to the target and renamed, a failed build never leaves half a script behind
+        partial = f"{output}.partial"
+        with open(partial, "w") as f:
+            emitter.emit_to(f)
+        os.chmod(partial, 0o755)
+        os.replace(partial, output)
+    return time.perf_counter() - began
+
+
+def _build_job(project: Path, output: str, level: int, profile: str):
+    try:
+        return project, output, build(project, output, level, profile), None
+    except Exception as e:
+        return project, output, None, f"{type(e).__name__}: {e}"
+
+
+def _init_worker(config_path):
+    # spawned workers (macOS, Windows) start from a fresh interpreter
+    if config_path:
+        load_config(config_path)
+
+
+def load_config(config_path: str):
+    Info.CONFIG_PATH = os.path.abspath(config_path)
+    ConfigManager.load_config()
+
+
+def build_all(directory: Path, output_dir: Path, jobs: int, config_path, level: int, profile: str) -> int:
+    # multiprocessing is a large import, single builds do not pay for it
+    from concurrent.futures import ProcessPoolExecutor
+
+    projects = find_projects(directory)
+    if not projects:
+        print(f"No project found in {directory}", file=sys.stderr)
+        return 1
+    outputs = [str(output_path(directory, project, output_dir)) for project in projects]
+    seen = {}
+    for project, output in zip(projects, outputs):
+        if output in seen:
+            print(f"{seen[output]} and {project} would both be built to {output}", file=sys.stderr)
+            return 1
+        seen[output] = project
+    for output in outputs:
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(config_path,)) as pool:
+        for project, output, elapsed, error in pool.map(
+            _build_job, projects, outputs, [level] * len(projects), [profile] * len(projects), chunksize=4
+        ):
+            if error:
+                failed += 1
+                print(f"FAILED {project}: {error}", file=sys.stderr)
+            else:
+                print(f"built {project} -> {output} in {elapsed * 1000:.1f}ms", file=sys.stderr)
+    print(f"{len(projects) - failed}/{len(projects)} scripts built", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="vish")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="Generate the Bash script of a project")
+    build_parser.add_argument("path", type=Path, help="Project directory, graph file, or with --all a directory of projects")
+    build_parser.add_argument("-o", "--output", help="Output script, - for stdout (default). With --all, the output directory")
+    build_parser.add_argument("--all", action="store_true", help="Build every project found under path")
+    build_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Parallel builds with --all")
+    build_parser.add_argument("--config", help="Vish config.json to use instead of the defaults")
+    build_parser.add_argument(
+        "-O", "--optimize", type=int, choices=LEVELS,
+        help="0: as drawn, 1: fold constants, 2: also remove dead branches and unreachable nodes (default: the config)",
+    )
+    build_parser.add_argument("--profile", choices=PROFILES, help="Script profile (default: the config)")
+    args = parser.parse_args(argv)
+
+    if args.config:
+        load_config(args.config)
+    level = Config.OPTIMIZATION_LEVEL if args.optimize is None else args.optimize
+    profile = args.profile or Config.EMIT_PROFILE
+
+    began = time.perf_counter()
+    if args.all:
+        status = build_all(args.path, Path(args.output) if args.output else args.path, args.jobs, args.config, level, profile)
+    else:
+        try:
+            elapsed = build(args.path, args.output or "-", level, profile)
+        except Exception as e:
+            print(f"FAILED {args.path}: {type(e).__name__}: {e}", file=sys.stderr)
+            return 1
+        print(f"built {args.path} in {elapsed * 1000:.1f}ms", file=sys.stderr)
+        status = 0
+    print(
+        f"cold start {COLD_START * 1000:.1f}ms, total {(time.perf_counter() - _STARTED) * 1000:.1f}ms"
+        f" (builds {(time.perf_counter() - began) * 1000:.1f}ms)",
+        file=sys.stderr,
+    )
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,7 +23,7 @@ class AddNodeCommand(QUndoCommand):
 
 
 class RemoveNodeCommand(QUndoCommand):
-    def __init__(self, view, node_id: str):
+    def __init__(self, view, node_id: int):
         super().__init__("Remove Node")
         self.view = view
         self.graph = view.graph
@@ -50,12 +50,13 @@ class RemoveNodeCommand(QUndoCommand):
         if not self.node:
             return
         self.view._suspend_edge_undo = True
-        self.graph.add_node(self.node)
-        self.view.add_node_item(self.node)
-        for src_port, tgt_port in self.edge_port_pairs:
-            edge = self.graph.add_edge(src_port, tgt_port)
-            if edge:
-                self.view.add_edge_item(edge)
+        with self.graph.batch():
+            self.graph.add_node(self.node)
+            self.view.add_node_item(self.node)
+            for src_port, tgt_port in self.edge_port_pairs:
+                edge = self.graph.add_edge(src_port, tgt_port)
+                if edge:
+                    self.view.add_edge_item(edge)
         self.view._suspend_edge_undo = False
 
 
@@ -84,7 +85,7 @@ class AddEdgeCommand(QUndoCommand):
         self.edge_id = None
 
 class MoveNodeCommand(QUndoCommand):
-    def __init__(self, view, node_id: str, old_pos, new_pos):
+    def __init__(self, view, node_id: int, old_pos, new_pos):
         super().__init__("Move Node")
         self.view = view
         self.graph = view.graph
@@ -102,8 +103,7 @@ class MoveNodeCommand(QUndoCommand):
         node = self.graph.nodes.get(self.node_id)
         if not node:
             return
-        node.x = pos.x()
-        node.y = pos.y()
+        self.graph.set_position(node, pos.x(), pos.y())
         item = self.view.node_items.get(self.node_id)
         if item:
             item.setPos(pos)
@@ -140,46 +140,48 @@ class PasteCommand(QUndoCommand):
         else:
             dx, dy = getattr(self.view, "paste_offset", (30, 30))
 
-        for nd in nodes_data:
-            node = self.node_factory(nd["type"])
-            node.properties.update(nd.get("properties", {}))
-            node.x = nd.get("x", 0) + dx
-            node.y = nd.get("y", 0) + dy
+        with self.graph.batch():
+            for nd in nodes_data:
+                node = self.node_factory(nd["type"])
+                node.properties.update(nd.get("properties", {}))
+                node.x = nd.get("x", 0) + dx
+                node.y = nd.get("y", 0) + dy
 
-            self.graph.add_node(node)
-            self.view.add_node_item(node)
+                self.graph.add_node(node)
+                self.view.add_node_item(node)
 
-            self._id_map[nd["id"]] = node
-            self.created_node_ids.append(node.id)
+                self._id_map[nd["id"]] = node
+                self.created_node_ids.append(node.id)
 
-        for ed in self.data.get("edges", []):
-            src_node = self._id_map.get(ed.get("source_node"))
-            tgt_node = self._id_map.get(ed.get("target_node"))
-            if not src_node or not tgt_node:
-                continue
+            for ed in self.data.get("edges", []):
+                src_node = self._id_map.get(ed.get("source_node"))
+                tgt_node = self._id_map.get(ed.get("target_node"))
+                if not src_node or not tgt_node:
+                    continue
 
-            src_i = ed.get("source_output_index")
-            tgt_i = ed.get("target_input_index")
-            if src_i is None or tgt_i is None:
-                continue
-            if src_i >= len(src_node.outputs) or tgt_i >= len(tgt_node.inputs):
-                continue
+                src_i = ed.get("source_output_index")
+                tgt_i = ed.get("target_input_index")
+                if src_i is None or tgt_i is None:
+                    continue
+                if src_i >= len(src_node.outputs) or tgt_i >= len(tgt_node.inputs):
+                    continue
 
-            src_port = src_node.outputs[src_i]
-            tgt_port = tgt_node.inputs[tgt_i]
+                src_port = src_node.outputs[src_i]
+                tgt_port = tgt_node.inputs[tgt_i]
 
-            edge = self.graph.add_edge(src_port, tgt_port)
-            if edge:
-                self.view.add_edge_item(edge)
-                self.created_edge_ids.append(edge.id)
+                edge = self.graph.add_edge(src_port, tgt_port)
+                if edge:
+                    self.view.add_edge_item(edge)
+                    self.created_edge_ids.append(edge.id)
 
     def undo(self):
-        for eid in list(self.created_edge_ids):
-            self.graph.remove_edge(eid)
-            self.view.remove_edge_item(eid)
-        self.created_edge_ids.clear()
-
-        for nid in list(self.created_node_ids):
-            self.view.remove_node_item(nid)
-        self.created_node_ids.clear()
+        with self.graph.batch():
+            for eid in list(self.created_edge_ids):
+                self.graph.remove_edge(eid)
+                self.view.remove_edge_item(eid)
+            self.created_edge_ids.clear()
+
+            for nid in list(self.created_node_ids):
+                self.view.remove_node_item(nid)
+            self.created_node_ids.clear()
         self._id_map.clear()
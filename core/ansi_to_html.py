@@ -1,7 +1,16 @@
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
-ANSI_REGEX = re.compile(r"\x1b\[([0-9;]*)m")
+# CSI sequences (SGR "m" and the cursor / erase ones, dropped), OSC strings ended by BEL or ST,
+# escapes with intermediate bytes (character set selections...) and the two character ones
+# ("\x1b7" / "\x1b8" of tput sc / rc, "\x1b=" ...)
+ANSI_REGEX = re.compile(r"\x1b(?:\[([0-?]*)[ -/]*([@-~])|\][^\x07\x1b]*(?:\x07|\x1b\\)|[ -/]+[0-~]|[0-~])")
+# the start of an escape that the next chunk can still complete
+_PARTIAL = re.compile(r"\x1b(?:\[[0-?]*[ -/]*|\][^\x07\x1b]*\x1b?|[ -/]*)\Z")
+# an escape cut off at the end of a chunk is kept for the next one, up to this length
+MAX_PENDING = 1024
+# SGR sequences are resolved once per style they apply to, truecolor gradients could make it grow
+MAX_TRANSITIONS = 4096
 
 COLOR_MAP = {
     30: "#000000",
@@ -23,54 +32,170 @@ COLOR_MAP = {
     97: "#ffffff",
 }
 
-@dataclass
+# the xterm 256 colour palette: the 16 above, a 6x6x6 cube, then 24 greys
+_CUBE = (0, 95, 135, 175, 215, 255)
+PALETTE_256 = (
+    [COLOR_MAP[code] for code in range(30, 38)]
+    + [COLOR_MAP[code] for code in range(90, 98)]
+    + [f"#{_CUBE[i // 36]:02x}{_CUBE[i // 6 % 6]:02x}{_CUBE[i % 6]:02x}" for i in range(216)]
+    + [f"#{8 + 10 * i:02x}{8 + 10 * i:02x}{8 + 10 * i:02x}" for i in range(24)]
+)
+
+@dataclass(frozen=True)
 class Style:
     color: str | None = None
+    background: str | None = None
     bold: bool = False
+    dim: bool = False
+    italic: bool = False
     underline: bool = False
+    inverse: bool = False
+    strike: bool = False
 
     def to_css(self):
+        color, background = self.color, self.background
+        if self.inverse:
+            color, background = background or "#ffffff", color or "#000000"
         css = []
-        if self.color:
-            css.append(f"color:{self.color}")
+        if color:
+            css.append(f"color:{color}")
+        if background:
+            css.append(f"background-color:{background}")
         if self.bold:
             css.append("font-weight:bold")
-        if self.underline:
-            css.append("text-decoration:underline")
+        if self.dim:
+            css.append("opacity:0.6")
+        if self.italic:
+            css.append("font-style:italic")
+        decorations = " ".join(name for name, on in (("underline", self.underline), ("line-through", self.strike)) if on)
+        if decorations:
+            css.append(f"text-decoration:{decorations}")
         return ";".join(css)
 
+
+DEFAULT_STYLE = Style()
+
+_ATTRIBUTES = {
+    1: {"bold": True}, 2: {"dim": True}, 3: {"italic": True}, 4: {"underline": True},
+    7: {"inverse": True}, 9: {"strike": True},
+    22: {"bold": False, "dim": False}, 23: {"italic": False}, 24: {"underline": False},
+    27: {"inverse": False}, 29: {"strike": False},
+    39: {"color": None}, 49: {"background": None},
+}
+
+
+def _extended_color(values: list[str]) -> tuple[str | None, int]:
+    # the colour of "5;n" or "2;r;g;b" at the start of values, and how many values it takes
+    try:
+        if values[0] == "5":
+            return PALETTE_256[int(values[1])], 2
+        if values[0] == "2":
+            red, green, blue = (min(int(value or 0), 255) for value in values[1:4])
+            return f"#{red:02x}{green:02x}{blue:02x}", 4
+    except (IndexError, ValueError):
+        pass
+    return None, len(values)
+
+
+class AnsiParser:
+    # Splits terminal output into runs of text sharing a style. The style and an escape sequence
+    # cut off at the end of a chunk carry over to the next call of feed.
+    def __init__(self):
+        self.style = DEFAULT_STYLE
+        self._pending = ""
+        self._transitions = {}
+
     def reset(self):
-        self.color = None
-        self.bold = False
-        self.underline = False
+        self.style = DEFAULT_STYLE
+        self._pending = ""
 
+    def feed(self, text: str) -> list[tuple[str, Style]]:
+        if self._pending:
+            text = self._pending + text
+            self._pending = ""
+        partial = _PARTIAL.search(text, max(0, len(text) - MAX_PENDING))
+        if partial:
+            self._pending = text[partial.start():]
+            text = text[:partial.start()]
+        return self._runs(text)
 
-def ansi_to_html(text: str) -> str:
-    style = Style()
-    output = []
-    last = 0
+    def flush(self) -> list[tuple[str, Style]]:
+        # the output ended: an escape still waiting for the rest of it is taken as it is
+        text, self._pending = self._pending, ""
+        return self._runs(text)
 
-    for match in ANSI_REGEX.finditer(text):
-        output.append(escape(text[last:match.start()]))
+    def _runs(self, text: str) -> list[tuple[str, Style]]:
+        runs = []
+        last = 0
+        for match in ANSI_REGEX.finditer(text):
+            if match.start() > last:
+                runs.append((_plain(text[last:match.start()]), self.style))
+            if match.group(2) == "m":
+                key = (self.style, match.group(1))
+                style = self._transitions.get(key)
+                if style is None:
+                    if len(self._transitions) >= MAX_TRANSITIONS:
+                        self._transitions.clear()
+                    style = self._transitions[key] = self._apply(match.group(1))
+                self.style = style
+            last = match.end()
+        if last < len(text):
+            runs.append((_plain(text[last:]), self.style))
+        return runs
 
-        codes = match.group(1)
-        for code in map(int, filter(None, codes.split(";") or ["0"])):
-            if code == 0:
-                style.reset()
-            elif code == 1:
-                style.bold = True
-            elif code == 4:
-                style.underline = True
-            elif code in COLOR_MAP:
-                style.color = COLOR_MAP[code]
+    def _apply(self, parameters: str) -> Style:
+        style = self.style
+        codes = parameters.split(";") if parameters else ["0"]
+        index = 0
+        while index < len(codes):
+            code = codes[index]
+            index += 1
+            if ":" in code:
+                # "38:5:n" / "38:2:[colour space]:r:g:b"
+                values = code.split(":")
+                if values[0] in ("38", "48") and len(values) > 1:
+                    if values[1] == "2" and len(values) > 5:
+                        del values[2]
+                    color, _ = _extended_color(values[1:])
+                    style = replace(style, **{"color" if values[0] == "38" else "background": color})
+                elif values[0] == "4":
+                    style = replace(style, underline=values[1:] != ["0"])
+                continue
+            try:
+                number = int(code or 0)
+            except ValueError:
+                continue
+            if number == 0:
+                style = DEFAULT_STYLE
+            elif number in _ATTRIBUTES:
+                style = replace(style, **_ATTRIBUTES[number])
+            elif number in COLOR_MAP:
+                style = replace(style, color=COLOR_MAP[number])
+            elif 40 <= number <= 47 or 100 <= number <= 107:
+                style = replace(style, background=COLOR_MAP[number - 10])
+            elif number in (38, 48):
+                color, used = _extended_color(codes[index:])
+                index += used
+                style = replace(style, **{"color" if number == 38 else "background": color})
+        return style
 
-        span_start = f'<span style="{style.to_css()}">' if style.to_css() else ""
-        span_end = "</span>" if span_start else ""
 
-        output.append(span_start)
-        last = match.end()
+def _plain(text: str) -> str:
+    # a stray escape character or bell is not shown
+    if "\x1b" in text or "\x07" in text:
+        return text.replace("\x1b", "").replace("\x07", "")
+    return text
 
-    output.append(escape(text[last:]))
+
+def ansi_to_html(text: str) -> str:
+    output = []
+    parser = AnsiParser()
+    for run, style in parser.feed(text) + parser.flush():
+        css = style.to_css()
+        if css:
+            output.append(f'<span style="{css}">{escape(run)}</span>')
+        else:
+            output.append(escape(run))
 
     return "<pre>" + "".join(output) + "</pre>"
 
@@ -79,4 +204,4 @@ def escape(s: str) -> str:
         s.replace("&", "&amp;")
          .replace("<", "&lt;")
          .replace(">", "&gt;")
-    )
\ No newline at end of file
+    )
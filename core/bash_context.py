@@ -1,26 +1,71 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+
+INDENT = "    "
+
+
+def render_lines(lines) -> str:
+    return "\n".join([INDENT * level + text if level else text for level, text in lines])
+
+
+# "compat" writes what the nodes always wrote, "fast" prefers bash builtins and keywords where
+# they behave the same and save a fork or a re-parse
+PROFILES = ("compat", "fast")
+
 
 class BashContext:
-    def __init__(self):
+    def __init__(self, profile: str = "compat"):
+        self.profile = profile
         self.variables: Dict[str, str] = {}
         self.indent_level = 0
-        self.lines: List[str] = []
-        self.function_lines = []
+        # (indent level, text), the indentation is only rendered when the script is written out
+        self.lines: List[Tuple[int, str]] = []
+        self.function_lines: List[Tuple[int, str]] = []
         self.emitted_nodes = set()
         self._current_buffer = "main"
+        # set by a block node (if, for, while) to where the exec chain goes on after it
+        self.next_node = None
+        # set by IncrementalBashEmitter, records and replays what each node emits
+        self.fragments = None
+        # data nodes only read their properties and inputs, so one evaluation per pass is enough
+        # even when the same node feeds several others
+        self._values: Dict[int, Optional[str]] = {}
+        self._conditions: Dict[int, Optional[str]] = {}
+        # > 0 while a branch that can never run is walked: its nodes count as emitted, nothing is written
+        self.silent = 0
+        # set by ProfilingBashEmitter: gives the timing marker line written before ("E") and after
+        # ("L") the code of every exec node
+        self.profiling = None
     
     def add_line(self, line: str):
-        indent = "    " * self.indent_level
+        if self.silent:
+            return
         if self._current_buffer == "function":
-            self.function_lines.append(f"{indent}{line}")
+            self.function_lines.append((self.indent_level, line))
         else:
-            self.lines.append(f"{indent}{line}")
+            self.lines.append((self.indent_level, line))
 
     def add_function_line(self, line: str):
-        self.function_lines.append(line)
+        if self.silent:
+            return
+        self.function_lines.append((0, line))
+
+    def set_variable(self, name: str, value: str):
+        self.variables[name] = value
+        if self.fragments is not None:
+            self.fragments.on_variable(name, value)
+
+    def value_of(self, node) -> Optional[str]:
+        if node.id not in self._values:
+            self._values[node.id] = node.emit_bash_value(self)
+        return self._values[node.id]
+
+    def condition_of(self, node) -> Optional[str]:
+        if node.id not in self._conditions:
+            self._conditions[node.id] = node.emit_condition(self)
+        return self._conditions[node.id]
 
     def build(self) -> str:
-        return "\n".join(self.function_lines + [""] + self.lines)
+        return self.get_script()
     
     def indent(self):
         self.indent_level += 1
@@ -29,4 +74,42 @@ class BashContext:
         self.indent_level = max(0, self.indent_level - 1)
     
     def get_script(self) -> str:
-        return "\n".join(self.function_lines + [""] + self.lines)
+        return render_lines(self.function_lines + [(0, "")] + self.lines)
+
+
+class StreamingBashContext(BashContext):
+    # Writes every line to the sink as soon as it is emitted instead of keeping it.
+    # Function nodes are all emitted before the start chain, so their definitions still end
+    # up above the main body.
+    def __init__(self, sink, profile: str = "compat"):
+        super().__init__(profile)
+        self.sink = sink
+        self._written = False
+        self._in_main = False
+
+    def add_line(self, line: str):
+        if self.silent:
+            return
+        if self._current_buffer != "function":
+            self._start_main()
+        self._write(self.indent_level, line)
+
+    def add_function_line(self, line: str):
+        if self.silent:
+            return
+        self._write(0, line)
+
+    def finish(self):
+        self._start_main()
+
+    def _start_main(self):
+        # the empty line between the functions and the main body
+        if not self._in_main:
+            self._in_main = True
+            self._write(0, "")
+
+    def _write(self, level: int, text: str):
+        if level:
+            text = INDENT * level + text
+        self.sink.write("\n" + text if self._written else text)
+        self._written = True
@@ -1,15 +1,34 @@
 from core.graph import Graph
 from nodes.base_node import BaseNode
-from core.bash_context import BashContext
+from core.bash_context import BashContext, StreamingBashContext
+from core.bash_helpers import helpers_of
 from core.config import Config
+from core.port_types import PortType
+from core.graph_events import GraphEventType
+from core.fragment_cache import FragmentCache, StaleFragment
 
 class BashEmitter:
-    def __init__(self, graph: Graph):
+    def __init__(self, graph: Graph, profile: str = None):
         self.graph = graph
+        # None follows Config.EMIT_PROFILE
+        self.profile = profile
+
+    def _profile(self) -> str:
+        return self.profile or Config.EMIT_PROFILE
 
     def emit(self) -> str:
-        context = BashContext()
+        context = BashContext(self._profile())
+        self._emit_nodes(context)
+        return self._header() + helpers_of(self.graph, self._profile()) + context.get_script()
+
+    def emit_to(self, sink):
+        # same script as emit(), written to any object with a write(str) method as it is generated
+        sink.write(self._header() + helpers_of(self.graph, self._profile()))
+        context = StreamingBashContext(sink, self._profile())
+        self._emit_nodes(context)
+        context.finish()
 
+    def _header(self) -> str:
         header = [
             "#!/bin/bash/env bash",
             "",
@@ -18,14 +37,81 @@ class BashEmitter:
         ]
         if Config.CUSTOM_SHEBANG:
             header[0] = Config.CUSTOM_SHEBANG
+        return "\n".join(header)
+
+    def _emit_nodes(self, context: BashContext):
         for node in self.graph.nodes.values():
             if node.node_type == "function":
-                if node.id in context.emitted_nodes:
-                    continue
-                context.emitted_nodes.add(node.id)
-                node.emit_bash(context)
+                # a chain of one node, the same as checking and emitting it here
+                BaseNode.emit_exec_chain(node, context, stop_at=node)
         start_node = self.graph.get_start_node()
-        if start_node and start_node.outputs and start_node.outputs[0].connected_edges:
-            first = start_node.outputs[0].connected_edges[0].target.node
-            BaseNode.emit_exec_chain(first, context)
-        return "\n".join(header) + context.get_script()
+        if start_node:
+            following = self.graph.successors(start_node.id, PortType.EXEC)
+            if following:
+                BaseNode.emit_exec_chain(following[0], context)
+
+
+class IncrementalBashEmitter(BashEmitter):
+    # Keeps one fragment per emitted node between calls and re-emits only the nodes touched
+    # by graph events (and the blocks containing them). The output is the same as BashEmitter.
+    def __init__(self, graph: Graph, profile: str = None):
+        super().__init__(graph, profile)
+        self.cache = FragmentCache()
+        self._body = None
+        self._helpers = ""
+        self._cached_profile = self._profile()
+        graph.subscribe(self._on_graph_events)
+
+    def close(self):
+        self.graph.unsubscribe(self._on_graph_events)
+        self.cache.clear()
+        self._body = None
+
+    def _on_graph_events(self, events):
+        for event in events:
+            if event.type in (GraphEventType.EDGE_ADDED, GraphEventType.EDGE_REMOVED):
+                self.cache.invalidate(event.source_id)
+                self.cache.invalidate(event.target_id)
+                source = self.graph.nodes.get(event.source_id)
+                if source is not None and source.node_type == "start":
+                    self.cache.invalidate_root()
+                self._body = None
+            elif event.type in (GraphEventType.NODE_REMOVED, GraphEventType.PROPERTY_CHANGED):
+                self.cache.invalidate(event.node_id)
+                self._body = None
+            elif event.type == GraphEventType.NODE_ADDED:
+                # function and start nodes are emitted without being connected to anything
+                node = self.graph.nodes.get(event.node_id)
+                if node is not None and node.node_type in ("function", "start"):
+                    self.cache.invalidate_root()
+                    self._body = None
+                elif node is not None and node.helpers(self._profile()):
+                    # its helpers are written even before it is connected
+                    self._body = None
+
+    def emit(self) -> str:
+        profile = self._profile()
+        if profile != self._cached_profile:
+            # every fragment was written for the other profile
+            self.cache.clear()
+            self._body = None
+            self._cached_profile = profile
+        if self._body is None:
+            try:
+                self._body = self._emit_body()
+            except StaleFragment:
+                # the graph changed in a way the events did not describe, start over
+                self.cache.clear()
+                self._body = self._emit_body()
+        return self._header() + self._helpers + self._body
+
+    def emit_to(self, sink):
+        # the body is kept for the next edit anyway
+        sink.write(self.emit())
+
+    def _emit_body(self) -> str:
+        context = BashContext(self._cached_profile)
+        context.fragments = self.cache
+        self.cache.emit_root(context, self._emit_nodes)
+        self._helpers = helpers_of(self.graph, self._cached_profile)
+        return context.get_script()
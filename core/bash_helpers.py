@@ -0,0 +1,182 @@
+# Shell functions the generated scripts call instead of repeating the same code at every node.
+# A node lists the ones it calls in its HELPERS attribute; the emitters write each helper used by
+# the graph once, above the function nodes, so they are defined wherever they are called from.
+# Their locals are prefixed: a command run with eval inside them sees them.
+from core.graph import Graph
+
+HELPERS = {
+    # __vish_cached DIRECTORY TTL MAX_KB LOG COMMAND [VARIABLE...] -- [ARGUMENT...]
+    # Runs COMMAND at most once per TTL seconds (0: never expires) for the same command text,
+    # arguments and values of the listed variables, replaying its output and exit status from
+    # DIRECTORY in between. COMMAND runs in a subshell with the ARGUMENTs (the caller's "$@") as its
+    # positional parameters: an exit in it ends only the command, and the variables it sets are
+    # not kept, as on a replay. An entry is one file: "status time" on the first line, then the
+    # output. Once the directory holds more than MAX_KB (0: no limit), the oldest entries are removed.
+    "__vish_cached": r'''__vish_cached() {
+    local __vish_dir=$1 __vish_ttl=$2 __vish_max=$3 __vish_log=$4 __vish_command=$5
+    local __vish_key __vish_entry __vish_tmp __vish_now __vish_status __vish_created __vish_total __vish_size __vish_name __vish_names=()
+    shift 5
+    while (( $# )) && [[ $1 != -- ]]; do
+        __vish_names+=("$1")
+        shift
+    done
+    shift $(( $# > 0 ))
+    __vish_key=$({ printf '%s\0' "$__vish_command" "$#" "$@"; for __vish_name in "${__vish_names[@]}"; do printf '%s=%s\0' "$__vish_name" "${!__vish_name-}"; done; } | { sha256sum 2>/dev/null || shasum -a 256; })
+    __vish_entry=$__vish_dir/${__vish_key%% *}
+    printf -v __vish_now '%(%s)T' -1
+    if [[ -r $__vish_entry ]]; then
+        {
+            read -r __vish_status __vish_created
+            if [[ $__vish_status =~ ^[0-9]+$ && $__vish_created =~ ^[0-9]+$ ]] && (( __vish_ttl <= 0 || __vish_now - __vish_created < __vish_ttl )); then
+                [[ $__vish_log != true ]] || printf 'vish cache: hit %s\n' "$__vish_command" >&2
+                cat
+                return "$__vish_status"
+            fi
+        } < "$__vish_entry"
+    fi
+    [[ $__vish_log != true ]] || printf 'vish cache: miss %s\n' "$__vish_command" >&2
+    [[ -d $__vish_dir ]] || mkdir -p -- "$__vish_dir" 2>/dev/null || :
+    if [[ ! -w $__vish_dir ]]; then
+        ( eval "$__vish_command" )
+        return
+    fi
+    __vish_tmp=$__vish_entry.$BASHPID.tmp
+    # the status is written over the placeholder once known
+    printf '  0 %s\n' "$__vish_now" > "$__vish_tmp"
+    if ( eval "$__vish_command" ) >> "$__vish_tmp"; then __vish_status=0; else __vish_status=$?; fi
+    printf '%3d' "$__vish_status" 1<> "$__vish_tmp"
+    { read -r _; cat; } < "$__vish_tmp"
+    mv -f -- "$__vish_tmp" "$__vish_entry" 2>/dev/null || rm -f -- "$__vish_tmp"
+    if (( __vish_max > 0 )); then
+        {
+            read -r _ __vish_total || __vish_total=0
+            while (( __vish_total > __vish_max )) && read -r __vish_size __vish_name; do
+                [[ $__vish_name != *.tmp ]] || continue
+                rm -f -- "$__vish_dir/$__vish_name"
+                __vish_total=$(( __vish_total - __vish_size ))
+            done
+        } < <(ls -1trsk -- "$__vish_dir" 2>/dev/null)
+    fi
+    return "$__vish_status"
+}''',
+    # __vish_download PARALLEL RESUME CONDITIONAL URL PATH [URL PATH...]
+    # Fetches every URL to its PATH with one curl run (7.75 or later), PARALLEL transfers at a time
+    # over reused connections. A transfer writes PATH.part, renamed to PATH once complete. RESUME
+    # continues a part left by a failed run, from the start again if the server cannot resume.
+    # CONDITIONAL only fetches a PATH already there when the server has a newer one (Last-Modified,
+    # or the ETag kept in PATH.etag).
+    "__vish_download": r'''__vish_download() {
+    local __vish_parallel=$1 __vish_resume=$2 __vish_conditional=$3
+    local __vish_args=() __vish_retry=() __vish_count=0 __vish_seen=0 __vish_status=0 __vish_end=1 __vish_code __vish_http __vish_url __vish_part __vish_path
+    shift 3
+    while (( $# >= 2 )); do
+        (( ${#__vish_args[@]} == 0 )) || __vish_args+=(--next)
+        # curl opens the ETag file before it creates the directories
+        [[ $2 != */* || -d ${2%/*} ]] || mkdir -p -- "${2%/*}"
+        __vish_args+=(--fail --location --remote-time -w '%{exitcode} %{http_code} %{url} %{filename_effective}\n' -o "$2.part")
+        [[ $__vish_resume != true ]] || __vish_args+=(-C -)
+        if [[ $__vish_conditional == true ]]; then
+            __vish_args+=(--etag-save "$2.part.etag")
+            [[ ! -f $2 ]] || __vish_args+=(-z "$2")
+            [[ ! -f $2 || ! -s $2.etag ]] || __vish_args+=(--etag-compare "$2.etag")
+        fi
+        __vish_args+=("$1")
+        __vish_count=$(( __vish_count + 1 ))
+        shift 2
+    done
+    while read -r __vish_code __vish_http __vish_url __vish_part; do
+        if [[ $__vish_code == end ]]; then
+            (( __vish_http == 0 )) || __vish_end=$__vish_http
+            continue
+        fi
+        __vish_seen=$(( __vish_seen + 1 ))
+        __vish_path=${__vish_part%.part}
+        if (( __vish_code == 0 )) && [[ $__vish_http == 304 ]]; then
+            rm -f -- "$__vish_part" "$__vish_part.etag"
+        elif (( __vish_code == 0 )); then
+            mv -f -- "$__vish_part" "$__vish_path"
+            if [[ -s $__vish_part.etag ]]; then
+                mv -f -- "$__vish_part.etag" "$__vish_path.etag"
+            else
+                rm -f -- "$__vish_part.etag" "$__vish_path.etag"
+            fi
+        elif (( __vish_code == 33 )); then
+            rm -f -- "$__vish_part" "$__vish_part.etag"
+            __vish_retry+=("$__vish_url" "$__vish_path")
+        else
+            rm -f -- "$__vish_part.etag"
+            __vish_status=$__vish_code
+        fi
+    done < <(curl --parallel --parallel-max "$__vish_parallel" --no-progress-meter "${__vish_args[@]}"; echo "end $?")
+    # a transfer curl skipped or never started wrote no line
+    if (( __vish_seen < __vish_count && __vish_status == 0 )); then
+        __vish_status=$__vish_end
+    fi
+    if (( ${#__vish_retry[@]} )); then
+        __vish_download "$__vish_parallel" false "$__vish_conditional" "${__vish_retry[@]}" || __vish_status=$?
+    fi
+    return "$__vish_status"
+}''',
+    # __vish_sleep_fd
+    # Not a function: a descriptor on a pipe nobody writes to, opened once for the whole script. The
+    # Sleep nodes of the fast profile wait on it with read -t instead of starting the sleep binary,
+    # the process substitution opening it is the only fork.
+    "__vish_sleep_fd": r'''exec {__vish_sleep_fd}<> <(:)''',
+    # __vish_git_clone URL DESTINATION BRANCH DEPTH FILTER SINGLE_BRANCH CACHE [SPARSE_PATH...]
+    # Clones URL to DESTINATION, or when a clone is already there brings it to the tip of BRANCH
+    # (the remote's HEAD when empty) with a fetch and a hard reset. DEPTH (0: full history) and
+    # FILTER (a partial clone, blob:none) apply to both, SPARSE_PATHs check out these directories
+    # only. With CACHE, the clone borrows its objects from a bare mirror of URL kept in that
+    # directory, created on first use and fetched again on every call.
+    "__vish_git_clone": r'''__vish_git_clone() {
+    local __vish_url=$1 __vish_dest=$2 __vish_branch=$3 __vish_depth=$4 __vish_filter=$5 __vish_single=$6 __vish_cache=$7
+    local __vish_fetch=() __vish_clone=() __vish_mirror
+    shift 7
+    [[ -z $__vish_depth || $__vish_depth == 0 ]] || __vish_fetch+=(--depth "$__vish_depth")
+    [[ -z $__vish_filter ]] || __vish_fetch+=(--filter="$__vish_filter")
+    if [[ -n $__vish_cache ]]; then
+        __vish_mirror=$__vish_cache/${__vish_url//[^A-Za-z0-9._-]/_}
+        [[ $__vish_mirror == *.git ]] || __vish_mirror+=.git
+        if [[ -d $__vish_mirror ]]; then
+            git -C "$__vish_mirror" fetch --prune origin || return
+        else
+            # cloned aside first: an interrupted clone does not leave a broken mirror behind
+            mkdir -p -- "$__vish_cache" || return
+            git clone --mirror -- "$__vish_url" "$__vish_mirror.$BASHPID.tmp" || { rm -rf -- "$__vish_mirror.$BASHPID.tmp"; return 1; }
+            # clones borrow objects from the mirror, it must never drop one
+            git -C "$__vish_mirror.$BASHPID.tmp" config gc.pruneExpire never
+            if [[ -e $__vish_mirror ]]; then
+                rm -rf -- "$__vish_mirror.$BASHPID.tmp"
+            else
+                mv -- "$__vish_mirror.$BASHPID.tmp" "$__vish_mirror" || return
+            fi
+        fi
+        __vish_clone+=(--reference "$__vish_mirror")
+    fi
+    if [[ -d $__vish_dest/.git ]]; then
+        git -C "$__vish_dest" fetch "${__vish_fetch[@]}" origin "${__vish_branch:-HEAD}" || return
+        (( $# == 0 )) || git -C "$__vish_dest" sparse-checkout set -- "$@" || return
+        if [[ -n $__vish_branch ]]; then
+            git -C "$__vish_dest" checkout -q -f -B "$__vish_branch" FETCH_HEAD
+        else
+            git -C "$__vish_dest" reset -q --hard FETCH_HEAD
+        fi
+        return
+    fi
+    [[ -z $__vish_branch ]] || __vish_clone+=(--branch "$__vish_branch")
+    [[ $__vish_single != true ]] || __vish_clone+=(--single-branch)
+    (( $# == 0 )) || __vish_clone+=(--sparse)
+    git clone "${__vish_fetch[@]}" "${__vish_clone[@]}" -- "$__vish_url" "$__vish_dest" || return
+    (( $# == 0 )) || git -C "$__vish_dest" sparse-checkout set -- "$@"
+}''',
+}
+
+
+def helpers_of(graph: Graph, profile: str) -> str:
+    # definitions of the helpers the nodes of graph call, followed by an empty line, or ""
+    used = set()
+    for node in graph.nodes.values():
+        used.update(node.helpers(profile))
+    if not used:
+        return ""
+    return "".join(HELPERS[name] + "\n\n" for name in HELPERS if name in used)
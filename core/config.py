@@ -7,9 +7,21 @@ class Config:
     USING_TTY = True
     SYNC_NODES_AND_GEN = False
     AUTO_SAVE = False
+    # quiet time after the last edit before the script is regenerated / the project saved
+    GENERATION_DELAY_MS = 150
+    AUTO_SAVE_DELAY_MS = 1000
+    # time a cancelled script gets to exit after SIGTERM before its process group is killed
+    RUN_KILL_DELAY_MS = 2000
+    # output of the running script kept in the run console, the whole of it goes to run.log
+    RUN_CONSOLE_MAX_LINES = 100000
+    RUN_CONSOLE_MAX_CHARS = 16000000
+    # passes run on the graph before the script is written, see core/optimizer.py
+    OPTIMIZATION_LEVEL = 0
     lang = "en"
     theme = "dark"
     CUSTOM_SHEBANG = "#!/usr/bin/env bash"
+    # one of core.bash_context.PROFILES
+    EMIT_PROFILE = "compat"
     
 class ConfigManager:
     @staticmethod
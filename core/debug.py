@@ -2,22 +2,31 @@ import os
 from pathlib import Path
 import platform
 import sys
-from ui.info import MessageWidget
-from PySide6.QtCore import QStandardPaths
 
 class Debug:
     _parent = None
+    _relay = None
 
     @staticmethod
     def init(parent):
+        # Qt is only loaded once a window is there to show messages, the CLI never imports it
+        from ui.info import MessageRelay
         Debug._parent = parent
+        # nodes may warn while a script is generated in the background, widgets only live on the GUI thread
+        Debug._relay = MessageRelay()
+        Debug._relay.message.connect(Debug._toast)
 
     @staticmethod
     def _show(message: str, level: str):
         if not Debug._parent:
-            print(f"[{level.upper()}] {message}")
+            # stdout may be the generated script when running headless
+            print(f"[{level.upper()}] {message}", file=sys.stderr)
             return
+        Debug._relay.message.emit(message, level)
 
+    @staticmethod
+    def _toast(message: str, level: str):
+        from ui.info import MessageWidget
         toast = MessageWidget(Debug._parent, message, level)
         toast.show_animated()
 
@@ -34,13 +43,18 @@ class Debug:
         Debug._show(message, "info")
 
 class Info:
-    CONFIG_PATH = os.path.join(QStandardPaths.writableLocation(QStandardPaths.AppConfigLocation), "config.json")
+    # resolved on first use, see get_config_path
+    CONFIG_PATH = None
+
     @staticmethod
     def get_os():
         return platform.system()
     
     @staticmethod
     def get_config_path():
+        if Info.CONFIG_PATH is None:
+            from PySide6.QtCore import QStandardPaths
+            Info.CONFIG_PATH = os.path.join(QStandardPaths.writableLocation(QStandardPaths.AppConfigLocation), "config.json")
         Info.ensure_config_dir_exists()
         return Info.CONFIG_PATH
     
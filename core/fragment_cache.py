@@ -0,0 +1,303 @@
+# Per-node cache of emitted Bash, used by IncrementalBashEmitter.
+# A fragment is what one node emitted: its own lines, the exec chains it emitted in turn
+# (a block's body, its next chain) and the variables it set. A chain is one run of
+# BaseNode.emit_exec_chain: the fragments of its nodes in order, and the already emitted
+# node it stopped at, if any.
+# Replaying a fragment gives back the exact lines emit_bash would produce as long as none of
+# the nodes it read changed. Changed nodes are dropped together with every block around them;
+# when a block is emitted again, the unchanged part of its chains is replayed from the cache.
+from typing import Dict, List, Optional, Set
+from core.port_types import PortType
+
+_MAIN = 0
+_FUNCTION = 1
+_CHAIN = 2
+_CHILD = 3
+_LEAF = 4
+_SKIP = 5
+_VARIABLE = 6
+
+
+class StaleFragment(Exception):
+    pass
+
+
+class _Fragment:
+    __slots__ = ("node_id", "indent", "buffer", "items", "parent", "next_node")
+
+    def __init__(self, node_id: Optional[int], indent: int, buffer: str, parent):
+        self.node_id = node_id
+        self.indent = indent
+        self.buffer = buffer
+        self.items = []
+        self.parent = parent
+        self.next_node = None
+
+
+class _Chain:
+    __slots__ = ("nodes", "children", "end_skip", "items", "parent")
+
+    def __init__(self, parent: _Fragment):
+        self.nodes = []
+        self.children: List[_Fragment] = []
+        # the already emitted node the walk stopped at
+        self.end_skip = None
+        self.items = []
+        self.parent = parent
+
+
+class _Recording:
+    __slots__ = ("fragment", "lines_mark", "function_mark")
+
+    def __init__(self, fragment: _Fragment, context):
+        self.fragment = fragment
+        self.lines_mark = len(context.lines)
+        self.function_mark = len(context.function_lines)
+
+
+class FragmentCache:
+    def __init__(self):
+        self.fragments: Dict[int, _Fragment] = {}
+        # node id -> ids of the nodes whose fragment read it through a data input
+        self.dependents: Dict[int, Set[int]] = {}
+        self.chains: Dict[tuple, _Chain] = {}
+        self.root: Optional[_Fragment] = None
+        self._stack: List[_Recording] = []
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.fragments.clear()
+        self.dependents.clear()
+        self.chains.clear()
+        self.root = None
+        self._stack.clear()
+
+    def invalidate(self, node_id: int):
+        self._drop(self.fragments.get(node_id))
+        for dependent in self.dependents.pop(node_id, ()):
+            self._drop(self.fragments.get(dependent))
+
+    def invalidate_root(self):
+        self.root = None
+
+    def _drop(self, fragment):
+        # a block replays its chains as a whole, so it goes stale with any node in them
+        while fragment is not None:
+            if fragment is self.root:
+                self.root = None
+                return
+            if isinstance(fragment, _Fragment) and self.fragments.get(fragment.node_id) is fragment:
+                del self.fragments[fragment.node_id]
+            fragment = fragment.parent
+
+    def emit_root(self, context, emit_nodes):
+        self._stack.clear()
+        self.hits = 0
+        self.misses = 0
+        if self.root is not None:
+            self._replay(context, self.root.items)
+            return
+
+        root = _Fragment(None, 0, context._current_buffer, None)
+        recording = _Recording(root, context)
+        self._stack.append(recording)
+        try:
+            emit_nodes(context)
+            self._flush(context, recording)
+        finally:
+            self._stack.clear()
+        self.root = root
+        self._prune_chains()
+
+    def emit_chain(self, start_node, context, stop_at=None):
+        # same walk as BaseNode.emit_exec_chain, nodes are recorded inline since nested blocks
+        # come back through here and every frame counts against the recursion limit
+        parent = self._stack[-1]
+        self._flush(context, parent)
+
+        indent = context.indent_level
+        buffer = context._current_buffer
+        key = (start_node.id, stop_at.id if stop_at is not None else None, indent, buffer)
+        # a chain always starts from the same block, so it is rebuilt in place: the fragments
+        # kept from the last walk already point to it
+        chain = self.chains.get(key)
+        if chain is None:
+            chain = self.chains[key] = _Chain(parent.fragment)
+            old_nodes, old_children, old_items, old_end_skip = (), (), (), None
+        else:
+            old_nodes, old_children, old_items, old_end_skip = (
+                chain.nodes, chain.children, chain.items, chain.end_skip
+            )
+            chain.nodes, chain.children, chain.items, chain.end_skip = [], [], [], None
+            chain.parent = parent.fragment
+        old_index = None
+        emitted = context.emitted_nodes
+        fragments = self.fragments
+        count = len(old_nodes)
+
+        current = start_node
+        position = 0
+        while current:
+            if position < count and old_nodes[position] is current:
+                # nodes that kept their fragment still have the same next node, replay that run at once
+                end = position
+                while end < count:
+                    child = old_children[end]
+                    if fragments.get(child.node_id) is not child or child.node_id in emitted:
+                        break
+                    child.parent = chain
+                    end += 1
+                if end > position:
+                    if position == 0 and end == count:
+                        # unchanged chain
+                        chain.nodes, chain.children = old_nodes, old_children
+                        chain.items = old_items[:count]
+                    else:
+                        chain.nodes.extend(old_nodes[position:end])
+                        chain.children.extend(old_children[position:end])
+                        chain.items.extend(old_items[position:end])
+                    self._replay(context, old_items[position:end])
+                    self.hits += end - position
+                    if end < count:
+                        current = old_nodes[end]
+                        position = end
+                        continue
+                    if old_end_skip is None or old_end_skip.id in emitted:
+                        chain.end_skip = old_end_skip
+                        break
+                    # the node it stopped at is not emitted this time, the walk goes on from it
+                    current = old_end_skip
+                    position = count
+                    continue
+
+            if current.id in emitted:
+                chain.end_skip = current
+                break
+
+            fragment = fragments.get(current.id)
+            if fragment is not None and fragment.indent == indent and fragment.buffer == buffer:
+                self.hits += 1
+                self._replay(context, fragment.items, current.id)
+            else:
+                self.misses += 1
+                fragment = _Fragment(current.id, indent, buffer, chain)
+                recording = _Recording(fragment, context)
+                self._stack.append(recording)
+                try:
+                    emitted.add(current.id)
+                    context.next_node = None
+                    bash = current.emit_bash(context)
+                    if bash:
+                        context.add_line(bash)
+                    self._flush(context, recording)
+                finally:
+                    self._stack.pop()
+                fragment.next_node = context.next_node
+                fragments[current.id] = fragment
+                for source_id in self._data_sources(current):
+                    self.dependents.setdefault(source_id, set()).add(current.id)
+            fragment.parent = chain
+            chain.nodes.append(current)
+            chain.children.append(fragment)
+            chain.items.append(self._chain_item(fragment))
+
+            if current == stop_at:
+                break
+
+            current = fragment.next_node or current.get_next_exec_node()
+            if count and current is not None:
+                if position + 1 < count and old_nodes[position + 1] is current:
+                    position += 1
+                else:
+                    if old_index is None:
+                        old_index = {node.id: i for i, node in enumerate(old_nodes)}
+                    position = old_index.get(current.id, count)
+
+        if chain.end_skip is not None:
+            chain.items.append((_SKIP, chain.end_skip.id))
+        parent.fragment.items.append((_CHAIN, chain))
+        parent.lines_mark = len(context.lines)
+        parent.function_mark = len(context.function_lines)
+
+    @staticmethod
+    def _chain_item(fragment: _Fragment):
+        # most nodes emit a single line and nothing else, those replay without a nested walk
+        items = fragment.items
+        if len(items) == 1 and items[0][0] == _MAIN:
+            return (_LEAF, fragment.node_id, items[0][1])
+        return (_CHILD, fragment)
+
+    def on_variable(self, name: str, value: str):
+        if self._stack:
+            self._stack[-1].fragment.items.append((_VARIABLE, name, value))
+
+    def _flush(self, context, recording: _Recording):
+        items = recording.fragment.items
+        if len(context.lines) > recording.lines_mark:
+            items.append((_MAIN, context.lines[recording.lines_mark:]))
+            recording.lines_mark = len(context.lines)
+        if len(context.function_lines) > recording.function_mark:
+            items.append((_FUNCTION, context.function_lines[recording.function_mark:]))
+            recording.function_mark = len(context.function_lines)
+
+    def _replay(self, context, items, node_id=None):
+        emitted = context.emitted_nodes
+        lines = context.lines
+        function_lines = context.function_lines
+        if node_id is not None:
+            emitted.add(node_id)
+        stack = [iter(items)]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            kind = item[0]
+            if kind == _LEAF:
+                if item[1] in emitted:
+                    raise StaleFragment(item[1])
+                emitted.add(item[1])
+                lines.extend(item[2])
+            elif kind == _MAIN:
+                lines.extend(item[1])
+            elif kind == _FUNCTION:
+                function_lines.extend(item[1])
+            elif kind == _CHAIN:
+                stack.append(iter(item[1].items))
+            elif kind == _CHILD:
+                child = item[1]
+                if child.node_id in emitted:
+                    raise StaleFragment(child.node_id)
+                emitted.add(child.node_id)
+                stack.append(iter(child.items))
+            elif kind == _SKIP:
+                if item[1] not in emitted:
+                    raise StaleFragment(item[1])
+            else:
+                context.variables[item[1]] = item[2]
+
+    def _prune_chains(self):
+        # chains are looked up by where they start, drop the ones no live block owns anymore
+        if len(self.chains) <= 2 * len(self.fragments) + 64:
+            return
+        self.chains = {
+            key: chain for key, chain in self.chains.items()
+            if chain.parent is self.root or self.fragments.get(chain.parent.node_id) is chain.parent
+        }
+
+    def _data_sources(self, node) -> Set[int]:
+        # every node upstream of a data (non exec) input, its value can end up in the fragment
+        seen: Set[int] = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for port in current.inputs:
+                if port.port_type == PortType.EXEC:
+                    continue
+                for edge in port.connected_edges:
+                    source = edge.source.node
+                    if source.id not in seen:
+                        seen.add(source.id)
+                        stack.append(source)
+        return seen
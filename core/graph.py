@@ -1,19 +1,56 @@
-from typing import List, Optional, Dict, Any, TYPE_CHECKING
+from typing import List, Optional, Dict, Any, Callable, Tuple, TYPE_CHECKING
 if TYPE_CHECKING:
     from core.bash_context import BashContext
+from contextlib import contextmanager
+from itertools import count
 from uuid import uuid4
 from core.port_types import PortType, PortDirection
+from core.topo_order import TopologicalOrder
+from core.graph_events import GraphEvent, GraphEventType
+
+_handles = count(1)
+
+class _Keyed:
+    # In memory, ports, nodes and edges are identified by a small integer handle (`id`).
+    # The uuid string (`key`) is only the persisted external id, created on first use
+    # or restored by the serializer.
+    __slots__ = ("_key",)
+
+    def _init_handle(self):
+        self.id = next(_handles)
+        self._key = None
+
+    @property
+    def key(self) -> str:
+        if self._key is None:
+            self._key = str(uuid4())
+        return self._key
+
+    @key.setter
+    def key(self, value: str):
+        self._key = value
+
+class Port(_Keyed):
+    # only the UI looks ports up by handle, so it is drawn on first use
+    __slots__ = ("_id", "name", "port_type", "direction", "node", "value", "connected_edges", "tooltip")
 
-class Port:
     def __init__(self, name: str, port_type: PortType, direction: PortDirection, node: 'Node', tooltip=""):
-        self.id = str(uuid4())
+        self._id = None
+        self._key = None
         self.name = name
         self.port_type = port_type
         self.direction = direction
         self.node = node
         self.value: Any = None
-        self.connected_edges: List['Edge'] = []
+        # tuples, the shared empty one until the first connection: most ports never get one
+        self.connected_edges: Tuple['Edge', ...] = ()
         self.tooltip = tooltip
+
+    @property
+    def id(self) -> int:
+        if self._id is None:
+            self._id = next(_handles)
+        return self._id
     
     def can_connect_to(self, other: 'Port') -> bool:
         if self.direction == other.direction:
@@ -25,30 +62,38 @@ class Port:
     def is_connected(self) -> bool:
         return len(self.connected_edges) > 0
 
+    def attach(self, edge: 'Edge'):
+        self.connected_edges += (edge,)
+
+    def detach(self, edge: 'Edge'):
+        self.connected_edges = tuple(e for e in self.connected_edges if e is not edge)
+
     def get_condition(self, context):
         if self.connected_edges:
-            return self.connected_edges[0].source.node.emit_condition(context)
+            return context.condition_of(self.connected_edges[0].source.node)
         return self.value
     
-class Node:
+class Node(_Keyed):
+    __slots__ = ("id", "node_type", "title", "inputs", "outputs", "x", "y", "properties")
+
     def __init__(self, node_type: str, title: str):
-        self.id = str(uuid4())
+        self._init_handle()
         self.node_type = node_type
         self.title = title
-        self.inputs: List[Port] = []
-        self.outputs: List[Port] = []
+        self.inputs: Tuple[Port, ...] = ()
+        self.outputs: Tuple[Port, ...] = ()
         self.x = 0.0
         self.y = 0.0
         self.properties: Dict[str, Any] = {}
     
     def add_input(self, name: str, port_type: PortType, tooltip="") -> Port:
         port = Port(name, port_type, PortDirection.INPUT, self, tooltip)
-        self.inputs.append(port)
+        self.inputs += (port,)
         return port
     
     def add_output(self, name: str, port_type: PortType, tooltip="") -> Port:
         port = Port(name, port_type, PortDirection.OUTPUT, self, tooltip)
-        self.outputs.append(port)
+        self.outputs += (port,)
         return port
     
     def get_exec_output(self) -> Optional[Port]:
@@ -66,41 +111,116 @@ class Node:
     def emit_bash(self, context: 'BashContext') -> str:
         return ""
 
-class Edge:
+class Edge(_Keyed):
+    __slots__ = ("id", "source", "target")
+
     def __init__(self, source: Port, target: Port):
-        self.id = str(uuid4())
+        self._init_handle()
         self.source = source
         self.target = target
-        source.connected_edges.append(self)
-        target.connected_edges.append(self)
+        source.attach(self)
+        target.attach(self)
     
     def disconnect(self):
-        self.source.connected_edges.remove(self)
-        self.target.connected_edges.remove(self)
+        self.source.detach(self)
+        self.target.detach(self)
 
 class Graph:
     def __init__(self):
-        self.nodes: Dict[str, Node] = {}
-        self.edges: Dict[str, Edge] = {}
+        self.nodes: Dict[int, Node] = {}
+        self.edges: Dict[int, Edge] = {}
+        self.order = TopologicalOrder(self)
+        # bumped on every mutation, consumers compare it to know if what they built is stale
+        self.version = 0
+        self._subscribers: List[Callable[[List[GraphEvent]], None]] = []
+        self._batch_depth = 0
+        self._pending: List[GraphEvent] = []
+
+    def subscribe(self, callback: Callable[[List[GraphEvent]], None]):
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[List[GraphEvent]], None]):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    @contextmanager
+    def batch(self):
+        # events raised inside are delivered together, in a single call per subscriber, on exit
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._pending:
+                events = self._coalesce(self._pending)
+                self._pending = []
+                self._notify(events)
+
+    def _publish(self, event_type: GraphEventType, **fields):
+        self.version += 1
+        if not self._subscribers:
+            return
+        event = GraphEvent(event_type, self.version, **fields)
+        if self._batch_depth:
+            self._pending.append(event)
+        else:
+            self._notify([event])
+
+    def _notify(self, events: List[GraphEvent]):
+        for callback in list(self._subscribers):
+            callback(events)
+
+    @staticmethod
+    def _coalesce(events: List[GraphEvent]) -> List[GraphEvent]:
+        # only the last position / value of each node (and property) matters
+        def slot(event):
+            if event.type == GraphEventType.POSITION_CHANGED:
+                return (event.type, event.node_id)
+            if event.type == GraphEventType.PROPERTY_CHANGED:
+                return (event.type, event.node_id, event.key)
+            return None
+
+        latest = {}
+        for i, event in enumerate(events):
+            key = slot(event)
+            if key is not None:
+                latest[key] = i
+        return [
+            event for i, event in enumerate(events)
+            if slot(event) is None or latest[slot(event)] == i
+        ]
     
     def add_node(self, node: Node):
         self.nodes[node.id] = node
+        self.order.add_node(node.id)
+        self._publish(GraphEventType.NODE_ADDED, node_id=node.id)
     
-    def remove_node(self, node_id: str):
+    def remove_node(self, node_id: int):
         node = self.nodes.get(node_id)
         if not node:
             return
 
-        edges_to_remove = set()
+        with self.batch():
+            for edge in self.edges_of(node_id):
+                self.remove_edge(edge.id)
 
-        for port in node.inputs + node.outputs:
-            for edge in port.connected_edges:
-                edges_to_remove.add(edge.id)
+            del self.nodes[node_id]
+            self.order.remove_node(node_id)
+            self._publish(GraphEventType.NODE_REMOVED, node_id=node_id)
 
-        for edge_id in edges_to_remove:
-            self.remove_edge(edge_id)
+    def set_property(self, node: Node, key: str, value: Any):
+        if key in node.properties and node.properties[key] == value:
+            return
+        node.properties[key] = value
+        self._publish(GraphEventType.PROPERTY_CHANGED, node_id=node.id, key=key, value=value)
 
-        del self.nodes[node_id]
+    def set_position(self, node: Node, x: float, y: float):
+        if node.x == x and node.y == y:
+            return
+        node.x = x
+        node.y = y
+        self._publish(GraphEventType.POSITION_CHANGED, node_id=node.id, value=(x, y))
 
     
     def add_edge(self, source: Port, target: Port) -> Optional[Edge]:
@@ -108,13 +228,45 @@ class Graph:
             return None
         edge = Edge(source, target)
         self.edges[edge.id] = edge
+        self.order.add_edge(source.node.id, target.node.id)
+        self._publish(GraphEventType.EDGE_ADDED, edge_id=edge.id, source_id=source.node.id, target_id=target.node.id)
         return edge
     
-    def remove_edge(self, edge_id: str):
+    def remove_edge(self, edge_id: int):
         if edge_id in self.edges:
             edge = self.edges[edge_id]
             edge.disconnect()
             del self.edges[edge_id]
+            self.order.remove_edge(edge.source.node.id, edge.target.node.id)
+            self._publish(GraphEventType.EDGE_REMOVED, edge_id=edge_id, source_id=edge.source.node.id, target_id=edge.target.node.id)
+
+    def edges_of(self, node_id: int, direction: Optional[PortDirection] = None) -> List[Edge]:
+        # read from the ports, the graph keeps no per-node edge index of its own
+        node = self.nodes.get(node_id)
+        edges = []
+        if node is None:
+            return edges
+        if direction != PortDirection.OUTPUT:
+            for port in node.inputs:
+                edges.extend(port.connected_edges)
+        if direction != PortDirection.INPUT:
+            for port in node.outputs:
+                edges.extend(port.connected_edges)
+        return edges
+
+    def successors(self, node_id: int, port_type: Optional[PortType] = None) -> List[Node]:
+        found = {}
+        for edge in self.edges_of(node_id, PortDirection.OUTPUT):
+            if port_type is None or edge.source.port_type == port_type:
+                found[edge.target.node.id] = edge.target.node
+        return list(found.values())
+
+    def predecessors(self, node_id: int, port_type: Optional[PortType] = None) -> List[Node]:
+        found = {}
+        for edge in self.edges_of(node_id, PortDirection.INPUT):
+            if port_type is None or edge.target.port_type == port_type:
+                found[edge.source.node.id] = edge.source.node
+        return list(found.values())
     
     def get_start_node(self) -> Optional[Node]:
         for node in self.nodes.values():
@@ -123,13 +275,7 @@ class Graph:
         return None
     
     def get_execution_order(self):
-        from core.port_types import PortType
-
-        visited = set()
-        ordered = []
         start = None
-        for node in self.nodes.values():
-            print(node.title)
         for node in self.nodes.values():
             if node.node_type == "start":
                 start = node
@@ -138,18 +284,23 @@ class Graph:
         if not start:
             return []
 
-        def walk(node):
+        # explicit stack so long exec chains do not hit the recursion limit,
+        # children are pushed in reverse to keep the depth-first preorder
+        visited = set()
+        ordered = []
+        stack = [start]
+        while stack:
+            node = stack.pop()
             if node.id in visited:
-                return
+                continue
             visited.add(node.id)
             ordered.append(node)
+            children = []
             for output in node.outputs:
                 if output.port_type != PortType.EXEC:
                     continue
-
                 for edge in output.connected_edges:
-                    next_node = edge.target.node
-                    walk(next_node)
-
-        walk(start)
+                    children.append(edge.target.node)
+            children.reverse()
+            stack.extend(children)
         return ordered
@@ -0,0 +1,28 @@
+from enum import Enum
+from dataclasses import dataclass
+from typing import Any, Optional
+
+class GraphEventType(Enum):
+    NODE_ADDED = "node_added"
+    NODE_REMOVED = "node_removed"
+    EDGE_ADDED = "edge_added"
+    EDGE_REMOVED = "edge_removed"
+    PROPERTY_CHANGED = "property_changed"
+    POSITION_CHANGED = "position_changed"
+
+@dataclass(frozen=True)
+class GraphEvent:
+    type: GraphEventType
+    version: int
+    node_id: Optional[int] = None
+    edge_id: Optional[int] = None
+    # property name for PROPERTY_CHANGED
+    key: Optional[str] = None
+    # nodes at both ends for EDGE_ADDED / EDGE_REMOVED
+    source_id: Optional[int] = None
+    target_id: Optional[int] = None
+    value: Any = None
+
+    @property
+    def is_structural(self) -> bool:
+        return self.type != GraphEventType.POSITION_CHANGED
@@ -0,0 +1,152 @@
+# Copy of a Graph kept in sync through its events, to be read from another thread.
+# Every event is turned into a self-contained operation right away, on the thread that changed
+# the graph (copied nodes, port indices, values), and queued. The thread owning the copy applies
+# the queue with sync() and never touches the live graph.
+import copy
+import threading
+from typing import Dict, List
+from core.graph import Graph, Node, Port
+from core.graph_events import GraphEventType
+
+_ADD_NODE = 0
+_REMOVE_NODE = 1
+_ADD_EDGE = 2
+_REMOVE_EDGE = 3
+_SET_PROPERTY = 4
+
+
+_SLOTS = {}
+
+
+def _slots(cls):
+    names = _SLOTS.get(cls)
+    if names is None:
+        names = []
+        for klass in cls.__mro__:
+            slots = getattr(klass, "__slots__", ())
+            for slot in (slots,) if isinstance(slots, str) else slots:
+                if slot not in ("__dict__", "__weakref__"):
+                    names.append(slot)
+        names = _SLOTS[cls] = tuple(names)
+    return names
+
+
+def _copy_port(port: Port, node: Node) -> Port:
+    clone = Port.__new__(Port)
+    for slot in _slots(Port):
+        setattr(clone, slot, getattr(port, slot))
+    clone.node = node
+    clone.connected_edges = ()
+    return clone
+
+
+def copy_node(node: Node) -> Node:
+    # same class, same handles, no edges: it can be added to another graph as is
+    cls = type(node)
+    clone = cls.__new__(cls)
+    for slot in _slots(cls):
+        if hasattr(node, slot):
+            setattr(clone, slot, getattr(node, slot))
+    if hasattr(node, "__dict__"):
+        clone.__dict__.update(node.__dict__)
+    clone.properties = copy.deepcopy(node.properties)
+    clone.inputs = tuple(_copy_port(port, clone) for port in node.inputs)
+    clone.outputs = tuple(_copy_port(port, clone) for port in node.outputs)
+    return clone
+
+
+def copy_graph(graph: Graph) -> Graph:
+    clone = Graph()
+    for node in graph.nodes.values():
+        clone.add_node(copy_node(node))
+    for edge in graph.edges.values():
+        source, target = edge.source, edge.target
+        clone.add_edge(
+            clone.nodes[source.node.id].outputs[source.node.outputs.index(source)],
+            clone.nodes[target.node.id].inputs[target.node.inputs.index(target)],
+        )
+    return clone
+
+
+class GraphMirror:
+    def __init__(self, source: Graph):
+        self.source = source
+        self.graph = Graph()
+        # edge id in the source -> edge id in the copy
+        self._edges: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._apply(
+            [(_ADD_NODE, copy_node(node)) for node in source.nodes.values()]
+            + [self._edge_operation(edge) for edge in source.edges.values()]
+        )
+        source.subscribe(self._on_graph_events)
+
+    def close(self):
+        self.source.unsubscribe(self._on_graph_events)
+
+    def sync(self) -> bool:
+        with self._lock:
+            operations, self._pending = self._pending, []
+        if operations:
+            self._apply(operations)
+        return bool(operations)
+
+    @staticmethod
+    def _edge_operation(edge):
+        source, target = edge.source, edge.target
+        return (
+            _ADD_EDGE, edge.id,
+            source.node.id, source.node.outputs.index(source),
+            target.node.id, target.node.inputs.index(target),
+        )
+
+    def _on_graph_events(self, events):
+        # a node or edge already gone again was added and removed in the same batch, its removal follows
+        operations = []
+        for event in events:
+            if event.type == GraphEventType.NODE_ADDED:
+                node = self.source.nodes.get(event.node_id)
+                if node is not None:
+                    operations.append((_ADD_NODE, copy_node(node)))
+            elif event.type == GraphEventType.NODE_REMOVED:
+                operations.append((_REMOVE_NODE, event.node_id))
+            elif event.type == GraphEventType.EDGE_ADDED:
+                edge = self.source.edges.get(event.edge_id)
+                if edge is not None:
+                    operations.append(self._edge_operation(edge))
+            elif event.type == GraphEventType.EDGE_REMOVED:
+                operations.append((_REMOVE_EDGE, event.edge_id))
+            elif event.type == GraphEventType.PROPERTY_CHANGED:
+                operations.append((_SET_PROPERTY, event.node_id, event.key, copy.deepcopy(event.value)))
+        if operations:
+            with self._lock:
+                self._pending.extend(operations)
+
+    def _apply(self, operations):
+        graph = self.graph
+        nodes = graph.nodes
+        with graph.batch():
+            for operation in operations:
+                kind = operation[0]
+                if kind == _ADD_NODE:
+                    graph.add_node(operation[1])
+                elif kind == _REMOVE_NODE:
+                    graph.remove_node(operation[1])
+                elif kind == _ADD_EDGE:
+                    _, edge_id, source_id, output, target_id, input = operation
+                    source = nodes.get(source_id)
+                    target = nodes.get(target_id)
+                    if source is None or target is None:
+                        continue
+                    edge = graph.add_edge(source.outputs[output], target.inputs[input])
+                    if edge is not None:
+                        self._edges[edge_id] = edge.id
+                elif kind == _REMOVE_EDGE:
+                    edge_id = self._edges.pop(operation[1], None)
+                    if edge_id is not None:
+                        graph.remove_edge(edge_id)
+                else:
+                    node = nodes.get(operation[1])
+                    if node is not None:
+                        graph.set_property(node, operation[2], operation[3])
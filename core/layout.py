@@ -7,7 +7,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from collections import defaultdict,deque
 from typing import Dict,List,Tuple,Set
-from core.port_types import PortType
+from core.port_types import PortType,PortDirection
 
 PORT_PRIORITY:Dict[PortType,int]={PortType.EXEC:100,PortType.CONDITION:80,getattr(PortType,"DATA",PortType.STRING):60,PortType.STRING:50,getattr(PortType,"INT",PortType.STRING):45,getattr(PortType,"FLOAT",PortType.STRING):45}
 BASE_X_SPACING=260
@@ -59,14 +59,15 @@ class GraphLayoutEngine:
         self.edges.clear()
         for node in self.graph.nodes.values():
             self.nodes[node.id]=_LNode(node)
-        for edge in self.graph.edges.values():
-            pt=edge.source.port_type
-            w=int(PORT_PRIORITY.get(pt,30))
-            le=_LEdge(edge.source.node.id,edge.target.node.id,pt,w)
-            self.edges.append(le)
-            if le.src in self.nodes and le.tgt in self.nodes:
-                self.nodes[le.src].out_edges.append(le)
-                self.nodes[le.tgt].in_edges.append(le)
+        for node in self.graph.nodes.values():
+            for edge in self.graph.edges_of(node.id,PortDirection.OUTPUT):
+                pt=edge.source.port_type
+                w=int(PORT_PRIORITY.get(pt,30))
+                le=_LEdge(edge.source.node.id,edge.target.node.id,pt,w)
+                self.edges.append(le)
+                if le.src in self.nodes and le.tgt in self.nodes:
+                    self.nodes[le.src].out_edges.append(le)
+                    self.nodes[le.tgt].in_edges.append(le)
 
     def _compute_x(self):
         indegree=defaultdict(int)
@@ -0,0 +1,298 @@
+# Graph passes run between deserialization and emission, on a copy of the graph.
+#   level 0: the graph is emitted as drawn
+#   level 1: arithmetic and conditions whose inputs are all constant are replaced by their value,
+#            computed the way bash would (64 bit wrap-around, division toward zero, && and ||
+#            evaluated left to right with the same precedence)
+#   level 2: also, an If or While whose condition is constant becomes its taken branch, and nodes
+#            that cannot be reached from the start node or a function are dropped
+import re
+from core.bash_context import BashContext
+from core.graph import Graph
+from core.graph_mirror import copy_graph
+from core.port_types import PortDirection, PortType
+from nodes.base_node import BaseNode
+from nodes.registry import create_node
+
+LEVELS = (0, 1, 2)
+
+_INT64_MIN = -(1 << 63)
+_INTEGER = re.compile(r"-?(0|[1-9][0-9]*)")
+# a condition text with any of these may be several commands, it cannot be treated as one unit
+_CONTROL = re.compile(r"[;&|\n]|^\s*!")
+
+
+def _wrap(value: int) -> int:
+    return (value - _INT64_MIN) % (1 << 64) + _INT64_MIN
+
+
+def _divide(a: int, b: int) -> int:
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+
+_ARITHMETIC = {
+    "addition": lambda a, b: a + b,
+    "subtraction": lambda a, b: a - b,
+    "multiplication": lambda a, b: a * b,
+    "division": _divide,
+    "modulo": lambda a, b: a - b * _divide(a, b),
+}
+_COMPARISONS = {
+    "less_than": lambda a, b: a < b,
+    "greater_than": lambda a, b: a > b,
+    "equals": lambda a, b: a == b,
+}
+_JUNCTIONS = {"logical_and": "&&", "logical_or": "||"}
+# nodes reading their inputs through BashContext.value_of / condition_of, a constant can be
+# plugged in their place. The others read the properties of what is connected to them.
+_READS_VALUE = set(_ARITHMETIC) | set(_COMPARISONS) | set(_JUNCTIONS) | {"logical_not", "if", "while"}
+
+
+def optimize(graph: Graph, level: int) -> Graph:
+    if level <= 0:
+        return graph
+    graph = copy_graph(graph)
+    fold_constants(graph)
+    if level >= 2:
+        remove_dead_branches(graph)
+        remove_unreachable(graph)
+    return graph
+
+
+class _Folder:
+    def __init__(self):
+        self.integers = {}
+        # condition node id -> what bash runs: [(negations, True/False/None), "&&"/"||", ...],
+        # None when the text cannot be split into such units
+        self.sequences = {}
+        self._visiting = set()
+        self._context = BashContext()
+
+    def integer(self, node):
+        if node.id not in self.integers:
+            if node.id in self._visiting:
+                return None
+            self._visiting.add(node.id)
+            self.integers[node.id] = self._integer(node)
+            self._visiting.discard(node.id)
+        return self.integers[node.id]
+
+    def _integer(self, node):
+        if node.node_type == "number_constant":
+            value = node.properties.get("value", 0)
+            if isinstance(value, bool) or not isinstance(value, (int, str)):
+                return None
+            text = str(value).strip()
+            # a leading 0 is octal to bash
+            if not _INTEGER.fullmatch(text):
+                return None
+            value = int(text)
+            return value if _wrap(value) == value else None
+        operation = _ARITHMETIC.get(node.node_type)
+        if operation is None:
+            return None
+        a, b = self._operands(node)
+        if a is None or b is None:
+            return None
+        if node.node_type in ("division", "modulo") and (b == 0 or (a == _INT64_MIN and b == -1)):
+            # left for bash to fail on at run time
+            return None
+        return _wrap(operation(a, b))
+
+    def _operands(self, node):
+        return [
+            self.integer(port.connected_edges[0].source.node) if port.connected_edges else 0
+            for port in node.inputs[:2]
+        ]
+
+    def sequence(self, node):
+        if node.id not in self.sequences:
+            if node.id in self._visiting:
+                return None
+            self._visiting.add(node.id)
+            self.sequences[node.id] = self._sequence(node)
+            self._visiting.discard(node.id)
+        return self.sequences[node.id]
+
+    def _sequence(self, node):
+        if node.node_type == "bool_constant":
+            return [(0, node.is_true())]
+        comparison = _COMPARISONS.get(node.node_type)
+        if comparison is not None:
+            a, b = self._operands(node)
+            return [(0, None if a is None or b is None else comparison(a, b))]
+        if node.node_type == "logical_not":
+            operand = self._input_sequence(node.inputs[0])
+            if operand is None:
+                return None
+            negations, value = operand[0]
+            return [(negations + 1, value)] + operand[1:]
+        junction = _JUNCTIONS.get(node.node_type)
+        if junction is not None:
+            a = self._input_sequence(node.inputs[0])
+            b = self._input_sequence(node.inputs[1])
+            if a is None or b is None:
+                return None
+            return a + [junction] + b
+        return self._text_sequence(self._context.condition_of(node))
+
+    def _input_sequence(self, port):
+        if port.connected_edges:
+            return self.sequence(port.connected_edges[0].source.node)
+        return self._text_sequence(port.value)
+
+    @staticmethod
+    def _text_sequence(text):
+        # logic nodes write "false" for a missing operand
+        if not text:
+            return [(0, False)]
+        if _CONTROL.search(str(text)):
+            return None
+        return [(0, None)]
+
+    def condition(self, node):
+        sequence = self.sequence(node)
+        if sequence is None:
+            return None
+        # bash runs the first unit, then skips every unit joined by && after a failure
+        # and by || after a success; the result is the status of the last unit run
+        status = None
+        for index in range(0, len(sequence), 2):
+            if index and (sequence[index - 1] == "&&") != status:
+                continue
+            negations, value = sequence[index]
+            if value is None:
+                return None
+            status = value if negations % 2 == 0 else not value
+        return status
+
+
+def fold_constants(graph: Graph):
+    folder = _Folder()
+    # node id -> (constant type, value, node types it can be plugged into)
+    folded = {}
+    for node in list(graph.nodes.values()):
+        if node.node_type in _ARITHMETIC:
+            value = folder.integer(node)
+            if value is not None:
+                folded[node.id] = ("number_constant", value, _READS_VALUE)
+        elif node.node_type in _COMPARISONS or node.node_type in _JUNCTIONS or node.node_type == "logical_not":
+            value = folder.condition(node)
+            if value is not None:
+                # conditions are joined without parentheses: "a || b" feeding an AND is read by bash
+                # as part of one flat list, its value alone says nothing about that list
+                consumers = _READS_VALUE if len(folder.sequence(node)) == 1 else ("if", "while")
+                folded[node.id] = ("bool_constant", "true" if value else "false", consumers)
+
+    for node_id, (node_type, value, consumers) in folded.items():
+        node = graph.nodes[node_id]
+        constant = None
+        for edge in graph.edges_of(node_id, PortDirection.OUTPUT):
+            target = edge.target
+            if target.node.id in folded or target.node.node_type not in consumers:
+                continue
+            if constant is None:
+                constant = create_node(node_type)
+                constant.properties["value"] = value
+                constant.x, constant.y = node.x, node.y
+                graph.add_node(constant)
+            graph.remove_edge(edge.id)
+            graph.add_edge(constant.outputs[0], target)
+
+    # a folded node stays while something it was not replaced for still reads it
+    pending = list(folded)
+    while pending:
+        node_id = pending.pop()
+        if node_id not in graph.nodes or graph.edges_of(node_id, PortDirection.OUTPUT):
+            continue
+        sources = [edge.source.node.id for edge in graph.edges_of(node_id, PortDirection.INPUT)]
+        graph.remove_node(node_id)
+        pending.extend(source for source in sources if source in folded)
+
+
+class StaticBranchNode(BaseNode):
+    # An If or While whose condition is known: only the taken branch is written.
+    # The other one is still walked silently, so the nodes it holds count as emitted
+    # and the chains meeting it stop where they stopped with the block in place.
+    __slots__ = ("taken", "stop_at")
+
+    def __init__(self, taken, stop_at=None):
+        super().__init__("static_branch", "Static Branch", "#E94B3C")
+        self.add_input("Exec", PortType.EXEC, "Control flow input")
+        self.add_output("Branch 0", PortType.EXEC, "First branch")
+        self.add_output("Branch 1", PortType.EXEC, "Second branch")
+        self.add_output("Next", PortType.EXEC, "Continue after the block")
+        # index of the branch that runs, None when none does
+        self.taken = taken
+        self.stop_at = stop_at
+
+    def emit_bash(self, context: BashContext) -> str:
+        for index, port in enumerate(self.outputs[:2]):
+            if not port.connected_edges:
+                continue
+            if index != self.taken:
+                context.silent += 1
+            BaseNode.emit_exec_chain(port.connected_edges[0].target.node, context, self.stop_at)
+            if index != self.taken:
+                context.silent -= 1
+        next_port = self.outputs[2]
+        if next_port.connected_edges:
+            context.next_node = next_port.connected_edges[0].target.node
+        return ""
+
+    def get_next_exec_node(self):
+        return None
+
+
+def remove_dead_branches(graph: Graph):
+    for node in list(graph.nodes.values()):
+        if node.node_type not in ("if", "while"):
+            continue
+        condition = node.inputs[1]
+        if not condition.connected_edges:
+            continue
+        source = condition.connected_edges[0].source.node
+        if source.node_type != "bool_constant":
+            continue
+        value = source.is_true()
+        if node.node_type == "if":
+            branch = StaticBranchNode(0 if value else 1)
+            outputs = {0: 0, 1: 1, 2: 2}
+        elif value:
+            # an endless loop stays one
+            continue
+        else:
+            branch = StaticBranchNode(None)
+            branch.stop_at = branch
+            outputs = {0: 0, 1: 2}
+        branch.x, branch.y = node.x, node.y
+        graph.add_node(branch)
+        for edge in list(node.inputs[0].connected_edges):
+            graph.remove_edge(edge.id)
+            graph.add_edge(edge.source, branch.inputs[0])
+        for index, port in enumerate(node.outputs):
+            for edge in list(port.connected_edges):
+                graph.remove_edge(edge.id)
+                graph.add_edge(branch.outputs[outputs[index]], edge.target)
+        graph.remove_node(node.id)
+
+
+def remove_unreachable(graph: Graph):
+    start = graph.get_start_node()
+    pending = [node for node in graph.nodes.values() if node.node_type == "function"]
+    if start is not None:
+        pending.append(start)
+    reached = set()
+    while pending:
+        node = pending.pop()
+        if node.id in reached:
+            continue
+        reached.add(node.id)
+        for port in node.outputs:
+            if port.port_type == PortType.EXEC:
+                pending.extend(edge.target.node for edge in port.connected_edges)
+        for port in node.inputs:
+            if port.port_type != PortType.EXEC:
+                pending.extend(edge.source.node for edge in port.connected_edges)
+    for node_id in [node_id for node_id in graph.nodes if node_id not in reached]:
+        graph.remove_node(node_id)
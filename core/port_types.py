@@ -10,6 +10,11 @@ class PortType(Enum):
     CONDITION = "condition"
     PATH = "path"
     VARIABLE = "variable"
+    # a process's stdout piped into the next command, read by exactly one consumer
+    STREAM = "stream"
+    # the name of a bash array, indexed or associative: arrays cannot be passed by value
+    ARRAY = "array"
+    MAP = "map"
 
 class PortDirection(Enum):
     INPUT = "input"
@@ -27,6 +32,9 @@ BOOL_STYLE = PortStyle("#95E1D3", 10)
 PATH_STYLE = PortStyle("#F38181", 10)
 VARIABLE_STYLE = PortStyle("#FFA07A", 10)
 CONDITION_STYLE = PortStyle("#F7D046", 10)
+STREAM_STYLE = PortStyle("#5DADE2", 10)
+ARRAY_STYLE = PortStyle("#A569BD", 10)
+MAP_STYLE = PortStyle("#48C9B0", 10)
 
 PORT_STYLES = {
     PortType.EXEC: EXEC_STYLE,
@@ -36,4 +44,7 @@ PORT_STYLES = {
     PortType.CONDITION: CONDITION_STYLE,
     PortType.PATH: PATH_STYLE,
     PortType.VARIABLE: VARIABLE_STYLE,
+    PortType.STREAM: STREAM_STYLE,
+    PortType.ARRAY: ARRAY_STYLE,
+    PortType.MAP: MAP_STYLE,
 }
\ No newline at end of file
@@ -0,0 +1,108 @@
+# Per-node timing of a generated script.
+# ProfilingBashEmitter writes the same script as BashEmitter with a marker line before ("E") and
+# after ("L") the code of every exec node. Only Profile Script emits it, Run and Export use
+# BashEmitter and carry no marker. Each marker appends "E|L NODE_ID BASHPID EPOCHREALTIME" to the
+# file VISH_PROFILE names (/dev/null when it is not set) through a descriptor opened once, with the
+# printf builtin: no fork and no function call.
+# The status of the node before is put back for the node after. read_profile then rebuilds the
+# nesting of the nodes, one stack per shell process since background jobs run side by side.
+# Needs bash 5 for EPOCHREALTIME, older ones write no times and the profile stays empty.
+from dataclasses import dataclass
+from core.bash_context import BashContext
+from core.bash_emitter import BashEmitter
+from core.bash_helpers import helpers_of
+
+PRELUDE = r'''exec {__vish_profile_fd}>>"${VISH_PROFILE:-/dev/null}" || exec {__vish_profile_fd}>/dev/null
+# puts back the failed status of a node for the one after, unless set -e would stop on it
+__vish_status() {
+    [[ $- == *e* ]] || return "$1"
+}
+
+'''
+
+
+def marker(kind: str, node_id: int) -> str:
+    # a status of 0 is put back by the test itself, only a failure costs the function call
+    return (
+        f'__vish_rc=$?; printf "{kind} {node_id} %s %s\\n" "$BASHPID" "$EPOCHREALTIME" >&"$__vish_profile_fd"; '
+        f'((__vish_rc == 0)) || __vish_status "$__vish_rc"'
+    )
+
+
+class ProfilingBashEmitter(BashEmitter):
+    def emit(self) -> str:
+        # nodes given markers by the last emit
+        self.marked = 0
+        context = BashContext(self._profile())
+        context.profiling = self._marker
+        self._emit_nodes(context)
+        return self._header() + PRELUDE + helpers_of(self.graph, self._profile()) + context.get_script()
+
+    def emit_to(self, sink):
+        sink.write(self.emit())
+
+    def _marker(self, kind: str, node_id: int) -> str:
+        if kind == "E":
+            self.marked += 1
+        return marker(kind, node_id)
+
+
+@dataclass
+class NodeProfile:
+    node_id: int
+    calls: int = 0
+    # seconds, with the nodes run inside this one / without them
+    inclusive: float = 0.0
+    exclusive: float = 0.0
+
+
+def read_profile(lines) -> dict[int, NodeProfile]:
+    profiles = {}
+    # per shell process: [node id, entered at, time spent in nested nodes]
+    stacks = {}
+    last_seen = {}
+
+    def close(stack, node_id, at):
+        # a return, break, exit or failure skips leave markers: the frames above node_id
+        # end where it does
+        while stack:
+            frame_id, entered, nested = stack.pop()
+            duration = max(0.0, at - entered)
+            profile = profiles.setdefault(frame_id, NodeProfile(frame_id))
+            profile.calls += 1
+            profile.inclusive += duration
+            profile.exclusive += max(0.0, duration - nested)
+            if stack:
+                stack[-1][2] += duration
+            if frame_id == node_id:
+                return
+
+    for line in lines:
+        fields = line.split()
+        if len(fields) != 4 or fields[0] not in ("E", "L"):
+            continue
+        kind, node_id, pid, stamp = fields
+        try:
+            node_id = int(node_id)
+            # the decimal separator follows the locale
+            at = float(stamp.replace(",", "."))
+        except ValueError:
+            continue
+        stack = stacks.setdefault(pid, [])
+        last_seen[pid] = at
+        # entered again while still open: a loop came round after a continue left its leave out
+        if any(frame[0] == node_id for frame in stack):
+            close(stack, node_id, at)
+        if kind == "E":
+            stack.append([node_id, at, 0.0])
+
+    # what was still running when the script ended, with exit or on an error
+    for pid, stack in stacks.items():
+        if stack:
+            close(stack, None, last_seen[pid])
+    return profiles
+
+
+def read_profile_file(path) -> dict[int, NodeProfile]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return read_profile(f)
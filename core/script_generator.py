@@ -0,0 +1,100 @@
+# Regenerates the script of a graph off the GUI thread.
+# Requests are debounced on the trailing edge: a burst of edits starts a single generation once
+# no edit came for Config.GENERATION_DELAY_MS. Generations run one at a time on a worker thread,
+# against a GraphMirror of the graph, and only the newest one reaches the code view: a queued
+# job that is no longer the newest is skipped, a running one has its result dropped.
+import time
+from collections import deque
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+from core.bash_emitter import BashEmitter, IncrementalBashEmitter
+from core.config import Config
+from core.debug import Debug
+from core.graph import Graph
+from core.graph_mirror import GraphMirror
+from core.optimizer import optimize
+from core.traduction import Traduction
+
+
+class _GenerationJob(QRunnable):
+    def __init__(self, generator: "ScriptGenerator", generation: int):
+        super().__init__()
+        self.generator = generator
+        self.generation = generation
+
+    def run(self):
+        self.generator._generate(self.generation)
+
+
+class ScriptGenerator(QObject):
+    generated = Signal(str)
+    # seconds from the oldest edit a script includes to the code view showing it
+    latency_measured = Signal(float)
+    # emitted from the worker thread, delivered on the GUI thread
+    _finished = Signal(int, object)
+
+    def __init__(self, graph: Graph, parent=None):
+        super().__init__(parent)
+        self.mirror = GraphMirror(graph)
+        self.emitter = IncrementalBashEmitter(self.mirror.graph)
+        # last latencies, for the median / worst case shown in debug mode
+        self.latencies = deque(maxlen=100)
+        self._generation = 0
+        self._edited_at = None
+        self._closed = False
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._start)
+        self._finished.connect(self._on_finished)
+
+    def request(self, immediate: bool = False):
+        self._generation += 1
+        if self._edited_at is None:
+            self._edited_at = time.perf_counter()
+        self._timer.start(0 if immediate else Config.GENERATION_DELAY_MS)
+
+    def close(self):
+        self._closed = True
+        self._timer.stop()
+        self.mirror.close()
+        self._pool.clear()
+        self._pool.waitForDone()
+        self.emitter.close()
+
+    def _start(self):
+        self._pool.start(_GenerationJob(self, self._generation))
+
+    def _generate(self, generation: int):
+        # worker thread
+        if generation != self._generation or self._closed:
+            return
+        self.mirror.sync()
+        try:
+            if Config.OPTIMIZATION_LEVEL > 0:
+                # the passes rewrite a copy of the whole graph, there is nothing to reuse between runs
+                script = BashEmitter(optimize(self.mirror.graph, Config.OPTIMIZATION_LEVEL)).emit()
+            else:
+                script = self.emitter.emit()
+        except Exception as e:
+            script = None
+            Debug.Error(Traduction.get_trad("generation_failed", f"Failed to generate the script: {e}", error=e))
+        self._finished.emit(generation, script)
+
+    def _on_finished(self, generation: int, script):
+        if generation != self._generation or self._closed:
+            return
+        if script is not None:
+            self.generated.emit(script)
+        latency = time.perf_counter() - self._edited_at
+        self._edited_at = None
+        self.latencies.append(latency)
+        self.latency_measured.emit(latency)
+
+    def latency_summary(self):
+        # (median, worst) of the recorded latencies, in seconds
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[len(ordered) // 2], ordered[-1]
@@ -0,0 +1,262 @@
+# Runs a generated script without blocking the GUI thread.
+# bash runs in a session of its own, on a pseudo-terminal (the commands it starts see a terminal
+# and keep their colours) or on a pipe, stderr going to the same place as stdout. A QSocketNotifier
+# reads the output as it comes and hands it on in chunks. cancel() signals the whole process group:
+# the commands the script started go with it, the ones it put in the background too.
+# A worker thread waits for bash to exit, bash is reaped with wait4 on the GUI thread: every run
+# ends with a RunStats of its times and peak memory.
+# A process forked from the editor keeps the editor's peak memory past exec, so the script is not
+# started by the editor itself: LAUNCHER, a bash started from it, runs the script as its child, then
+# execs Python to REPORTER, which writes the usage of that child and its commands (RUSAGE_CHILDREN)
+# to a pipe of its own. The script's peak memory is then its own, from the size of bash up.
+import codecs
+import os
+import signal
+import subprocess
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from PySide6.QtCore import QObject, QRunnable, QSocketNotifier, QThreadPool, QTimer, Signal
+from core.config import Config
+
+if sys.platform != "win32":
+    import pty
+    import termios
+
+READ_SIZE = 65536
+
+# $1 bash, $2 the script, $3 the report pipe, $4 python, $5 REPORTER. The trap only lets the launcher
+# outlive a cancel to report: the script gets the signal from the group and its default action
+LAUNCHER = r'''trap : INT TERM HUP
+shopt -s execfail
+# the launcher's own stderr goes nowhere, bash would tell there about a script ended by a signal.
+# Only 0, 1, 2 and $3 are open: the next one keeps the script's stderr
+__vish_err=$(($3 + 1))
+eval "exec $__vish_err>&2 2>/dev/null"
+__vish_started=${EPOCHREALTIME:--}
+eval '"$1" "$2"' "2>&$__vish_err $__vish_err>&- $3>&-"
+__vish_status=$?
+__vish_ended=${EPOCHREALTIME:--}
+exec "$4" -I -S -c "$5" "$3" "$__vish_status" "$__vish_started" "$__vish_ended"
+exit "$__vish_status"
+'''
+# writes "user system max_rss started ended" of the launcher's children, exits with the script's status
+REPORTER = (
+    "import os, resource, sys; usage = resource.getrusage(resource.RUSAGE_CHILDREN); "
+    "os.write(int(sys.argv[1]), ' '.join(map(str, (usage.ru_utime, usage.ru_stime, usage.ru_maxrss, "
+    "*sys.argv[3:5]))).encode()); sys.exit(int(sys.argv[2]))"
+)
+
+
+@dataclass
+class RunStats:
+    # 128 + n when a signal n ended the script
+    exit_code: int
+    # seconds
+    wall_time: float
+    user_time: float
+    system_time: float
+    # peak resident set of the script's bash or of the largest command it waited for, None when the
+    # launcher could not report it (killed with the script)
+    max_rss_kb: int | None
+    output_bytes: int
+    cancelled: bool
+
+
+class _ExitWatch(QRunnable):
+    def __init__(self, runner: "ScriptRunner", generation: int, pid: int):
+        super().__init__()
+        self.runner = runner
+        self.generation = generation
+        self.pid = pid
+
+    def run(self):
+        try:
+            # not reaped: the group cannot be taken over by another process until the GUI thread does
+            os.waitid(os.P_PID, self.pid, os.WEXITED | os.WNOWAIT)
+        except ChildProcessError:
+            pass
+        self.runner._exited.emit(self.generation, time.perf_counter())
+
+
+class ScriptRunner(QObject):
+    output = Signal(str)
+    finished = Signal(object)
+    # emitted from the worker thread, delivered on the GUI thread
+    _exited = Signal(int, float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._process = None
+        self._fd = None
+        self._report_fd = None
+        self._notifier = None
+        self._decoder = None
+        self._cancelled = False
+        self._generation = 0
+        self._started_at = 0.0
+        self._output_bytes = 0
+        # stats of the last runs, the newest last
+        self.history = deque(maxlen=100)
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._exited.connect(self._on_exited)
+        self._kill_timer = QTimer(self)
+        self._kill_timer.setSingleShot(True)
+        self._kill_timer.timeout.connect(lambda: self._signal(signal.SIGKILL))
+
+    def is_running(self) -> bool:
+        return self._process is not None
+
+    def last_stats(self) -> RunStats | None:
+        return self.history[-1] if self.history else None
+
+    def start(self, script_path: str, bash: str = "bash", use_pty: bool = True, env: dict | None = None):
+        if self._process is not None:
+            raise RuntimeError("a script is already running")
+        if use_pty:
+            self._fd, slave_fd = pty.openpty()
+            # plain "\n" line ends, as on a pipe
+            attributes = termios.tcgetattr(slave_fd)
+            attributes[1] &= ~termios.ONLCR
+            termios.tcsetattr(slave_fd, termios.TCSANOW, attributes)
+            streams = {"stdin": slave_fd, "stdout": slave_fd, "stderr": slave_fd}
+        else:
+            self._fd, slave_fd = os.pipe()
+            streams = {"stdin": subprocess.DEVNULL, "stdout": slave_fd, "stderr": slave_fd}
+        self._report_fd, report_write = os.pipe()
+        self._started_at = time.perf_counter()
+        try:
+            self._process = subprocess.Popen(
+                [bash, "-c", LAUNCHER, "vish", bash, script_path, str(report_write), sys.executable, REPORTER],
+                close_fds=True, pass_fds=(report_write,), start_new_session=True,
+                env=dict(os.environ, **env) if env else None, **streams
+            )
+        except OSError:
+            os.close(self._fd)
+            os.close(self._report_fd)
+            self._fd = self._report_fd = None
+            raise
+        finally:
+            os.close(slave_fd)
+            os.close(report_write)
+        os.set_blocking(self._report_fd, False)
+
+        os.set_blocking(self._fd, False)
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._cancelled = False
+        self._output_bytes = 0
+        self._generation += 1
+        self._notifier = QSocketNotifier(self._fd, QSocketNotifier.Read, self)
+        self._notifier.activated.connect(self._read)
+        self._pool.start(_ExitWatch(self, self._generation, self._process.pid))
+
+    def cancel(self):
+        if self._process is None or self._cancelled:
+            return
+        self._cancelled = True
+        self._signal(signal.SIGTERM)
+        self._kill_timer.start(Config.RUN_KILL_DELAY_MS)
+
+    def close(self):
+        # kills a running script and waits for it, without going back to the event loop
+        if self._process is None:
+            return
+        self._cancelled = True
+        self._signal(signal.SIGKILL)
+        self._finish(None)
+        self._pool.waitForDone()
+
+    def _signal(self, signum: int):
+        # the group id is the pid of bash, which stays reserved until bash is reaped in _finish
+        if self._process is None:
+            return
+        try:
+            os.killpg(self._process.pid, signum)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def _read(self):
+        chunks = []
+        while self._fd is not None:
+            try:
+                chunk = os.read(self._fd, READ_SIZE)
+            except BlockingIOError:
+                break
+            except OSError:
+                # EIO: every end of the pseudo-terminal was closed
+                chunk = b""
+            if not chunk:
+                self._close_output()
+                break
+            chunks.append(chunk)
+            self._output_bytes += len(chunk)
+        if chunks:
+            text = self._decoder.decode(b"".join(chunks))
+            if text:
+                self.output.emit(text)
+
+    def _close_output(self):
+        if self._notifier is not None:
+            self._notifier.setEnabled(False)
+            self._notifier.deleteLater()
+            self._notifier = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _read_report(self, stats: RunStats):
+        try:
+            report = os.read(self._report_fd, READ_SIZE).decode().split(" ")
+        except (BlockingIOError, UnicodeDecodeError):
+            report = []
+        finally:
+            os.close(self._report_fd)
+            self._report_fd = None
+        if len(report) != 5:
+            return
+        user_time, system_time, max_rss, started, ended = report
+        stats.user_time = float(user_time)
+        stats.system_time = float(system_time)
+        # bytes on macOS
+        stats.max_rss_kb = int(max_rss) // 1024 if sys.platform == "darwin" else int(max_rss)
+        if started != "-" and ended != "-":
+            # without the start of the launcher and of the reporter; the separator follows the locale
+            stats.wall_time = float(ended.replace(",", ".")) - float(started.replace(",", "."))
+
+    def _on_exited(self, generation: int, ended: float):
+        if generation == self._generation and self._process is not None:
+            self._finish(ended)
+
+    def _finish(self, ended: float | None):
+        if self._cancelled:
+            # whatever ignored SIGTERM or outlived bash
+            self._signal(signal.SIGKILL)
+        _, status, usage = os.wait4(self._process.pid, 0)
+        if ended is None:
+            ended = time.perf_counter()
+        exit_code = os.waitstatus_to_exitcode(status)
+        # Popen must not wait for it again
+        self._process.returncode = exit_code
+        self._kill_timer.stop()
+        # what the script wrote last, commands it left in the background are not waited for
+        self._read()
+        self._close_output()
+        text = self._decoder.decode(b"", final=True)
+        if text:
+            self.output.emit(text)
+        self._process = None
+        stats = RunStats(
+            exit_code=128 - exit_code if exit_code < 0 else exit_code,
+            wall_time=ended - self._started_at,
+            user_time=usage.ru_utime,
+            system_time=usage.ru_stime,
+            max_rss_kb=None,
+            output_bytes=self._output_bytes,
+            cancelled=self._cancelled,
+        )
+        self._read_report(stats)
+        self.history.append(stats)
+        self.finished.emit(stats)
@@ -20,22 +20,22 @@ class Serializer:
         
         for node in graph.nodes.values():
             node_data = {
-                "id": node.id,
+                "id": node.key,
                 "type": node.node_type,
                 "title": node.title,
                 "x": node.x,
                 "y": node.y,
                 "properties": node.properties,
-                "inputs": [{"id": p.id, "name": p.name, "type": p.port_type.value} for p in node.inputs],
-                "outputs": [{"id": p.id, "name": p.name, "type": p.port_type.value} for p in node.outputs]
+                "inputs": [{"id": p.key, "name": p.name, "type": p.port_type.value} for p in node.inputs],
+                "outputs": [{"id": p.key, "name": p.name, "type": p.port_type.value} for p in node.outputs]
             }
             data["nodes"].append(node_data)
         
         for edge in graph.edges.values():
             edge_data = {
-                "id": edge.id,
-                "source": edge.source.id,
-                "target": edge.target.id
+                "id": edge.key,
+                "source": edge.source.key,
+                "target": edge.target.key
             }
             data["edges"].append(edge_data)
 
@@ -66,7 +66,7 @@ class Serializer:
             if node is None:
                 raise ValueError(f"Unknown node type: {node_data['type']}")
             
-            node.id = node_data["id"]
+            node.key = node_data["id"]
             node.title = node_data["title"]
             node.x = node_data["x"]
             node.y = node_data["y"]
@@ -74,12 +74,12 @@ class Serializer:
             graph.add_node(node)
 
             for saved, port in zip(node_data.get("inputs", []), node.inputs):
-                port.id = saved["id"]
-                port_map[port.id] = port
+                port.key = saved["id"]
+                port_map[port.key] = port
 
             for saved, port in zip(node_data.get("outputs", []), node.outputs):
-                port.id = saved["id"]
-                port_map[port.id] = port
+                port.key = saved["id"]
+                port_map[port.key] = port
 
         for edge_data in data["edges"]:
             source = port_map.get(edge_data["source"])
@@ -1,8 +1,8 @@
-from core.port_types import PortDirection
+from core.port_types import PortDirection, PortType
 
 class GraphValidator:
     @staticmethod
-    def is_valid_connection(graph, existing_edges, a, b) -> bool:
+    def is_valid_connection(graph, a, b) -> bool:
         if a is b:
             return False
 
@@ -22,31 +22,14 @@ class GraphValidator:
             src = b.port
             dst = a.port
 
-        if GraphValidator._can_reach(graph, dst.node, src.node):
+        if dst.connected_edges:
             return False
 
-        for edge in existing_edges:
-            if edge.target_port is (b if b.is_input else a):
-                return False
-
-        return True
-
-    @staticmethod
-    def _can_reach(graph, start_node, target_node) -> bool:
-        visited = set()
-
-        def dfs(node):
-            if node.id in visited:
-                return False
-            visited.add(node.id)
-
-            if node is target_node:
-                return True
+        # every consumer would run the producing command again
+        if src.port_type == PortType.STREAM and src.connected_edges:
+            return False
 
-            for edge in graph.edges.values():
-                if edge.source.node is node:
-                    if dfs(edge.target.node):
-                        return True
+        if graph.order.would_create_cycle(src.node.id, dst.node.id):
             return False
 
-        return dfs(start_node)
\ No newline at end of file
+        return True
@@ -1,20 +1,20 @@
 import sys
 IS_WINDOWS = sys.platform == "win32"
 
-if not IS_WINDOWS:
-    import pty
-
 import os
 import sys
-import subprocess
+import tempfile
 import time
+from pathlib import Path
 from PySide6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, 
                                QWidget, QPushButton, QHBoxLayout, QTextEdit,
                                QSplitter, QFileDialog, QToolButton, QMenu, QDialog)
-from PySide6.QtCore import Qt, QRectF
+from PySide6.QtCore import Qt, QRectF, QTimer
 from PySide6.QtGui import QColor, QKeySequence, QIcon
 from core.graph import Graph
-from core.bash_emitter import BashEmitter
+from core.script_generator import ScriptGenerator
+from core.script_runner import RunStats, ScriptRunner
+from core.profiler import ProfilingBashEmitter, read_profile_file
 from core.serializer import Serializer
 from nodes.flow_nodes import StartNode, IfNode, ForNode
 from nodes.command_nodes import RunCommandNode, EchoNode, ExitNode
@@ -28,9 +28,10 @@ from ui.settings import SettingsDialog
 from ui.menu_style import apply_btn_style, apply_menu_style, apply_icon_for_btn
 from ui.about.about import AboutDialog
 from ui.keyboard_shortcuts import KeyboardShortcutsDialog
-from nodes.registry import NODE_REGISTRY
+from ui.run_console import RunConsole, RunStatus
+from ui.profile_table import ProfileDialog
+from nodes.registry import NODE_REGISTRY, NodeFactory
 from core.highlights import BashHighlighter
-from core.ansi_to_html import ansi_to_html
 from core.config import Config, ConfigManager
 from core.debug import Info, Debug
 from core.traduction import Traduction
@@ -38,14 +39,6 @@ from core.projects import ProjectManager
 from ui.welcome import WelcomeScreen
 from theme.theme import Theme, set_dark_theme, set_purple_theme, set_white_theme
 
-class NodeFactory:
-    @staticmethod
-    def create_node(node_type: str):
-        entry = NODE_REGISTRY.get(node_type)
-        return entry["class"]() if entry else None
-
-
-
 class VisualBashEditor(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -53,8 +46,21 @@ class VisualBashEditor(QMainWindow):
         self.resize(1400, 900)
         
         self.graph = Graph()
+        self.generator = None
         self.node_factory = NodeFactory()
         self.project_manager = ProjectManager()
+
+        self.auto_save_timer = QTimer(self)
+        self.auto_save_timer.setSingleShot(True)
+        self.auto_save_timer.timeout.connect(self.auto_save)
+
+        self.runner = ScriptRunner(self)
+        self.runner.output.connect(self.append_run_output)
+        self.runner.finished.connect(self.on_run_finished)
+        self.run_script_path = None
+        # marker file of a profiled run
+        self.profile_path = None
+        self.profile_dialog = None
         
         self.setup_ui()
         self.create_initial_graph()
@@ -104,6 +110,11 @@ class VisualBashEditor(QMainWindow):
         self.more_menu = QMenu(self)
         apply_menu_style(self.more_menu)
 
+        self.profile_action = self.more_menu.addAction(
+            Traduction.get_trad("profile_script", "Profile Script")
+        )
+        self.profile_action.triggered.connect(self.profile_bash)
+
         self.settings_action = self.more_menu.addAction(
             Traduction.get_trad("settings", "Settings")
         )
@@ -133,7 +144,7 @@ class VisualBashEditor(QMainWindow):
         self.graph_view = GraphView(self.graph, self)
         splitter.addWidget(self.graph_view)
         
-        self.property_panel = PropertyPanel()
+        self.property_panel = PropertyPanel(self.graph)
         splitter.addWidget(self.property_panel)
 
         self.output_splitter = QSplitter(Qt.Vertical)
@@ -142,16 +153,19 @@ class VisualBashEditor(QMainWindow):
         self.output_text.setReadOnly(True)
         self.output_text.setMinimumWidth(300)
 
-        self.run_output_text = QTextEdit()
-        self.run_output_text.setReadOnly(True)
-        self.run_output_text.setVisible(False)
-        self.run_output_text.setMinimumHeight(150)
-        self.run_output_text.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.run_output_text.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.run_output_text.setLineWrapMode(QTextEdit.NoWrap)
+        self.run_panel = QWidget()
+        self.run_panel.setVisible(False)
+        run_layout = QVBoxLayout(self.run_panel)
+        run_layout.setContentsMargins(0, 0, 0, 0)
+        run_layout.setSpacing(0)
+        self.run_console = RunConsole()
+        self.run_console.setMinimumHeight(150)
+        run_layout.addWidget(self.run_console)
+        self.run_status = RunStatus()
+        run_layout.addWidget(self.run_status)
 
         self.output_splitter.addWidget(self.output_text)
-        self.output_splitter.addWidget(self.run_output_text)
+        self.output_splitter.addWidget(self.run_panel)
         self.output_splitter.setSizes([300, 0])
 
         splitter.addWidget(self.output_splitter)
@@ -183,13 +197,23 @@ class VisualBashEditor(QMainWindow):
         if not self.graph.nodes:
             Debug.Warn(Traduction.get_trad("warn_generating_empty_graph", "Generating an empty graph."))
         print(f"EDGES: {len(self.graph.edges)}")
-        emitter = BashEmitter(self.graph)
-        bash_script = emitter.emit()
-        self.output_text.setPlainText(bash_script)
+        self.generator.request(immediate=True)
+
+    def _on_generation_latency(self, latency: float):
+        if not Config.DEBUG:
+            return
+        median, worst = self.generator.latency_summary()
+        self.statusBar().showMessage(Traduction.get_trad(
+            "generation_latency",
+            f"Code view updated {latency * 1000:.0f} ms after the edit (median {median * 1000:.0f} ms, worst {worst * 1000:.0f} ms)",
+            latency=f"{latency * 1000:.0f}", median=f"{median * 1000:.0f}", worst=f"{worst * 1000:.0f}",
+        ), 5000)
 
     def open_settings(self):
         dialog = SettingsDialog(self)
         dialog.traduction_changed.connect(self.graph_view.rebuild_graph)
+        dialog.optimization_changed.connect(self.generate_bash)
+        dialog.profile_changed.connect(self.generate_bash)
         dialog.exec()
 
     def open_about(self):
@@ -296,50 +320,33 @@ class VisualBashEditor(QMainWindow):
         if Config.AUTO_SAVE:
             self.save_graph(msg=False)
 
+    def schedule_auto_save(self):
+        # saved once the edits stop, not on every one of them
+        if Config.AUTO_SAVE:
+            self.auto_save_timer.start(Config.AUTO_SAVE_DELAY_MS)
+
     def _connect_signals(self):
-        self.graph_view.graph_scene.graph_changed.connect(self.generate_bash)
-        self.graph_view.graph_scene.graph_changed.connect(self.auto_save)
+        self.graph_view.graph_scene.graph_changed.connect(self._request_generation)
+        self.graph_view.graph_scene.graph_changed.connect(self.schedule_auto_save)
         self.graph_view.graph_scene.node_selected.connect(self.property_panel.set_node)
+        self.property_panel.set_graph(self.graph)
+        self._reset_generator()
 
-    def run_pty(self, script_path: str) -> str:
-        master_fd, slave_fd = pty.openpty()
+    def _reset_generator(self):
+        if self.generator is not None:
+            self.generator.close()
+            self.generator.deleteLater()
+        self.generator = ScriptGenerator(self.graph, self)
+        self.generator.generated.connect(self.output_text.setPlainText)
+        self.generator.latency_measured.connect(self._on_generation_latency)
 
-        proc = subprocess.Popen(
-            ["bash", "-i", script_path],
-            stdin=slave_fd,
-            stdout=slave_fd,
-            stderr=slave_fd,
-            close_fds=True,
-            text=False,
-        )
-
-        os.close(slave_fd)
-
-        output = b""
-        while True:
-            try:
-                chunk = os.read(master_fd, 1024)
-                if not chunk:
-                    break
-                output += chunk
-            except OSError:
-                break
-
-        proc.wait()
-        os.close(master_fd)
-
-        output = output.decode(errors="replace")
-
-        filtered = []
-        for line in output.splitlines(): # NOTE: i have to filter some lines because bash -i outputs them
-            if (
-                "cannot set terminal process group" in line
-                or "no job control in this shell" in line
-            ):
-                continue
-            filtered.append(line)
+    def _request_generation(self):
+        self.generator.request()
 
-        return "\n".join(filtered)
+    def closeEvent(self, event):
+        self.generator.close()
+        self.runner.close()
+        super().closeEvent(event)
 
     def find_bash(self):
         if not IS_WINDOWS:
@@ -362,37 +369,52 @@ class VisualBashEditor(QMainWindow):
         return None
 
 
-    def run_no_pty(self, script_path: str) -> str:
-        bash_cmd = self.find_bash()
-
-        if not bash_cmd:
-            return (
-                "\x1b[1;31mError:\x1b[0m\n"
-                "No Bash executable found.\nInstall Git Bash or enable WSL."
-            )
-
-        result = subprocess.run(
-            [bash_cmd, script_path],
-            capture_output=True,
-            text=True
-        )
-
-        if result.stderr:
-            return f"\x1b[1;31mError:\x1b[0m\n{result.stderr}"
-
-        return result.stdout
-
-    
     def run_bash(self):
+        if self.runner.is_running():
+            self.runner.cancel()
+            return
         if Info.get_os() == "Windows":
             Debug.Warn(Traduction.get_trad("running_windows", "It is not possible to run scripts on Windows."))
             return
         self.set_run_output_visible(True)
         bash_script = self.output_text.toPlainText()
-        self.run_output_text.clear()
+        self.run_console.clear()
+        self.run_status.clear()
         if not bash_script.strip() or len(bash_script) == 49: # 49 is length of the header
             Debug.Warn(Traduction.get_trad("no_bash_script", "No bash script found to run the graph."))
             return
+        self._start_script(bash_script)
+
+    def profile_bash(self):
+        if self.runner.is_running():
+            return
+        if Info.get_os() == "Windows":
+            Debug.Warn(Traduction.get_trad("running_windows", "It is not possible to run scripts on Windows."))
+            return
+        self.set_run_output_visible(True)
+        self.run_console.clear()
+        self.run_status.clear()
+        # the graph as it is, without the optimization passes: every marker is the id of a node shown
+        emitter = ProfilingBashEmitter(self.graph)
+        bash_script = emitter.emit()
+        if not emitter.marked:
+            Debug.Warn(Traduction.get_trad("no_bash_script", "No bash script found to run the graph."))
+            return
+        fd, profile_path = tempfile.mkstemp(prefix="vish_profile_", suffix=".log")
+        os.close(fd)
+        if self._start_script(bash_script, {"VISH_PROFILE": profile_path}):
+            self.profile_path = profile_path
+        else:
+            os.remove(profile_path)
+
+    def _start_script(self, bash_script: str, env: dict | None = None) -> bool:
+        bash_cmd = self.find_bash()
+        if not bash_cmd:
+            self.run_console.write(
+                "\x1b[1;31mError:\x1b[0m\n"
+                "No Bash executable found.\nInstall Git Bash or enable WSL."
+            )
+            return False
 
         temp_script_path = f"temp_script_{int(time.time())}.sh"
         with open(temp_script_path, "w") as f:
@@ -402,30 +424,85 @@ class VisualBashEditor(QMainWindow):
 
         Debug.Log(Traduction.get_trad("running_generated_bash_script", "Running generated bash script..."))
 
+        self.show_profile(None)
+        self.run_panel.setVisible(True)
+        self.output_splitter.setSizes([200, 150])
+        self.run_console.open_log(self.run_log_path())
         try:
-            if Config.USING_TTY:
-                output = self.run_pty(temp_script_path)
-            else:
-                output = self.run_no_pty(temp_script_path)
-
-            self.run_output_text.setVisible(True)
-            self.output_splitter.setSizes([200, 150])
-
-            self.run_output_text.setHtml(ansi_to_html(output))
-
+            self.runner.start(temp_script_path, bash_cmd, Config.USING_TTY, env)
         except Exception as e:
-            self.run_output_text.setVisible(True)
-            self.run_output_text.setPlainText(str(e))
-
-        finally:
+            self.run_console.write(str(e))
+            self.run_console.close_log()
             os.remove(temp_script_path)
+            return False
+        self.run_script_path = temp_script_path
+        self.run_status.show_running()
+        self.run_bash_btn.setText(Traduction.get_trad("btn_stop_script", "Stop Script"))
+        return True
+
+    def append_run_output(self, text: str):
+        self.run_console.write(text)
+
+    def run_log_path(self) -> Path:
+        directory = self.project_manager.get_project_path() or Path(Info.get_config_path()).parent
+        return directory / "run.log"
+
+    def on_run_finished(self, stats: RunStats):
+        self.run_console.flush()
+        self.run_console.close_log()
+        self.run_status.show_stats(stats)
+        if self.run_script_path is not None:
+            os.remove(self.run_script_path)
+            self.run_script_path = None
+        self.run_bash_btn.setText(Traduction.get_trad("btn_run_bash", "Run Bash Script"))
+        if self.profile_path is not None:
+            profiles = read_profile_file(self.profile_path)
+            os.remove(self.profile_path)
+            self.profile_path = None
+            self.show_profile(profiles)
+
+    def show_profile(self, profiles):
+        # colours the nodes by their own time and lists them, None takes the colours off
+        if profiles is None:
+            for item in self.graph_view.node_items.values():
+                if item.heat is not None:
+                    item.set_heat(None)
+            return
+        slowest = max((profile.exclusive for profile in profiles.values()), default=0.0)
+        titles = {}
+        for node_id, item in self.graph_view.node_items.items():
+            profile = profiles.get(node_id)
+            if profile is None:
+                item.set_heat(None)
+                continue
+            item.set_heat(
+                profile.exclusive / slowest if slowest else 0.0,
+                f"{profile.exclusive * 1000:.1f} ms · {profile.calls}x",
+            )
+            titles[node_id] = item.title_item.toPlainText()
+        if self.profile_dialog is None:
+            self.profile_dialog = ProfileDialog(self)
+            self.profile_dialog.node_activated.connect(self.focus_node)
+        self.profile_dialog.set_profile(
+            {node_id: profile for node_id, profile in profiles.items() if node_id in titles}, titles
+        )
+        self.profile_dialog.show()
+        self.profile_dialog.raise_()
+
+    def focus_node(self, node_id: int):
+        item = self.graph_view.node_items.get(node_id)
+        if item is None:
+            return
+        self.graph_view.graph_scene.clearSelection()
+        item.setSelected(True)
+        self.graph_view.centerOn(item)
 
     def set_run_output_visible(self, visible: bool):
-        self.run_output_text.setVisible(visible)
+        self.run_panel.setVisible(visible)
 
     def toggle_run_output(self):
-        visible = self.run_output_text.isVisible()
-        self.run_output_text.setVisible(not visible)
+        visible = self.run_panel.isVisible()
+        self.run_panel.setVisible(not visible)
 
         if visible:
             self.output_splitter.setSizes([1, 0])
@@ -436,10 +513,14 @@ class VisualBashEditor(QMainWindow):
         self.generate_btn.setText(Traduction.get_trad("btn_generate_bash", "Generate Bash"))
         self.save_btn.setText(Traduction.get_trad("btn_save", "Save"))
         self.load_btn.setText(Traduction.get_trad("btn_load", "Load"))
-        self.run_bash_btn.setText(Traduction.get_trad("btn_run_bash", "Run Bash Script"))
+        if self.runner.is_running():
+            self.run_bash_btn.setText(Traduction.get_trad("btn_stop_script", "Stop Script"))
+        else:
+            self.run_bash_btn.setText(Traduction.get_trad("btn_run_bash", "Run Bash Script"))
         self.copy_btn.setText(Traduction.get_trad("btn_copy_clipboard", "Copy to Clipboard"))
 
         self.more_btn.setToolTip(Traduction.get_trad("more_options", "More options"))
+        self.profile_action.setText(Traduction.get_trad("profile_script", "Profile Script"))
         self.settings_action.setText(Traduction.get_trad("settings", "Settings"))
         self.about_action.setText(Traduction.get_trad("about", "About"))
         self.keyboard.setText(Traduction.get_trad("keyboard_shortcuts", "Keyboard Shortcuts"))
@@ -455,6 +536,8 @@ class VisualBashEditor(QMainWindow):
             self.load_graph()
         elif event.key() == Qt.Key_G and event.modifiers() & Qt.ControlModifier: # Ctrl+G
             self.generate_bash()
+        elif event.key() == Qt.Key_R and event.modifiers() & Qt.ControlModifier and event.modifiers() & Qt.ShiftModifier: # Ctrl+Shift+R
+            self.profile_bash()
         elif event.key() == Qt.Key_R and event.modifiers() & Qt.ControlModifier: # Ctrl+R
             self.run_bash()
         super().keyPressEvent(event)
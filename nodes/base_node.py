@@ -3,6 +3,10 @@ from core.graph import Node, PortType
 from core.bash_context import BashContext
 
 class BaseNode(Node):
+    __slots__ = ("color",)
+    # names of the core.bash_helpers functions the emitted code calls
+    HELPERS = ()
+
     def __init__(self, node_type: str, title: str, color: str):
         super().__init__(node_type, title)
         self.color = color
@@ -17,6 +21,35 @@ class BaseNode(Node):
     def emit_condition(self, context):
         return None
 
+    def helpers(self, profile: str):
+        return self.HELPERS
+
+    def emit_stream(self, context):
+        # the pipeline writing to this node's stream output
+        return None
+
+    def array_name(self):
+        # the variable behind this node's Array / Map output
+        return None
+
+    @staticmethod
+    def array_of(port, default: str) -> str:
+        # name of the array connected to port, default when nothing is
+        if port.connected_edges:
+            name = port.connected_edges[0].source.node.array_name()
+            if name:
+                return name
+        return default
+
+    @staticmethod
+    def pipe_into(port, context, command: str) -> str:
+        # command, reading the pipeline connected to port if there is one
+        if port.connected_edges:
+            upstream = port.connected_edges[0].source.node.emit_stream(context)
+            if upstream:
+                return f"{upstream} | {command}"
+        return command
+
     def get_next_exec_node(self):
         exec_outputs = [
             o for o in self.outputs
@@ -29,6 +62,10 @@ class BaseNode(Node):
     
     @staticmethod
     def emit_exec_chain(start_node, context, stop_at=None):
+        if context.fragments is not None:
+            context.fragments.emit_chain(start_node, context, stop_at)
+            return
+
         current = start_node
         while current:
             if current.id in context.emitted_nodes:
@@ -36,11 +73,20 @@ class BaseNode(Node):
 
             context.emitted_nodes.add(current.id)
 
+            context.next_node = None
+            # a function node writes its definition away from here, its body nodes are marked
+            marked = context.profiling is not None and current.node_type != "function"
+            if marked:
+                context.add_line(context.profiling("E", current.id))
             bash = current.emit_bash(context)
             if bash:
                 context.add_line(bash)
+            if marked:
+                context.add_line(context.profiling("L", current.id))
 
             if current == stop_at:
                 break
 
-            current = current.get_next_exec_node()
\ No newline at end of file
+            # blocks hand their Next chain back here instead of emitting it themselves,
+            # so consecutive blocks do not nest one call deeper each
+            current = context.next_node or current.get_next_exec_node()
\ No newline at end of file
@@ -1,19 +1,35 @@
+import re
 from core.port_types import PortType
 from core.bash_context import BashContext
+from core.debug import Debug
 from .base_node import BaseNode
 from nodes.registry import register_node
 
+# a command list would take the rest of the pipeline with it: "a | b; c" pipes into b only
+_LIST = re.compile(r"[;&\n]|\|\|")
+
+
+def pipeline_stage(command: str) -> str:
+    if _LIST.search(command):
+        return f"{{ {command}; }}"
+    return command
+
+
 @register_node("run_command", category="Commands", label="Run a command", description="Executes a shell command")
 class RunCommandNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("run_command", "Run Command", "#2ECC71")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
         self.add_input("Command", PortType.STRING, "Command to run")
         self.add_output("Exec", PortType.EXEC, "Control flow output")
         self.add_output("Output", PortType.STRING, "Command output")
+        self.add_input("Stdin", PortType.STREAM, "Output of the previous command in the pipeline")
+        self.add_output("Stdout", PortType.STREAM, "Piped into the next command")
         self.properties["command"] = "ls"
     
-    def emit_bash(self, context: BashContext) -> str:
+    def command(self) -> str:
         command = self.properties.get("command", "")
         
         cmd_port = self.inputs[1]
@@ -23,8 +39,21 @@ class RunCommandNode(BaseNode):
         
         return command
 
+    def emit_stream(self, context: BashContext) -> str:
+        return self.pipe_into(self.inputs[2], context, pipeline_stage(self.command()))
+
+    def emit_bash(self, context: BashContext) -> str:
+        if self.outputs[2].connected_edges:
+            # runs inside the pipeline it feeds
+            return ""
+        if self.inputs[2].connected_edges:
+            return self.emit_stream(context)
+        return self.command()
+
 @register_node("echo", category="Commands", label="Print a text", description="Prints a text to the console")
 class EchoNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("echo", "Echo", "#3498DB")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -40,7 +69,7 @@ class EchoNode(BaseNode):
         if text_port.connected_edges:
             source_node = text_port.connected_edges[0].source.node
 
-            value = source_node.emit_bash_value(context)
+            value = context.value_of(source_node)
             if value is not None:
                 text = value
 
@@ -48,6 +77,8 @@ class EchoNode(BaseNode):
 
 @register_node("exit", category="Commands", label="Exit script", description="Exits the script with a status code")
 class ExitNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("exit", "Exit", "#E74C3C")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -62,4 +93,103 @@ class ExitNode(BaseNode):
             source_node = code_port.connected_edges[0].source.node
             code = source_node.properties.get("value", code)
         
-        return f"exit {code}"
\ No newline at end of file
+        return f"exit {code}"
+
+@register_node("pipeline", category="Commands", label="Pipeline", description="Runs the commands piped into it, streaming from one to the next")
+class PipelineNode(BaseNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("pipeline", "Pipeline", "#16A085")
+        self.add_input("Exec", PortType.EXEC, "Control flow input")
+        self.add_input("Stdin", PortType.STREAM, "Last command of the pipeline")
+        self.add_output("Exec", PortType.EXEC, "Control flow output")
+        # fail when any command of the pipeline failed, not only the last one
+        self.properties["pipefail"] = "true"
+        # file the pipeline writes to, empty for the script's output
+        self.properties["output"] = ""
+
+    def emit_bash(self, context: BashContext) -> str:
+        stdin = self.inputs[1]
+        pipeline = stdin.connected_edges[0].source.node.emit_stream(context) if stdin.connected_edges else None
+        if not pipeline:
+            Debug.Warn("Pipeline Node: nothing piped in, skipping.")
+            return ""
+
+        output = self.properties.get("output", "")
+        if output:
+            pipeline += f' > "{output}"'
+        if str(self.properties.get("pipefail", "")).strip().lower() not in ("true", "1", "yes"):
+            return pipeline
+
+        # the status of the last failed command, like set -o pipefail but without touching the script's options
+        context.add_line(pipeline)
+        context.add_line('__vish_pipestatus=("${PIPESTATUS[@]}")')
+        context.add_line("__vish_status=0")
+        context.add_line('for __vish_code in "${__vish_pipestatus[@]}"; do')
+        context.indent()
+        context.add_line("(( __vish_code == 0 )) || __vish_status=$__vish_code")
+        context.dedent()
+        context.add_line("done")
+        context.add_line('(( __vish_status == 0 )) || (exit "$__vish_status")')
+        return ""
+
+_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_NUMBER = re.compile(r"[0-9]+")
+
+
+@register_node("cached_command", category="Commands", label="Run a cached command", description="Runs a command once per time to live, replaying its output and exit status from a cache in between")
+class CachedCommandNode(BaseNode):
+    __slots__ = ()
+    HELPERS = ("__vish_cached",)
+
+    def __init__(self):
+        super().__init__("cached_command", "Cached Command", "#27AE60")
+        self.add_input("Exec", PortType.EXEC, "Control flow input")
+        self.add_input("Command", PortType.STRING, "Command to run")
+        self.add_output("Exec", PortType.EXEC, "Control flow output")
+        self.add_output("Stdout", PortType.STREAM, "Piped into the next command")
+        self.properties["command"] = "ls"
+        # seconds a result is replayed for, 0 for ever
+        self.properties["ttl"] = "3600"
+        # variables whose values are part of the cache key, separated by spaces or commas (PWD for commands reading the current directory)
+        self.properties["env"] = ""
+        # empty: $VISH_CACHE_DIR, or vish/ in the user's cache directory
+        self.properties["directory"] = ""
+        # size of the directory above which the oldest results are removed, empty: $VISH_CACHE_MAX_KB or 100 MiB
+        self.properties["max_size_kb"] = ""
+        # hits and misses written to stderr
+        self.properties["log"] = "false"
+
+    command = RunCommandNode.command
+
+    def _number(self, key: str, default: str) -> str:
+        value = str(self.properties.get(key, "")).strip()
+        if not value:
+            return default
+        if not _NUMBER.fullmatch(value):
+            Debug.Warn(f"Cached Command Node: {key} must be a whole number, using {default}.")
+            return default
+        return value
+
+    def emit_stream(self, context: BashContext) -> str:
+        command = self.command()
+        names = []
+        for name in re.split(r"[\s,]+", str(self.properties.get("env", "")).strip()):
+            if not name:
+                continue
+            if _NAME.fullmatch(name):
+                names.append(name)
+            else:
+                Debug.Warn(f"Cached Command Node: '{name}' is not a variable name, left out of the key.")
+        directory = self.properties.get("directory", "") or "${VISH_CACHE_DIR:-${XDG_CACHE_HOME:-$HOME/.cache}/vish}"
+        ttl = self._number("ttl", "3600")
+        max_size = self._number("max_size_kb", "${VISH_CACHE_MAX_KB:-102400}")
+        log = "true" if str(self.properties.get("log", "")).strip().lower() in ("true", "1", "yes") else "false"
+        quoted = "'" + command.replace("'", "'\\''") + "'"
+        return " ".join([f'__vish_cached "{directory}" {ttl} "{max_size}" {log} {quoted}'] + names + ['-- "$@"'])
+
+    def emit_bash(self, context: BashContext) -> str:
+        if self.outputs[1].connected_edges:
+            return ""
+        return self.emit_stream(context)
@@ -6,6 +6,8 @@ from nodes.base_node import BaseNode
 
 @register_node("start", category="Flow", label="Start", description="The starting point of the flow")
 class StartNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("start", "Start", "#4A90E2")
         self.add_output("Exec", PortType.EXEC, "Start of the flow")
@@ -15,6 +17,8 @@ class StartNode(BaseNode):
 
 @register_node("if", category="Flow", label="If Condition", description="Evaluates a condition and branches the flow")
 class IfNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("if", "If", "#E94B3C")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -42,10 +46,7 @@ class IfNode(BaseNode):
         context.add_line("fi")
         next_port = self.outputs[2]
         if next_port.connected_edges:
-            BaseNode.emit_exec_chain(
-                next_port.connected_edges[0].target.node,
-                context
-            )
+            context.next_node = next_port.connected_edges[0].target.node
 
         return ""
 
@@ -61,6 +62,8 @@ class IfNode(BaseNode):
 
 @register_node("for", category="Flow", label="For Loop", description="Iterates over a list")
 class ForNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("for", "For Loop", "#9B59B6")
 
@@ -73,14 +76,22 @@ class ForNode(BaseNode):
 
         self.properties["variable"] = "item"
 
-    def emit_bash(self, context: BashContext) -> str:
-        var_name = self.properties.get("variable", "item")
+    def list_expression(self) -> str:
         list_expr = self.properties.get("list", "*")
 
         list_port = self.inputs[1]
         if list_port.connected_edges:
             source_node = list_port.connected_edges[0].source.node
             list_expr = source_node.properties.get("value", list_expr)
+        return list_expr
+
+    def emit_bash_value(self, context: BashContext) -> str:
+        # the Item output
+        return f"${{{self.properties.get('variable', 'item')}}}"
+
+    def emit_bash(self, context: BashContext) -> str:
+        var_name = self.properties.get("variable", "item")
+        list_expr = self.list_expression()
 
         context.add_line(f"for {var_name} in {list_expr}; do")
         context.indent()
@@ -95,12 +106,13 @@ class ForNode(BaseNode):
 
         next_port = self.outputs[2]
         if next_port.connected_edges:
-            start_node = next_port.connected_edges[0].target.node
-            BaseNode.emit_exec_chain(start_node, context)
+            context.next_node = next_port.connected_edges[0].target.node
         return ""
     
 @register_node("while", category="Flow", label="While Loop", description="Repeats execution while a condition is true")
 class WhileNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("while", "While", "#8E44AD")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -130,10 +142,7 @@ class WhileNode(BaseNode):
 
         next_port = self.outputs[1]
         if next_port.connected_edges:
-            BaseNode.emit_exec_chain(
-                next_port.connected_edges[0].target.node,
-                context
-            )
+            context.next_node = next_port.connected_edges[0].target.node
 
         return ""
 
@@ -142,6 +151,8 @@ class WhileNode(BaseNode):
     
 @register_node("function", category="Flow", label="Function", description="Defines a bash function")
 class FunctionNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("function", "Function", "#1ABC9C")
         self.add_output("Exec", PortType.EXEC, "Function body")
@@ -172,6 +183,8 @@ class FunctionNode(BaseNode):
     
 @register_node("call",category="Flow",label="Call Function",description="Calls a bash function")
 class CallNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("call", "Call", "#F39C12")
 
@@ -185,6 +198,8 @@ class CallNode(BaseNode):
     
 @register_node("return", category="Flow", label="Return", description="Return the result of a fonction")
 class ReturnNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("return", "Return", "#E74C3C")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -196,4 +211,267 @@ class ReturnNode(BaseNode):
         if val_port.connected_edges:
             src = val_port.connected_edges[0].source.node
             value = src.properties.get("value", value)
-        return f"return {value}"
\ No newline at end of file
+        return f"return {value}"
+
+@register_node("parallel", category="Flow", label="Parallel", description="Runs its branches at the same time and waits for all of them")
+class ParallelNode(BaseNode):
+    __slots__ = ()
+    BRANCHES = 4
+
+    def __init__(self):
+        super().__init__("parallel", "Parallel", "#16A085")
+        self.add_input("Exec", PortType.EXEC, "Control flow input")
+        for index in range(1, self.BRANCHES + 1):
+            self.add_output(f"Branch {index}", PortType.EXEC, "Runs in the background")
+        self.add_output("Join", PortType.EXEC, "Continue once every branch finished")
+
+        # at most this many branches running at once, 0 for no limit
+        self.properties["max_jobs"] = 0
+
+    def max_jobs(self) -> int:
+        try:
+            return max(int(str(self.properties.get("max_jobs", 0)).strip()), 0)
+        except ValueError:
+            Debug.Warn(f"Parallel Node: invalid max_jobs {self.properties.get('max_jobs')!r}, running every branch at once.")
+            return 0
+
+    def emit_bash(self, context: BashContext) -> str:
+        branches = [port for port in self.outputs[:self.BRANCHES] if port.connected_edges]
+        limit = self.max_jobs()
+        if limit >= len(branches):
+            limit = 0
+
+        context.add_line("__vish_pids=()")
+        if limit:
+            context.add_line("__vish_running=0")
+        for port in branches:
+            if limit:
+                # wait -n returns as soon as any job ends, a slot is free again
+                context.add_line(f"if (( __vish_running >= {limit} )); then")
+                context.indent()
+                context.add_line("wait -n || :")
+                context.add_line("__vish_running=$((__vish_running - 1))")
+                context.dedent()
+                context.add_line("fi")
+            context.add_line("{")
+            context.indent()
+            BaseNode.emit_exec_chain(port.connected_edges[0].target.node, context)
+            context.dedent()
+            context.add_line("} &")
+            context.add_line("__vish_pids+=($!)")
+            if limit:
+                context.add_line("__vish_running=$((__vish_running + 1))")
+
+        # every branch is waited for, the block fails with the status of the first branch that failed
+        context.add_line("__vish_status=0")
+        context.add_line('for __vish_pid in "${__vish_pids[@]}"; do')
+        context.indent()
+        context.add_line('wait "$__vish_pid" || { __vish_code=$?; (( __vish_status )) || __vish_status=$__vish_code; }')
+        context.dedent()
+        context.add_line("done")
+        context.add_line('(( __vish_status == 0 )) || (exit "$__vish_status")')
+
+        join_port = self.outputs[self.BRANCHES]
+        if join_port.connected_edges:
+            context.next_node = join_port.connected_edges[0].target.node
+        return ""
+
+    def get_next_exec_node(self):
+        return None
+
+
+@register_node("parallel_for", category="Flow", label="Parallel For", description="Runs the loop body for every item at the same time, on a bounded number of workers")
+class ParallelForNode(ForNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__()
+        self.node_type = "parallel_for"
+        self.title = "Parallel For"
+        self.color = "#7D3C98"
+
+        # empty or 0: one worker per CPU
+        self.properties["workers"] = ""
+        # exit code of every item, in list order
+        self.properties["status_array"] = "item_status"
+        # buffer each item's output and print it whole, in list order
+        self.properties["keep_output"] = "false"
+
+    def workers(self) -> str:
+        value = str(self.properties.get("workers", "")).strip()
+        if value.isdigit() and int(value) > 0:
+            return value
+        if value and value != "0":
+            Debug.Warn(f"Parallel For Node: invalid workers {value!r}, using one per CPU.")
+        return "$(nproc 2>/dev/null || echo 1)"
+
+    def emit_bash(self, context: BashContext) -> str:
+        var_name = self.properties.get("variable", "item")
+        status_array = self.properties.get("status_array", "") or "item_status"
+        keep_output = str(self.properties.get("keep_output", "")).strip().lower() in ("true", "1", "yes")
+
+        context.add_line(f"__vish_workers={self.workers()}")
+        context.add_line("__vish_pids=()")
+        context.add_line("__vish_running=0")
+        if keep_output:
+            context.add_line("__vish_out=$(mktemp -d)")
+        context.add_line(f"for {var_name} in {self.list_expression()}; do")
+        context.indent()
+        # wait -n returns as soon as any job ends, a worker is free again
+        context.add_line("if (( __vish_running >= __vish_workers )); then")
+        context.indent()
+        context.add_line("wait -n || :")
+        context.add_line("__vish_running=$((__vish_running - 1))")
+        context.dedent()
+        context.add_line("fi")
+        context.add_line("{")
+        context.indent()
+        body_port = self.outputs[0]
+        if body_port.connected_edges:
+            BaseNode.emit_exec_chain(body_port.connected_edges[0].target.node, context)
+        else:
+            context.add_line(":")
+        context.dedent()
+        context.add_line('} > "$__vish_out/${#__vish_pids[@]}" 2>&1 &' if keep_output else "} &")
+        context.add_line("__vish_pids+=($!)")
+        context.add_line("__vish_running=$((__vish_running + 1))")
+        context.dedent()
+        context.add_line("done")
+
+        # items are collected in list order, the loop fails with the status of the first item that failed
+        context.add_line(f"{status_array}=()")
+        context.add_line("__vish_status=0")
+        context.add_line('for __vish_index in "${!__vish_pids[@]}"; do')
+        context.indent()
+        # in a list, so set -e does not stop the script on the first failed item
+        context.add_line(
+            f'wait "${{__vish_pids[__vish_index]}}" && {status_array}[__vish_index]=0 || {status_array}[__vish_index]=$?'
+        )
+        if keep_output:
+            context.add_line('cat "$__vish_out/$__vish_index"')
+        context.add_line(f"(( __vish_status )) || __vish_status=${{{status_array}[__vish_index]}}")
+        context.dedent()
+        context.add_line("done")
+        if keep_output:
+            context.add_line('rm -rf "$__vish_out"')
+        context.add_line('(( __vish_status == 0 )) || (exit "$__vish_status")')
+
+        next_port = self.outputs[2]
+        if next_port.connected_edges:
+            context.next_node = next_port.connected_edges[0].target.node
+        return ""
+
+@register_node("for_each_line", category="Flow", label="For Each Line", description="Reads a file or a command's output one line at a time")
+class ForEachLineNode(BaseNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("for_each_line", "For Each Line", "#9B59B6")
+
+        self.add_input("Exec", PortType.EXEC, "Control flow input")
+        self.add_input("Path", PortType.PATH, "File to read")
+        self.add_input("Stdin", PortType.STREAM, "Output of the command to read")
+
+        self.add_output("Loop Body", PortType.EXEC, "Executed for each line")
+        self.add_output("Line", PortType.VARIABLE, "Current line")
+        self.add_output("Next", PortType.EXEC, "Continue after loop")
+
+        self.properties["variable"] = "line"
+        self.properties["path"] = ""
+        # read when nothing is piped in and no path is set, empty to read the script's input
+        self.properties["command"] = ""
+        # empty for lines, \0 for NUL separated input (find -print0), or a single character
+        self.properties["delimiter"] = ""
+
+    def emit_bash_value(self, context: BashContext) -> str:
+        # the Line output
+        return f"${{{self.properties.get('variable', 'line')}}}"
+
+    def source(self, context: BashContext) -> str:
+        stdin = self.inputs[2]
+        if stdin.connected_edges:
+            pipeline = stdin.connected_edges[0].source.node.emit_stream(context)
+            if pipeline:
+                # not piped into the loop: that would run it in a subshell, losing what the body sets
+                return f" 3< <({pipeline})"
+
+        path = self.properties.get("path", "")
+        path_port = self.inputs[1]
+        if path_port.connected_edges:
+            source_node = path_port.connected_edges[0].source.node
+            path = source_node.properties.get("value", path)
+        if path:
+            return f' 3< "{path}"'
+
+        command = self.properties.get("command", "")
+        if command:
+            return f" 3< <({command})"
+        return " 3<&0"
+
+    def delimiter(self) -> str:
+        delimiter = str(self.properties.get("delimiter", ""))
+        if delimiter in ("", "\\n"):
+            return ""
+        if delimiter in ("\\0", "NUL"):
+            return " -d ''"
+        if delimiter == "\\t":
+            return " -d $'\\t'"
+        if len(delimiter) != 1:
+            Debug.Warn("For Each Line Node: the delimiter must be a single character, reading lines.")
+            return ""
+        return " -d '" + delimiter.replace("'", "'\\''") + "'"
+
+    def emit_bash(self, context: BashContext) -> str:
+        var_name = self.properties.get("variable", "line")
+        source = self.source(context)
+
+        # read from fd 3 so that commands of the body reading their input do not eat the lines;
+        # a last line without its delimiter is still read
+        context.add_line(f'while IFS= read -r -u 3{self.delimiter()} {var_name} || [[ -n ${var_name} ]]; do')
+        context.indent()
+
+        body_port = self.outputs[0]
+        if body_port.connected_edges:
+            BaseNode.emit_exec_chain(body_port.connected_edges[0].target.node, context)
+
+        context.dedent()
+        context.add_line(f"done{source}")
+
+        next_port = self.outputs[2]
+        if next_port.connected_edges:
+            context.next_node = next_port.connected_edges[0].target.node
+        return ""
+
+@register_node("for_each_item", category="Flow", label="For Each Item", description="Iterates over the items of an array")
+class ForEachItemNode(ForNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__()
+        self.node_type = "for_each_item"
+        self.title = "For Each Item"
+        list_port = self.inputs[1]
+        list_port.name, list_port.port_type, list_port.tooltip = "Array", PortType.ARRAY, "Array to iterate over"
+        self.properties["array"] = "items"
+
+    def list_expression(self) -> str:
+        # every item as one word, empty items and spaces included
+        return f'"${{{self.array_of(self.inputs[1], self.properties.get("array", "items"))}[@]}}"'
+
+@register_node("for_each_key", category="Flow", label="For Each Key", description="Iterates over the keys of a map")
+class ForEachKeyNode(ForNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__()
+        self.node_type = "for_each_key"
+        self.title = "For Each Key"
+        list_port = self.inputs[1]
+        list_port.name, list_port.port_type, list_port.tooltip = "Map", PortType.MAP, "Map to iterate over"
+        self.outputs[1].name, self.outputs[1].tooltip = "Key", "Current key in the loop"
+        self.properties["variable"] = "key"
+        self.properties["array"] = "map"
+
+    def list_expression(self) -> str:
+        # in no particular order
+        return f'"${{!{self.array_of(self.inputs[1], self.properties.get("array", "map"))}[@]}}"'
@@ -4,13 +4,17 @@ from core.bash_context import BashContext
 from nodes.registry import register_node
 
 class MathNode(BaseNode):
+    __slots__ = ()
+
     def _resolve(self, port, context: BashContext, default="0"):
         if port.connected_edges:
-            return port.connected_edges[0].source.node.emit_bash_value(context)
+            return context.value_of(port.connected_edges[0].source.node)
         return default
 
 @register_node("number_constant", category="Constants", label="Number Constant", description="Represents a number constant value")
 class NumberConstant(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("number_constant", "Number Constant", "#BDC3C7")
         self.add_output("Value", PortType.INT, "Integer value")
@@ -19,8 +23,25 @@ class NumberConstant(MathNode):
     def emit_bash_value(self, context: BashContext) -> str:
         return str(self.properties.get("value", 0))
 
+@register_node("bool_constant", category="Constants", label="Boolean Constant", description="Represents a condition that is always true or always false")
+class BoolConstant(BaseNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("bool_constant", "Boolean Constant", "#BDC3C7")
+        self.add_output("Value", PortType.CONDITION, "Condition value")
+        self.properties["value"] = "true"
+
+    def is_true(self) -> bool:
+        return str(self.properties.get("value", "")).strip().lower() in ("true", "1")
+
+    def emit_condition(self, context: BashContext) -> str:
+        return "true" if self.is_true() else "false"
+
 @register_node("addition", category="Math", label="Addition")
 class Addition(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("addition", "Addition", "#F1C40F")
         self.add_input("A", PortType.INT, "Summand")
@@ -34,6 +55,8 @@ class Addition(MathNode):
 
 @register_node("subtraction", category="Math", label="Subtraction")
 class Subtraction(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("subtraction", "Subtraction", "#E67E22")
         self.add_input("A", PortType.INT, "Minuend")
@@ -47,6 +70,8 @@ class Subtraction(MathNode):
 
 @register_node("multiplication", category="Math", label="Multiplication")
 class Multiplication(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("multiplication", "Multiplication", "#9B59B6")
         self.add_input("A", PortType.INT, "Multiplier")
@@ -60,6 +85,8 @@ class Multiplication(MathNode):
 
 @register_node("division", category="Math", label="Division")
 class Division(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("division", "Division", "#3498DB")
         self.add_input("A", PortType.INT, "Numerator")
@@ -73,6 +100,8 @@ class Division(MathNode):
 
 @register_node("modulo", category="Math", label="Modulo", description="Calculates the remainder of the division")
 class Modulo(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("modulo", "Modulo", "#1ABC9C")
         self.add_input("A", PortType.INT, "Dividend")
@@ -86,6 +115,8 @@ class Modulo(MathNode):
 
 @register_node("less_than", category="Logic", label="Less Than", description="Is A less than B?")
 class LessThan(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("less_than", "Less Than", "#95A5A6")
         self.add_input("A", PortType.INT, "A")
@@ -99,6 +130,8 @@ class LessThan(MathNode):
 
 @register_node("greater_than", category="Logic", label="Greater Than", description="Is A greater than B?")
 class GreaterThan(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("greater_than", "Greater Than", "#95A5A6")
         self.add_input("A", PortType.INT, "A")
@@ -112,6 +145,8 @@ class GreaterThan(MathNode):
 
 @register_node("equals", category="Logic", label="Equals")
 class Equals(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("equals", "Equals", "#2ECC71")
         self.add_input("A", PortType.INT, "A")
@@ -125,6 +160,8 @@ class Equals(MathNode):
 
 @register_node("logical_and", category="Logic", label="AND")
 class LogicalAnd(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("logical_and", "AND", "#34495E")
         self.add_input("A", PortType.CONDITION, "A")
@@ -142,6 +179,8 @@ class LogicalAnd(MathNode):
 
 @register_node("logical_or", category="Logic", label="OR")
 class LogicalOr(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("logical_or", "OR", "#34495E")
         self.add_input("A", PortType.CONDITION, "A")
@@ -159,6 +198,8 @@ class LogicalOr(MathNode):
 
 @register_node("logical_not", category="Logic", label="NOT")
 class LogicalNot(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("logical_not", "NOT", "#34495E")
         self.add_input("A", PortType.CONDITION, "A")
@@ -172,6 +213,8 @@ class LogicalNot(MathNode):
 
 @register_node("command_condition", category="Logic", label="Command Condition", description="Uses a custom command as a condition")
 class CommandConditionNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("command_condition", "Command Condition", "#34495E")
         self.add_output("command", PortType.CONDITION, "Command")
@@ -1,5 +1,16 @@
+import importlib
+
 NODE_REGISTRY = {}
 
+# every module defining nodes, importing them fills NODE_REGISTRY
+NODE_MODULES = (
+    "nodes.flow_nodes",
+    "nodes.command_nodes",
+    "nodes.variable_nodes",
+    "nodes.operation_nodes",
+    "nodes.utils_node",
+)
+
 def register_node(node_type: str, *, label=None, category="Other", description=""):
     def decorator(cls):
         NODE_REGISTRY[node_type] = {
@@ -16,3 +27,13 @@ def create_node(node_type):
     if not entry:
         raise ValueError(f"Unknown node type: {node_type}")
     return entry["class"]()
+
+def load_node_modules():
+    for module in NODE_MODULES:
+        importlib.import_module(module)
+
+class NodeFactory:
+    @staticmethod
+    def create_node(node_type: str):
+        entry = NODE_REGISTRY.get(node_type)
+        return entry["class"]() if entry else None
@@ -1,44 +1,70 @@
+import re
 from core.port_types import PortType
 from core.bash_context import BashContext
+from core.debug import Debug
 from .base_node import BaseNode
 from nodes.registry import register_node
 
+_VARIABLE = re.compile(r"\$[A-Za-z_][A-Za-z0-9_]*")
+# sleep also takes suffixes (1m, 2h), read -t only plain seconds
+_DURATION = re.compile(r"[0-9]+(\.[0-9]+)?")
+_DOWNLOADS = re.compile(r"[;\n]")
+_NUMBER = re.compile(r"[0-9]+")
+
 @register_node("to_string", category="Conversion", label="To String")
 class ToString(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("to_string", "To String", "#9B59B6")
         self.add_input("Input", PortType.INT, "Value to convert to string")
         self.add_output("Output", PortType.VARIABLE, "String representation")
 
     def emit_bash(self, context):
+        return self.emit_bash_value(context)
+
+    def emit_bash_value(self, context):
         input_port = self.inputs[0]
 
+        expr = None
         if input_port.connected_edges:
-            expr = input_port.connected_edges[0].source.node.emit_bash(context)
-        else:
+            expr = context.value_of(input_port.connected_edges[0].source.node)
+        if expr is None:
             expr = input_port.value or ""
 
         return f'"{expr}"'
 
 @register_node("to_int", category="Conversion", label="To Int")
 class ToInt(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("to_int", "To Int", "#9B59B6")
         self.add_input("Input", PortType.VARIABLE, "Value to convert to integer")
         self.add_output("Output", PortType.INT, "Integer representation")
         
     def emit_bash(self, context):
+        return self.emit_bash_value(context)
+
+    def emit_bash_value(self, context):
         input_port = self.inputs[0]
 
+        expr = None
         if input_port.connected_edges:
-            expr = input_port.connected_edges[0].source.node.emit_bash(context)
-        else:
+            expr = context.value_of(input_port.connected_edges[0].source.node)
+        if expr is None:
             expr = input_port.value or "0"
 
+        if context.profile == "fast" and _VARIABLE.fullmatch(expr):
+            # arithmetic reads the variable itself, its value is not pasted in and parsed again
+            expr = expr[1:]
         return f'$(( {expr} ))'
 
 @register_node("sleep", category="Utilities", label="Sleep", description="Pauses execution for a specified duration")
 class SleepNode(BaseNode):
+    __slots__ = ()
+    HELPERS = ("__vish_sleep_fd",)
+
     def __init__(self):
         super().__init__("sleep", "Sleep", "#E67E22")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -46,50 +72,170 @@ class SleepNode(BaseNode):
         self.add_output("Exec", PortType.EXEC, "Control flow output")
         self.properties["duration"] = 1
 
-    def emit_bash(self, context: BashContext) -> str:
+    def _duration(self):
         duration = self.properties.get("duration", 1)
 
         duration_port = self.inputs[1]
         if duration_port.connected_edges:
             source_node = duration_port.connected_edges[0].source.node
             duration = source_node.properties.get("value", duration)
+        return duration
 
+    def emit_bash(self, context: BashContext) -> str:
+        duration = self._duration()
+        if self._builtin(context.profile, duration):
+            # waits on the pipe of __vish_sleep_fd instead of starting the sleep binary, into a
+            # variable of its own: REPLY is left as it was
+            return f'read -rt {duration} -u "$__vish_sleep_fd" __vish_sleep || :'
         return f'sleep {duration}'
+
+    def helpers(self, profile: str):
+        if self._builtin(profile, self._duration()):
+            return self.HELPERS
+        return ()
+
+    def _builtin(self, profile: str, duration) -> bool:
+        return profile == "fast" and bool(_DURATION.fullmatch(str(duration)))
     
 @register_node("download_file", category="Utilities", label="Download File", description="Downloads a file from a specified URL")
 class DownloadFileNode(BaseNode):
+    __slots__ = ()
+    HELPERS = ("__vish_download",)
+
     def __init__(self):
         super().__init__("download_file", "Download File", "#1ABC9C")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
         self.add_output("Exec", PortType.EXEC, "Control flow output")
         self.properties["url"] = ""
         self.properties["output_path"] = ""
+        # more files fetched by the same curl run: "URL -> PATH", separated by ";"
+        self.properties["downloads"] = ""
+        self.properties["parallel"] = "4"
+        # a transfer that failed half way goes on from where it stopped on the next run
+        self.properties["resume"] = "true"
+        # a file already downloaded is only fetched again when the server has a newer one
+        self.properties["skip_unchanged"] = "true"
 
-    def emit_bash(self, context: BashContext) -> str:
+    def helpers(self, profile: str):
+        pairs, _ = self.pairs()
+        if not pairs or self._plain(pairs):
+            return ()
+        return self.HELPERS
+
+    def _option(self, key: str) -> bool:
+        # graphs saved before the option existed do not have the key: they keep the plain curl they had,
+        # only nodes created since are on by default
+        return str(self.properties.get(key, "false")).strip().lower() in ("true", "1", "yes")
+
+    def _plain(self, pairs):
+        # a single file with neither option is the curl command the node always wrote
+        return len(pairs) == 1 and not self._option("resume") and not self._option("skip_unchanged")
+
+    def pairs(self):
+        # (url, path) pairs, entries that are not "URL -> PATH"
+        pairs, invalid = [], []
         url = self.properties.get("url", "")
         output_path = self.properties.get("output_path", "")
+        if url or output_path:
+            pairs.append((url, output_path))
+        for entry in _DOWNLOADS.split(str(self.properties.get("downloads", ""))):
+            if not entry.strip():
+                continue
+            url, arrow, path = entry.partition("->")
+            if not arrow or not url.strip() or not path.strip():
+                invalid.append(entry.strip())
+                continue
+            pairs.append((url.strip(), path.strip()))
+        return pairs, invalid
+
+    def emit_bash(self, context: BashContext) -> str:
+        pairs, invalid = self.pairs()
+        for entry in invalid:
+            Debug.Warn(f"Download File Node: '{entry}' is not 'URL -> PATH', skipped.")
+        if self._plain(pairs):
+            url, output_path = pairs[0]
+            return f'curl -o "{output_path}" "{url}"'
+        if not pairs:
+            Debug.Warn("Download File Node: nothing to download, skipping.")
+            return ""
 
-        return f'curl -o "{output_path}" "{url}"'
+        parallel = str(self.properties.get("parallel", "4")).strip()
+        if not _NUMBER.fullmatch(parallel) or not 1 <= int(parallel) <= 300:
+            Debug.Warn("Download File Node: parallel must be between 1 and 300, using 4.")
+            parallel = "4"
+        resume = self._option("resume")
+        conditional = self._option("skip_unchanged")
+        arguments = " ".join(f'"{url}" "{path}"' for url, path in pairs)
+        return f"__vish_download {parallel} {str(resume).lower()} {str(conditional).lower()} {arguments}"
 
 @register_node("git_clone", category="Utilities", label="Git Clone", description="Clones a Git repository to a specified destination")
 class GitCloneNode(BaseNode):
+    __slots__ = ()
+    HELPERS = ("__vish_git_clone",)
+
     def __init__(self):
         super().__init__("git_clone", "Git Clone", "#3498DB")
         self.add_input("Exec", PortType.EXEC, "Control flow input")        
         self.add_output("Exec", PortType.EXEC, "Control flow output")
         self.properties["repo_url"] = ""
         self.properties["destination_path"] = ""
+        # empty for the remote's default branch
+        self.properties["branch"] = ""
+        # commits of history fetched, empty for all of it
+        self.properties["depth"] = ""
+        # partial clone: blob:none fetches file contents only when they are checked out
+        self.properties["filter"] = ""
+        # directories checked out, separated by spaces or commas, empty for the whole tree
+        self.properties["sparse_paths"] = ""
+        self.properties["single_branch"] = "false"
+        # directory of bare mirrors the clone borrows its objects from, kept up to date by the script
+        self.properties["mirror_cache"] = ""
+        # a clone already at the destination is fetched and reset instead of failing
+        self.properties["update"] = "true"
+
+    def helpers(self, profile: str):
+        if self._plain():
+            return ()
+        return self.HELPERS
+
+    def _plain(self):
+        # without any option this is the git clone the node always wrote
+        return (
+            not any(str(self.properties.get(key, "")).strip() for key in ("branch", "depth", "filter", "sparse_paths", "mirror_cache"))
+            and str(self.properties.get("single_branch", "false")).strip().lower() not in ("true", "1", "yes")
+            # graphs saved before the option existed do not have the key: they keep the git clone they
+            # had, only nodes created since update by default
+            and str(self.properties.get("update", "false")).strip().lower() not in ("true", "1", "yes")
+        )
 
     def emit_bash(self, context: BashContext) -> str:
         repo_url = self.properties.get("repo_url", "")
         destination_path = self.properties.get("destination_path", "")
 
-        return f'git clone "{repo_url}" "{destination_path}"'
+        if self._plain():
+            return f'git clone "{repo_url}" "{destination_path}"'
+
+        depth = str(self.properties.get("depth", "")).strip()
+        if depth and not _NUMBER.fullmatch(depth):
+            Debug.Warn("Git Clone Node: depth must be a whole number, cloning the full history.")
+            depth = ""
+        if not destination_path:
+            # git would name it after the repository, the helper needs to know where to look for it
+            destination_path = re.sub(r"(\.git)?/*$", "", repo_url).rsplit("/", 1)[-1].rsplit(":", 1)[-1]
+        branch = str(self.properties.get("branch", "")).strip()
+        filter_spec = str(self.properties.get("filter", "")).strip()
+        single = "true" if str(self.properties.get("single_branch", "false")).strip().lower() in ("true", "1", "yes") else "false"
+        cache = str(self.properties.get("mirror_cache", "")).strip()
+        arguments = [f'"{repo_url}"', f'"{destination_path}"', f'"{branch}"', f'"{depth}"', f'"{filter_spec}"', single, f'"{cache}"']
+        arguments += [f'"{path}"' for path in re.split(r"[\s,]+", str(self.properties.get("sparse_paths", "")).strip()) if path]
+        return "__vish_git_clone " + " ".join(arguments)
 
 
 
 @register_node("open_website", category="Utilities", label="Open Website", description="Opens a specified URL in the default web browser")  
 class OpenWebsiteNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("open_website", "Open Website", "#8E44AD")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -99,4 +245,27 @@ class OpenWebsiteNode(BaseNode):
     def emit_bash(self, context: BashContext) -> str:
         url = self.properties.get("url", "")
 
-        return f'xdg-open "{url}"'
\ No newline at end of file
+        return f'xdg-open "{url}"'
+
+@register_node("tee", category="Utilities", label="Tee", description="Copies a stream to a file while passing it on")
+class TeeNode(BaseNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("tee", "Tee", "#5DADE2")
+        self.add_input("Stdin", PortType.STREAM, "Stream to copy")
+        self.add_output("Stdout", PortType.STREAM, "The same stream, passed on")
+        self.properties["path"] = ""
+        self.properties["append"] = "false"
+
+    def emit_bash(self, context: BashContext) -> str:
+        return ""
+
+    def emit_stream(self, context: BashContext) -> str:
+        path = self.properties.get("path", "")
+        if not path:
+            Debug.Warn("Tee Node: no path set, the stream is passed on as is.")
+            stdin = self.inputs[0]
+            return stdin.connected_edges[0].source.node.emit_stream(context) if stdin.connected_edges else None
+        append = str(self.properties.get("append", "")).strip().lower() in ("true", "1", "yes")
+        return self.pipe_into(self.inputs[0], context, f'tee {"-a " if append else ""}"{path}"')
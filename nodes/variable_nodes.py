@@ -1,10 +1,42 @@
+import re
 from core.port_types import PortType
 from core.bash_context import BashContext
+from core.debug import Debug
 from nodes.registry import register_node
 from .base_node import BaseNode
 
+_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def value_expression(raw_value: str, port, context: BashContext) -> str:
+    # what a value input writes: the connected node's value, else the property as typed,
+    # quoted unless it already is an expansion, a number or a quoted string
+    if port.connected_edges:
+        emitted = context.value_of(port.connected_edges[0].source.node)
+        if emitted is not None:
+            return emitted
+    raw_value = str(raw_value)
+    if raw_value.isdigit() or raw_value.startswith("$") or raw_value.startswith('"') or raw_value.startswith("'") or raw_value.startswith('`'):
+        return raw_value
+    return f'"{raw_value}"'
+
+
+def array_variable(node, port, title: str) -> str:
+    # the array the node works on: the one connected to port, else its array property
+    name = node.properties.get("array", "")
+    if port is not None:
+        name = node.array_of(port, name)
+    name = str(name).strip()
+    if not _NAME.fullmatch(name):
+        Debug.Warn(f"{title} Node: {name!r} is not an array name.")
+        return None
+    return name
+
+
 @register_node("set_variable", category="Variables", label="Set Variable", description="Sets a variable to a specific value")
 class SetVariableNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("set_variable", "Set Variable", "#F39C12")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -17,26 +49,15 @@ class SetVariableNode(BaseNode):
     def emit_bash(self, context: BashContext) -> str:
         var_name = self.properties.get("variable", "VAR")
 
-        raw_value = self.properties.get("value", "")
-        if raw_value.isdigit() or raw_value.startswith("$") or raw_value.startswith('"') or raw_value.startswith("'") or raw_value.startswith('`'):
-            value_expr = raw_value
-        else:
-            value_expr = f'"{raw_value}"'
-
+        value_expr = value_expression(self.properties.get("value", ""), self.inputs[1], context)
 
-        value_port = self.inputs[1]
-        if value_port.connected_edges:
-            source_node = value_port.connected_edges[0].source.node
-
-            emitted = source_node.emit_bash_value(context)
-            if emitted is not None:
-                value_expr = emitted
-
-        context.variables[var_name] = value_expr
+        context.set_variable(var_name, value_expr)
         return f'{var_name}={value_expr}'
 
 @register_node("get_variable", category="Variables", label="Get Variable", description="Gets the value of a variable")
 class GetVariableNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("get_variable", "Get Variable", "#F39C12")
         self.add_output("Value", PortType.VARIABLE, "Variable value")
@@ -51,6 +72,8 @@ class GetVariableNode(BaseNode):
 
 @register_node("file_exists", category="Variables", label="File Exists", description="Checks if a file exists")
 class FileExistsNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("file_exists", "File Exists", "#1ABC9C")
         self.add_input("Path", PortType.PATH, "File path")
@@ -58,6 +81,9 @@ class FileExistsNode(BaseNode):
         self.properties["path"] = ""
     
     def emit_bash(self, context: BashContext) -> str:
+        return self.emit_condition(context)
+
+    def emit_condition(self, context: BashContext) -> str:
         path = self.properties.get("path", "")
         
         path_port = self.inputs[0]
@@ -65,14 +91,204 @@ class FileExistsNode(BaseNode):
             source_node = path_port.connected_edges[0].source.node
             path = source_node.properties.get("value", path)
         
+        if context.profile == "fast":
+            # a keyword: parsed once with the line, no argument list built at run time
+            return f'[[ -f "{path}" ]]'
         return f'[ -f "{path}" ]'
     
 @register_node("string_constant", category="Constants", label="String Constant", description="Represents a string constant value")
 class StringConstantNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("string_constant", "String Constant", "#BDC3C7")
         self.add_output("Value", PortType.STRING, "String value")
         self.properties["value"] = ""
 
     def emit_bash_value(self, context: BashContext) -> str:
-        return f'"{self.properties.get("value", "")}"'
\ No newline at end of file
+        return f'"{self.properties.get("value", "")}"'
+@register_node("declare_array", category="Variables", label="Declare Array", description="Creates an indexed array")
+class DeclareArrayNode(BaseNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("declare_array", "Declare Array", "#A569BD")
+        self.add_input("Exec", PortType.EXEC, "Control flow input")
+        self.add_output("Exec", PortType.EXEC, "Control flow output")
+        self.add_output("Array", PortType.ARRAY, "The array")
+        self.properties["array"] = "items"
+        # initial items, as bash words: a "b c" $d
+        self.properties["values"] = ""
+
+    def array_name(self):
+        return self.properties.get("array", "items")
+
+    def emit_bash(self, context: BashContext) -> str:
+        name = array_variable(self, None, "Declare Array")
+        if name is None:
+            return ""
+        return f'{name}=({self.properties.get("values", "")})'
+
+@register_node("declare_map", category="Variables", label="Declare Map", description="Creates an associative array, from keys to values")
+class DeclareMapNode(BaseNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("declare_map", "Declare Map", "#48C9B0")
+        self.add_input("Exec", PortType.EXEC, "Control flow input")
+        self.add_output("Exec", PortType.EXEC, "Control flow output")
+        self.add_output("Map", PortType.MAP, "The map")
+        self.properties["array"] = "map"
+        # initial entries: key=value, separated by ";"
+        self.properties["entries"] = ""
+
+    def array_name(self):
+        return self.properties.get("array", "map")
+
+    def emit_bash(self, context: BashContext) -> str:
+        name = array_variable(self, None, "Declare Map")
+        if name is None:
+            return ""
+        entries = []
+        for entry in str(self.properties.get("entries", "")).split(";"):
+            if not entry.strip():
+                continue
+            key, equals, value = entry.partition("=")
+            if not equals:
+                Debug.Warn(f"Declare Map Node: '{entry.strip()}' is not key=value, skipped.")
+                continue
+            entries.append(f'["{key.strip()}"]="{value.strip()}"')
+        # declare makes a local inside a function, -g keeps the map visible to the rest of the script
+        option = "-gA" if context._current_buffer == "function" else "-A"
+        return f"declare {option} {name}=({' '.join(entries)})"
+
+@register_node("array_append", category="Variables", label="Append to Array", description="Adds an item at the end of an array")
+class ArrayAppendNode(BaseNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("array_append", "Append to Array", "#A569BD")
+        self.add_input("Exec", PortType.EXEC, "Control flow input")
+        self.add_input("Array", PortType.ARRAY, "Array to add to")
+        self.add_input("Value", PortType.VARIABLE, "Item")
+        self.add_output("Exec", PortType.EXEC, "Control flow output")
+        self.properties["array"] = "items"
+        self.properties["value"] = ""
+
+    def emit_bash(self, context: BashContext) -> str:
+        name = array_variable(self, self.inputs[1], "Append to Array")
+        if name is None:
+            return ""
+        return f'{name}+=({value_expression(self.properties.get("value", ""), self.inputs[2], context)})'
+
+@register_node("array_get", category="Variables", label="Array Item", description="Reads the item of an array at an index")
+class ArrayGetNode(BaseNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("array_get", "Array Item", "#A569BD")
+        self.add_input("Array", PortType.ARRAY, "Array to read")
+        self.add_input("Index", PortType.INT, "Index, negative from the end")
+        self.add_output("Value", PortType.VARIABLE, "Item")
+        self.properties["array"] = "items"
+        self.properties["index"] = "0"
+
+    def emit_bash(self, context: BashContext) -> str:
+        return self.emit_bash_value(context)
+
+    def emit_bash_value(self, context: BashContext) -> str:
+        name = array_variable(self, self.inputs[0], "Array Item")
+        if name is None:
+            return None
+        index = self.properties.get("index", "0")
+        index_port = self.inputs[1]
+        if index_port.connected_edges:
+            emitted = context.value_of(index_port.connected_edges[0].source.node)
+            if emitted is not None:
+                index = emitted
+        return f"${{{name}[{index}]}}"
+
+@register_node("array_length", category="Variables", label="Array Length", description="Number of items in an array")
+class ArrayLengthNode(BaseNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("array_length", "Array Length", "#A569BD")
+        self.add_input("Array", PortType.ARRAY, "Array to count")
+        self.add_output("Length", PortType.INT, "Number of items")
+        self.properties["array"] = "items"
+
+    def emit_bash(self, context: BashContext) -> str:
+        return self.emit_bash_value(context)
+
+    def emit_bash_value(self, context: BashContext) -> str:
+        name = array_variable(self, self.inputs[0], "Array Length")
+        if name is None:
+            return None
+        return f"${{#{name}[@]}}"
+
+@register_node("map_set", category="Variables", label="Set Map Entry", description="Sets the value of a key in a map")
+class MapSetNode(BaseNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("map_set", "Set Map Entry", "#48C9B0")
+        self.add_input("Exec", PortType.EXEC, "Control flow input")
+        self.add_input("Map", PortType.MAP, "Map to change")
+        self.add_input("Key", PortType.VARIABLE, "Key")
+        self.add_input("Value", PortType.VARIABLE, "Value")
+        self.add_output("Exec", PortType.EXEC, "Control flow output")
+        self.properties["array"] = "map"
+        self.properties["key"] = ""
+        self.properties["value"] = ""
+
+    def emit_bash(self, context: BashContext) -> str:
+        name = array_variable(self, self.inputs[1], "Set Map Entry")
+        if name is None:
+            return ""
+        key = value_expression(self.properties.get("key", ""), self.inputs[2], context)
+        value = value_expression(self.properties.get("value", ""), self.inputs[3], context)
+        return f"{name}[{key}]={value}"
+
+@register_node("map_get", category="Variables", label="Map Entry", description="Reads the value of a key in a map")
+class MapGetNode(BaseNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("map_get", "Map Entry", "#48C9B0")
+        self.add_input("Map", PortType.MAP, "Map to read")
+        self.add_input("Key", PortType.VARIABLE, "Key")
+        self.add_output("Value", PortType.VARIABLE, "Value, empty for a missing key")
+        self.properties["array"] = "map"
+        self.properties["key"] = ""
+
+    def emit_bash(self, context: BashContext) -> str:
+        return self.emit_bash_value(context)
+
+    def emit_bash_value(self, context: BashContext) -> str:
+        name = array_variable(self, self.inputs[0], "Map Entry")
+        if name is None:
+            return None
+        return f"${{{name}[{value_expression(self.properties.get('key', ''), self.inputs[1], context)}]}}"
+
+@register_node("map_has", category="Variables", label="Map Has Key", description="Checks if a map holds a key")
+class MapHasNode(BaseNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("map_has", "Map Has Key", "#48C9B0")
+        self.add_input("Map", PortType.MAP, "Map to look in")
+        self.add_input("Key", PortType.VARIABLE, "Key")
+        self.add_output("Result", PortType.CONDITION, "True when the key is set, even to an empty value")
+        self.properties["array"] = "map"
+        self.properties["key"] = ""
+
+    def emit_bash(self, context: BashContext) -> str:
+        return self.emit_condition(context)
+
+    def emit_condition(self, context: BashContext) -> str:
+        name = array_variable(self, self.inputs[0], "Map Has Key")
+        if name is None:
+            return None
+        # +set expands to a word for any set entry, empty or not; works before bash 4.3's -v on arrays
+        return f"[[ -n ${{{name}[{value_expression(self.properties.get('key', ''), self.inputs[1], context)}]+set}} ]]"
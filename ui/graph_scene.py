@@ -13,26 +13,29 @@ class GraphScene(QGraphicsScene):
     node_selected = Signal(object)
     connection_created = Signal(object, object)
     graph_changed = Signal() 
+    graph_events = Signal(object)
 
     def __init__(self, graph):
         super().__init__()
         self.graph = graph
-        self.edges = []
+        self.edge_items = {}
         self.drag_edge = None
         self.start_port = None
         self.pending_port = None
         self.pending_scene_pos = None
         self.setBackgroundBrush(self.palette().dark())
+        self.graph.subscribe(self._on_graph_events)
+
+    def _on_graph_events(self, events):
+        self.graph_events.emit(events)
+        # moving nodes around does not change the generated script
+        if Config.SYNC_NODES_AND_GEN and any(e.is_structural for e in events):
+            self.graph_changed.emit()
 
     def start_connection(self, port_item):
         if port_item.is_input:
-            for edge in list(self.edges):
-                if edge.target_port is port_item:
-                    if edge.edge:
-                        self.graph.remove_edge(edge.edge.id)
-                    if edge.scene() is self:
-                        self.removeItem(edge)
-                    self.edges.remove(edge)
+            for edge in list(port_item.port.connected_edges):
+                self.remove_core_edge(edge.id)
 
         if self.drag_edge and self.drag_edge.scene() is self:
             self.removeItem(self.drag_edge)
@@ -85,13 +88,8 @@ class GraphScene(QGraphicsScene):
             target_item = start_port
 
         if target_item.is_input:
-            for edge in list(self.edges):
-                if edge.target_port is target_item:
-                    if edge.edge:
-                        self.graph.remove_edge(edge.edge.id)
-                    if edge.scene() is self:
-                        self.removeItem(edge)
-                    self.edges.remove(edge)
+            for edge in list(target_item.port.connected_edges):
+                self.remove_core_edge(edge.id)
 
         edge_item = self.drag_edge
         edge_item.source_port = source_item
@@ -107,8 +105,6 @@ class GraphScene(QGraphicsScene):
             edge = self.graph.add_edge(source_item.port, target_item.port)
             if edge:
                 self.views()[0].add_edge_item(edge)
-                if Config.SYNC_NODES_AND_GEN:
-                    self.graph_changed.emit()
             if edge_item.scene() is self:
                 self.removeItem(edge_item)
 
@@ -117,7 +113,6 @@ class GraphScene(QGraphicsScene):
     def _is_valid_connection(self, a: PortItem, b: PortItem) -> bool:
         return GraphValidator.is_valid_connection(
             self.graph,
-            self.edges,
             a,
             b
         )
@@ -159,13 +154,22 @@ class GraphScene(QGraphicsScene):
 
         self.addItem(edge_item)
         edge_item.update_positions()
-        self.edges.append(edge_item)
+        self.edge_items[core_edge.id] = edge_item
+
+    def remove_edge_item(self, edge_id):
+        edge_item = self.edge_items.pop(edge_id, None)
+        if edge_item and edge_item.scene() is self:
+            self.removeItem(edge_item)
+
+    def remove_core_edge(self, edge_id):
+        self.graph.remove_edge(edge_id)
+        self.remove_edge_item(edge_id)
 
     def update_edges_for_node(self, node_item):
-        for port_item in node_item.port_items.values():
-            for edge in list(self.edges):
-                if edge.source_port == port_item or edge.target_port == port_item:
-                    edge.update_positions()
+        for edge in self.graph.edges_of(node_item.node.id):
+            edge_item = self.edge_items.get(edge.id)
+            if edge_item:
+                edge_item.update_positions()
 
     def mouseMoveEvent(self, event):
         if self.drag_edge:
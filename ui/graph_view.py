@@ -49,7 +49,7 @@ class GraphView(QGraphicsView):
         self.setBackgroundBrush(QColor(Theme.BACKGROUND))
 
         self.node_items = {}
-        self.edge_items = {}
+        self.edge_items = self.graph_scene.edge_items
         self.scale_factor = 1.0
         self._palette = None
         self.clipboard = GraphClipboard()
@@ -177,19 +177,11 @@ class GraphView(QGraphicsView):
         self.graph_scene.addItem(edge_item)
         edge_item.update_positions()
 
-        self.graph_scene.edges.append(edge_item)
         self.edge_items[edge.id] = edge_item
         return edge_item
     
     def remove_edge_item(self, edge_id):
-        edge_item = self.edge_items.get(edge_id)
-        if not edge_item:
-            return
-        if edge_item.scene() is self.graph_scene:
-            self.graph_scene.removeItem(edge_item)
-        if edge_item in self.graph_scene.edges:
-            self.graph_scene.edges.remove(edge_item)
-        del self.edge_items[edge_id]
+        self.graph_scene.remove_edge_item(edge_id)
 
 
     def wheelEvent(self, event):
@@ -261,10 +253,11 @@ class GraphView(QGraphicsView):
             self.copy_selection()
             selected_node_items = self.get_selected_node_items()
             if selected_node_items:
-                self.undo_stack.beginMacro("Cut")
-                for item in selected_node_items:
-                    self.undo_stack.push(RemoveNodeCommand(self, item.node.id))
-                self.undo_stack.endMacro()
+                with self.graph.batch():
+                    self.undo_stack.beginMacro("Cut")
+                    for item in selected_node_items:
+                        self.undo_stack.push(RemoveNodeCommand(self, item.node.id))
+                    self.undo_stack.endMacro()
             return
         if event.key() == Qt.Key_D and event.modifiers() & Qt.ControlModifier: # Ctrl+D
             self.copy_selection()
@@ -273,10 +266,11 @@ class GraphView(QGraphicsView):
         if event.matches(QKeySequence.Delete): # Ctrl+Delete
             node_items = [it for it in self.graph_scene.selectedItems() if isinstance(it, NodeItem)]
             if node_items:
-                self.undo_stack.beginMacro("Delete")
-                for it in node_items:
-                    self.undo_stack.push(RemoveNodeCommand(self, it.node.id))
-                self.undo_stack.endMacro()
+                with self.graph.batch():
+                    self.undo_stack.beginMacro("Delete")
+                    for it in node_items:
+                        self.undo_stack.push(RemoveNodeCommand(self, it.node.id))
+                    self.undo_stack.endMacro()
             event.accept()
             return
         if event.key() == Qt.Key_F: # F
@@ -303,23 +297,11 @@ class GraphView(QGraphicsView):
 
         node_item = self.node_items[node_id]
 
-        for edge_item in list(self.graph_scene.edges):
-            if (
-                edge_item.source_port in node_item.port_items.values()
-                or edge_item.target_port in node_item.port_items.values()
-            ):
-                if edge_item.edge:
-                    if edge_item.edge and edge_item.edge.id in self.graph.edges:
-                        self.graph.remove_edge(edge_item.edge.id)
-                    if edge_item.edge.id in self.edge_items:
-                        del self.edge_items[edge_item.edge.id]
-                        self.graph.remove_edge(edge_item.edge.id)
-                if edge_item.scene() is self.graph_scene:
-                    self.graph_scene.removeItem(edge_item)
-
-                self.graph_scene.edges.remove(edge_item)
+        with self.graph.batch():
+            for edge in self.graph.edges_of(node_id):
+                self.graph_scene.remove_core_edge(edge.id)
 
-        self.graph.remove_node(node_id)
+            self.graph.remove_node(node_id)
 
         if node_item.scene() is self.graph_scene:
             self.graph_scene.removeItem(node_item)
@@ -367,34 +349,35 @@ class GraphView(QGraphicsView):
         else:
             dx, dy = self.paste_offset
 
-        for node_data in nodes_data:
-            node = self.node_factory(node_data["type"])
-            node.properties.update(node_data.get("properties", {}))
-            node.x = node_data["x"] + dx
-            node.y = node_data["y"] + dy
+        with self.graph.batch():
+            for node_data in nodes_data:
+                node = self.node_factory(node_data["type"])
+                node.properties.update(node_data.get("properties", {}))
+                node.x = node_data["x"] + dx
+                node.y = node_data["y"] + dy
 
-            self.graph.add_node(node)
-            self.add_node_item(node)
-            id_map[node_data["id"]] = node
+                self.graph.add_node(node)
+                self.add_node_item(node)
+                id_map[node_data["id"]] = node
 
-        for edge_data in data.get("edges", []):
-            src_node = id_map.get(edge_data["source_node"])
-            tgt_node = id_map.get(edge_data["target_node"])
-            if not src_node or not tgt_node:
-                continue
+            for edge_data in data.get("edges", []):
+                src_node = id_map.get(edge_data["source_node"])
+                tgt_node = id_map.get(edge_data["target_node"])
+                if not src_node or not tgt_node:
+                    continue
 
-            src_i = edge_data["source_output_index"]
-            tgt_i = edge_data["target_input_index"]
+                src_i = edge_data["source_output_index"]
+                tgt_i = edge_data["target_input_index"]
 
-            if src_i >= len(src_node.outputs) or tgt_i >= len(tgt_node.inputs):
-                continue
+                if src_i >= len(src_node.outputs) or tgt_i >= len(tgt_node.inputs):
+                    continue
 
-            src_port = src_node.outputs[src_i]
-            tgt_port = tgt_node.inputs[tgt_i]
+                src_port = src_node.outputs[src_i]
+                tgt_port = tgt_node.inputs[tgt_i]
 
-            edge = self.graph.add_edge(src_port, tgt_port)
-            if edge:
-                self.add_edge_item(edge)
+                edge = self.graph.add_edge(src_port, tgt_port)
+                if edge:
+                    self.add_edge_item(edge)
 
         self.paste_offset = (self.paste_offset[0] + 10, self.paste_offset[1] + 10)
         if message:
@@ -404,16 +387,16 @@ class GraphView(QGraphicsView):
         l = GraphLayoutEngine(self.graph)
         positions = l.compute()
 
-        for node_id, (x, y) in positions.items():
-            node = self.graph.nodes.get(node_id)
-            if not node:
-                continue
-            node.x = x
-            node.y = y
-            item = self.node_items.get(node_id)
-            if item:
-                item.setPos(x, y)
-                self.graph_scene.update_edges_for_node(item)
+        with self.graph.batch():
+            for node_id, (x, y) in positions.items():
+                node = self.graph.nodes.get(node_id)
+                if not node:
+                    continue
+                self.graph.set_position(node, x, y)
+                item = self.node_items.get(node_id)
+                if item:
+                    item.setPos(x, y)
+                    self.graph_scene.update_edges_for_node(item)
 
 
     def apply_theme(self):
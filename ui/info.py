@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import QWidget, QLabel, QVBoxLayout
-from PySide6.QtCore import Qt, QPropertyAnimation, QPoint, QTimer, QEasingCurve
+from PySide6.QtCore import Qt, QObject, Signal, QPropertyAnimation, QPoint, QTimer, QEasingCurve
 
 
 class MessageWidget(QWidget):
@@ -108,3 +108,7 @@ class MessageWidget(QWidget):
         self.anim.finished.connect(self.close)
         self.anim.start()
 
+
+class MessageRelay(QObject):
+    # created on the GUI thread, messages emitted from worker threads are queued to it
+    message = Signal(str, str)
@@ -15,6 +15,7 @@ SHORTCUTS = {
             (["ctrl", "o"], "shortcut_load_graph"),
             (["ctrl", "g"], "shortcut_generate_bash"),
             (["ctrl", "r"], "shortcut_run_bash"),
+            (["ctrl", "shift", "r"], "shortcut_profile_bash"),
         ],
     },
     "edition": {
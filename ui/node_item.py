@@ -20,6 +20,9 @@ class NodeItem(QGraphicsItem):
         self.node = node
         self.port_items = {}
         self.icon_item = None
+        # 0 to 1, share of the slowest node's time in the last profiled run, None when not profiled
+        self.heat = None
+        self.heat_label = ""
 
         self.setFlag(QGraphicsItem.ItemIsMovable, True)
         self.setFlag(QGraphicsItem.ItemIsSelectable, True)
@@ -75,16 +78,35 @@ class NodeItem(QGraphicsItem):
         painter.setPen(Qt.NoPen)
         painter.drawPath(header_path)
 
+        if self.heat is not None:
+            # green for the cheap nodes through yellow to red for the slowest one
+            color = QColor.fromHsvF((1 - self.heat) / 3, 0.85, 0.95)
+            painter.setBrush(Qt.NoBrush)
+            painter.setPen(QPen(color, 2 + 3 * self.heat))
+            painter.drawPath(path)
+            painter.setPen(color)
+            painter.drawText(
+                QRectF(0, self.height - 20, self.WIDTH - 10, 18),
+                Qt.AlignRight | Qt.AlignVCenter, self.heat_label
+            )
+
+    def set_heat(self, heat, label: str = ""):
+        self.heat = heat
+        self.heat_label = label
+        self.update()
+
     def itemChange(self, change, value):
         if change == QGraphicsItem.ItemPositionHasChanged:
             scene = self.scene()
             if scene:
                 scene.update_edges_for_node(self)
-            self.node.x = value.x()
-            self.node.y = value.y()
+                scene.graph.set_position(self.node, value.x(), value.y())
+            else:
+                self.node.x = value.x()
+                self.node.y = value.y()
         return super().itemChange(change, value)
  
-    def get_port_scene_pos(self, port_id: str) -> QPointF:
+    def get_port_scene_pos(self, port_id: int) -> QPointF:
         if port_id in self.port_items:
             port_item = self.port_items[port_id]
             return self.mapToScene(port_item.pos())
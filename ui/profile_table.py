@@ -0,0 +1,63 @@
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+from PySide6.QtCore import Qt, Signal
+from core.profiler import NodeProfile
+from core.traduction import Traduction
+
+
+class _NumberItem(QTableWidgetItem):
+    # shown formatted, sorted by value
+    def __init__(self, value: float, text: str):
+        super().__init__(text)
+        self.value = value
+        self.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+
+    def __lt__(self, other):
+        if isinstance(other, _NumberItem):
+            return self.value < other.value
+        return super().__lt__(other)
+
+
+class ProfileDialog(QDialog):
+    # hotspots of the last profiled run, slowest first; double click a row to go to its node
+    node_activated = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(Traduction.get_trad("profile_title", "Profile"))
+        self.resize(560, 420)
+
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels([
+            Traduction.get_trad("profile_node", "Node"),
+            Traduction.get_trad("profile_calls", "Calls"),
+            Traduction.get_trad("profile_inclusive", "Total (ms)"),
+            Traduction.get_trad("profile_exclusive", "Self (ms)"),
+            Traduction.get_trad("profile_share", "Self %"),
+        ])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.itemDoubleClicked.connect(self._on_double_clicked)
+        layout.addWidget(self.table)
+
+    def set_profile(self, profiles: dict[int, NodeProfile], titles: dict[int, str]):
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(0)
+        total = sum(profile.exclusive for profile in profiles.values()) or 1.0
+        for row, profile in enumerate(profiles.values()):
+            self.table.insertRow(row)
+            name = QTableWidgetItem(titles.get(profile.node_id, str(profile.node_id)))
+            name.setData(Qt.UserRole, profile.node_id)
+            self.table.setItem(row, 0, name)
+            self.table.setItem(row, 1, _NumberItem(profile.calls, str(profile.calls)))
+            self.table.setItem(row, 2, _NumberItem(profile.inclusive, f"{profile.inclusive * 1000:.2f}"))
+            self.table.setItem(row, 3, _NumberItem(profile.exclusive, f"{profile.exclusive * 1000:.2f}"))
+            share = profile.exclusive / total * 100
+            self.table.setItem(row, 4, _NumberItem(share, f"{share:.1f}"))
+        self.table.setSortingEnabled(True)
+        self.table.sortItems(3, Qt.DescendingOrder)
+
+    def _on_double_clicked(self, item):
+        self.node_activated.emit(self.table.item(item.row(), 0).data(Qt.UserRole))
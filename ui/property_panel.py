@@ -3,12 +3,17 @@ from PySide6.QtWidgets import (
 )
 
 class PropertyPanel(QWidget): # TODO: traduction
-    def __init__(self, parent=None):
+    def __init__(self, graph=None, parent=None):
         super().__init__(parent)
         self.layout = QVBoxLayout(self)
         self.setMinimumWidth(250)
+        self.graph = graph
         self.current_node = None
 
+    def set_graph(self, graph):
+        self.graph = graph
+        self.set_node(None)
+
     def set_node(self, node):
         self.clear()
         self.current_node = node
@@ -32,8 +37,8 @@ class PropertyPanel(QWidget): # TODO: traduction
         self.layout.addStretch()
 
     def _update_property(self, key, value):
-        if self.current_node:
-            self.current_node.properties[key] = value
+        if self.current_node and self.graph:
+            self.graph.set_property(self.current_node, key, value)
 
     def clear(self):
         while self.layout.count():
@@ -0,0 +1,319 @@
+# Output of the running script. The last Config.RUN_CONSOLE_MAX_LINES lines (and at most
+# Config.RUN_CONSOLE_MAX_CHARS characters) are kept as runs of styled text in a ring buffer, and
+# only the lines in view are painted: a script printing hundreds of MB costs neither the memory
+# nor the layout of a text document. All of the output goes to a log file as plain text as well.
+import re
+from collections import deque
+from pathlib import Path
+from PySide6.QtCore import Qt, QUrl
+from PySide6.QtGui import QColor, QDesktopServices, QFont, QFontDatabase, QGuiApplication, QKeySequence, QPainter
+from PySide6.QtWidgets import QAbstractScrollArea, QLabel, QMenu
+from core.ansi_to_html import AnsiParser, Style
+from core.config import Config
+from core.debug import Debug
+from core.script_runner import RunStats
+from core.traduction import Traduction
+from ui.menu_style import apply_menu_style
+
+MARGIN = 4
+_BREAKS = re.compile(r"(\n|\r)")
+
+
+class RunConsole(QAbstractScrollArea):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.parser = AnsiParser()
+        # each line a list of [text, style] runs, the last one still being written
+        self.lines = deque([[]])
+        # lines pushed out of the buffer since the last clear
+        self.dropped = 0
+        self.log_path = None
+        self._log = None
+        self._chars = 0
+        # length of the line being written
+        self._column = 0
+        # widest line kept so far, in characters
+        self._widest = 0
+        # a "\r" came last: the next text replaces the current line, as a progress bar redrawn
+        self._carriage = False
+        # the view sticks to the end of the output until scrolled up
+        self._follow = True
+        self._fonts = {}
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+
+    def clear(self):
+        self.close_log()
+        self.parser.reset()
+        self.lines = deque([[]])
+        self.dropped = 0
+        self._chars = 0
+        self._column = 0
+        self._widest = 0
+        self._carriage = False
+        self._follow = True
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def open_log(self, path: Path):
+        self.close_log()
+        # no log to point to when this one cannot be written, the last run's is not this output
+        self.log_path = None
+        try:
+            self._log = open(path, "w", encoding="utf-8", errors="replace")
+            self.log_path = path
+        except OSError as e:
+            Debug.Warn(Traduction.get_trad("run_log_failed", f"Cannot write the run log: {e}", error=e))
+
+    def close_log(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def text(self) -> str:
+        return "\n".join("".join(text for text, _ in line) for line in self.lines)
+
+    def write(self, text: str):
+        self._write_runs(self.parser.feed(text))
+
+    def flush(self):
+        # at the end of the run, the rest of an escape sequence will not come
+        self._write_runs(self.parser.flush())
+
+    def _write_runs(self, runs):
+        if self._log is not None:
+            try:
+                self._log.write("".join(run for run, _ in runs))
+            except OSError as e:
+                self.close_log()
+                self.log_path = None
+                Debug.Warn(Traduction.get_trad("run_log_failed", f"Cannot write the run log: {e}", error=e))
+        for run, style in runs:
+            self._append(run, style)
+
+        dropped = 0
+        while len(self.lines) > 1 and (
+            len(self.lines) > Config.RUN_CONSOLE_MAX_LINES or self._chars > Config.RUN_CONSOLE_MAX_CHARS
+        ):
+            self._chars -= sum(len(text) for text, _ in self.lines.popleft())
+            dropped += 1
+        if self._chars > Config.RUN_CONSOLE_MAX_CHARS:
+            # a single line longer than the cap, only its end is kept
+            self._cut_front(self._chars - Config.RUN_CONSOLE_MAX_CHARS)
+        # the lines in view moved up by as many, less the line telling about them when it appears
+        shift = dropped - (1 if dropped and not self.dropped else 0)
+        self.dropped += dropped
+        scrollbar = self.verticalScrollBar()
+        position = scrollbar.value()
+        self._update_scrollbars()
+        if self._follow:
+            scrollbar.setValue(scrollbar.maximum())
+        elif shift:
+            scrollbar.setValue(max(0, position - shift))
+        self.viewport().update()
+
+    def _cut_front(self, count: int):
+        line = self.lines[0]
+        while count and line:
+            run = line[0]
+            cut = min(count, len(run[0]))
+            if cut == len(run[0]):
+                line.pop(0)
+            else:
+                run[0] = run[0][cut:]
+            count -= cut
+            self._chars -= cut
+            self._column -= cut
+
+    def _append(self, text: str, style: Style):
+        for part in _BREAKS.split(text):
+            if part == "\n":
+                self._carriage = False
+                self.lines.append([])
+                self._column = 0
+            elif part == "\r":
+                self._carriage = True
+            elif part:
+                self._add_text(part, style)
+
+    def _add_text(self, text: str, style: Style):
+        line = self.lines[-1]
+        if self._carriage:
+            self._carriage = False
+            self._chars -= self._column
+            self._column = 0
+            line.clear()
+        if "\t" in text:
+            text = (" " * self._column + text).expandtabs(8)[self._column:]
+        if line and line[-1][1] == style:
+            line[-1][0] += text
+        else:
+            line.append([text, style])
+        self._chars += len(text)
+        self._column += len(text)
+        if self._column > self._widest:
+            self._widest = self._column
+
+    def _on_scrolled(self, value: int):
+        self._follow = value >= self.verticalScrollBar().maximum()
+
+    def _line_count(self) -> int:
+        return len(self.lines) + (1 if self.dropped else 0)
+
+    def _visible_lines(self) -> int:
+        return max(1, (self.viewport().height() - MARGIN) // self.fontMetrics().height())
+
+    def _update_scrollbars(self):
+        visible = self._visible_lines()
+        vertical = self.verticalScrollBar()
+        vertical.setRange(0, max(0, self._line_count() - visible))
+        vertical.setPageStep(visible)
+        horizontal = self.horizontalScrollBar()
+        character = self.fontMetrics().horizontalAdvance("M")
+        width = self.viewport().width() - 2 * MARGIN
+        horizontal.setRange(0, max(0, self._widest * character - width))
+        horizontal.setPageStep(width)
+        horizontal.setSingleStep(character * 4)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+        if self._follow:
+            self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+
+    def _font(self, style: Style) -> QFont:
+        key = (style.bold, style.italic, style.underline, style.strike)
+        font = self._fonts.get(key)
+        if font is None:
+            font = QFont(self.font())
+            font.setBold(style.bold)
+            font.setItalic(style.italic)
+            font.setUnderline(style.underline)
+            font.setStrikeOut(style.strike)
+            self._fonts[key] = font
+        return font
+
+    def changeEvent(self, event):
+        if event.type() == event.Type.FontChange:
+            self._fonts.clear()
+            self._update_scrollbars()
+        super().changeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        palette = self.palette()
+        text_color = palette.text().color()
+        base_color = palette.base().color()
+        height = self.fontMetrics().height()
+        first = self.verticalScrollBar().value()
+        left = MARGIN - self.horizontalScrollBar().value()
+        top = MARGIN
+        count = self._visible_lines() + 1
+
+        if self.dropped:
+            if first == 0:
+                dim = QColor(text_color)
+                dim.setAlphaF(0.6)
+                painter.setPen(dim)
+                painter.setFont(self._font(Style(italic=True)))
+                if self.log_path is None:
+                    # the log file could not be opened, nothing else has the lines
+                    note = Traduction.get_trad(
+                        "run_console_dropped_no_log", f"... {self.dropped} earlier lines", count=self.dropped
+                    )
+                else:
+                    note = Traduction.get_trad(
+                        "run_console_dropped",
+                        f"... {self.dropped} earlier lines, the whole output is in {self.log_path}",
+                        count=self.dropped, path=self.log_path,
+                    )
+                painter.drawText(left, top + painter.fontMetrics().ascent(), note)
+                top += height
+                count -= 1
+            else:
+                first -= 1
+
+        for index in range(first, min(len(self.lines), first + count)):
+            x = left
+            for text, style in self.lines[index]:
+                font = self._font(style)
+                painter.setFont(font)
+                metrics = painter.fontMetrics()
+                width = metrics.horizontalAdvance(text)
+                color, background = style.color, style.background
+                if style.inverse:
+                    color, background = background or base_color.name(), color or text_color.name()
+                if background:
+                    painter.fillRect(x, top, width, height, QColor(background))
+                pen = QColor(color) if color else QColor(text_color)
+                if style.dim:
+                    pen.setAlphaF(0.6)
+                painter.setPen(pen)
+                painter.drawText(x, top + metrics.ascent(), text)
+                x += width
+            top += height
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Copy):
+            self.copy()
+        elif event.key() == Qt.Key_End and event.modifiers() & Qt.ControlModifier:
+            self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+        elif event.key() == Qt.Key_Home and event.modifiers() & Qt.ControlModifier:
+            self.verticalScrollBar().setValue(0)
+        else:
+            super().keyPressEvent(event)
+
+    def copy(self):
+        QGuiApplication.clipboard().setText(self.text())
+
+    def open_log_file(self):
+        if self.log_path is not None:
+            if self._log is not None:
+                self._log.flush()
+            QDesktopServices.openUrl(QUrl.fromLocalFile(str(self.log_path)))
+
+    def contextMenuEvent(self, event):
+        menu = QMenu(self)
+        apply_menu_style(menu)
+        menu.addAction(Traduction.get_trad("run_console_copy", "Copy Output"), self.copy)
+        log_action = menu.addAction(Traduction.get_trad("run_console_open_log", "Open Log File"), self.open_log_file)
+        log_action.setEnabled(self.log_path is not None)
+        menu.exec(event.globalPos())
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class RunStatus(QLabel):
+    # one line under the run console: what the last run cost
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.setContentsMargins(MARGIN, 2, MARGIN, 2)
+
+    def show_running(self):
+        self.setText(Traduction.get_trad("run_status_running", "Running..."))
+
+    def show_stats(self, stats: RunStats):
+        key, fallback = ("run_status_cancelled", "Cancelled") if stats.cancelled else ("run_status_exit", "Exit {code}")
+        parts = [
+            Traduction.get_trad(key, fallback, code=stats.exit_code),
+            Traduction.get_trad("run_status_wall", "{seconds} s", seconds=f"{stats.wall_time:.2f}"),
+            Traduction.get_trad(
+                "run_status_cpu", "CPU {user} s user, {system} s system",
+                user=f"{stats.user_time:.2f}", system=f"{stats.system_time:.2f}",
+            ),
+        ]
+        if stats.max_rss_kb is not None:
+            parts.append(Traduction.get_trad(
+                "run_status_memory", "peak memory {size}", size=format_size(stats.max_rss_kb * 1024)
+            ))
+        parts.append(Traduction.get_trad("run_status_output", "{size} of output", size=format_size(stats.output_bytes)))
+        self.setText(" · ".join(parts))
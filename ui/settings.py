@@ -43,6 +43,8 @@ def create_switch_row(label_key, fallback, config_attr):
 
 class SettingsDialog(QDialog):
     traduction_changed = Signal()
+    optimization_changed = Signal()
+    profile_changed = Signal()
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -174,7 +176,54 @@ class SettingsDialog(QDialog):
         shebang_row.addStretch()
         shebang_row.addWidget(self.shebang_input)
 
+        self.optimization_combo = QComboBox()
+        self.optimization_combo.addItem(
+            Traduction.get_trad("optimization_off", "Off"), 0
+        )
+        self.optimization_combo.addItem(
+            Traduction.get_trad("optimization_fold", "Fold constants"), 1
+        )
+        self.optimization_combo.addItem(
+            Traduction.get_trad("optimization_prune", "Fold constants and remove dead code"), 2
+        )
+        self.optimization_combo.setCurrentIndex(
+            max(self.optimization_combo.findData(Config.OPTIMIZATION_LEVEL), 0)
+        )
+        self.optimization_combo.currentIndexChanged.connect(self.on_optimization_changed)
+
+        self.optimization_label = QLabel(
+            Traduction.get_trad("optimization", "Optimization")
+        )
+
+        optimization_row = QHBoxLayout()
+        optimization_row.addWidget(self.optimization_label)
+        optimization_row.addStretch()
+        optimization_row.addWidget(self.optimization_combo)
+
+        self.profile_combo = QComboBox()
+        self.profile_combo.addItem(
+            Traduction.get_trad("emit_profile_compat", "Compatible"), "compat"
+        )
+        self.profile_combo.addItem(
+            Traduction.get_trad("emit_profile_fast", "Fast (bash builtins)"), "fast"
+        )
+        self.profile_combo.setCurrentIndex(
+            max(self.profile_combo.findData(Config.EMIT_PROFILE), 0)
+        )
+        self.profile_combo.currentIndexChanged.connect(self.on_profile_changed)
+
+        self.profile_label = QLabel(
+            Traduction.get_trad("emit_profile", "Script profile")
+        )
+
+        profile_row = QHBoxLayout()
+        profile_row.addWidget(self.profile_label)
+        profile_row.addStretch()
+        profile_row.addWidget(self.profile_combo)
+
         self.layout.addLayout(shebang_row)
+        self.layout.addLayout(profile_row)
+        self.layout.addLayout(optimization_row)
         self.layout.addLayout(self.tty_row)
         self.layout.addLayout(self.sync_row)
         self.layout.addLayout(self.auto_save_row)
@@ -225,6 +274,26 @@ class SettingsDialog(QDialog):
 
         self.refresh_ui_texts()
 
+    def on_profile_changed(self):
+        profile = self.profile_combo.currentData()
+        if not profile or profile == Config.EMIT_PROFILE:
+            return
+
+        Config.EMIT_PROFILE = profile
+        ConfigManager.save_config()
+
+        self.profile_changed.emit()
+
+    def on_optimization_changed(self):
+        level = self.optimization_combo.currentData()
+        if level is None or level == Config.OPTIMIZATION_LEVEL:
+            return
+
+        Config.OPTIMIZATION_LEVEL = level
+        ConfigManager.save_config()
+
+        self.optimization_changed.emit()
+
     def on_shebang_changed(self):
         new_value = self.shebang_input.text().strip()
 
@@ -297,6 +366,12 @@ class SettingsDialog(QDialog):
         self.shebang_label.setText(
             Traduction.get_trad("custom_shebang", "Custom Shebang")
         )
+        self.profile_label.setText(
+            Traduction.get_trad("emit_profile", "Script profile")
+        )
+        self.optimization_label.setText(
+            Traduction.get_trad("optimization", "Optimization")
+        )
 
         self.update_combo_item(self.theme_combo, "dark", "theme_dark", "Dark")
         self.update_combo_item(self.theme_combo, "purple", "theme_purple", "Purple")
@@ -309,6 +384,13 @@ class SettingsDialog(QDialog):
         self.update_combo_item(self.lang_combo, "it", "lang_it", "Italian")
         self.update_combo_item(self.lang_combo, "de", "lang_de", "German")
 
+        self.update_combo_item(self.profile_combo, "compat", "emit_profile_compat", "Compatible")
+        self.update_combo_item(self.profile_combo, "fast", "emit_profile_fast", "Fast (bash builtins)")
+
+        self.update_combo_item(self.optimization_combo, 0, "optimization_off", "Off")
+        self.update_combo_item(self.optimization_combo, 1, "optimization_fold", "Fold constants")
+        self.update_combo_item(self.optimization_combo, 2, "optimization_prune", "Fold constants and remove dead code")
+
         if self.parent():
             self.parent().refresh_ui_texts()
 